@@ -19,11 +19,55 @@ ROBOT_CONNECTION_TIMEOUT = 10  # seconds
 # Camera settings
 CAMERA_RESOLUTION = (1280, 720)
 CAMERA_FPS = 30
+CAMERA_HORIZONTAL_FOV = 60.0  # Degrees, used to convert chassis turns into image shifts
 
 # Vision settings
 DETECTION_MODEL_PATH = os.path.join(MODELS_DIR, "yolo_model.pt")
 DETECTION_CONFIDENCE_THRESHOLD = 0.5
 DETECTION_IOU_THRESHOLD = 0.45
+# Inference backend: "ultralytics" (PyTorch) or "onnxruntime" (CPU only, no torch import).
+# With "onnxruntime" the model is exported to a .onnx file next to the .pt once;
+# DETECTION_MODEL_PATH may also point directly to a .onnx file.
+DETECTION_BACKEND = "ultralytics"
+# Region-of-interest detection while approaching a known object (visual servoing)
+ROI_MARGIN = 0.75  # Region growth around the last bbox, as a fraction of its size per side
+ROI_INPUT_SIZE = 320  # Network input size for ROI crops (full frames use the model default)
+DETECTION_CACHE_SIZE = 16  # Frames whose detections are cached (0 = disabled)
+# Run detection on every Nth camera frame; with TRACKING_ENABLED the tracker's
+# motion prediction provides the boxes of the frames in between
+DETECTION_INTERVAL = 5
+# Auto exposure: brighten dark frames towards a target luminance before detection
+AUTO_EXPOSURE_ENABLED = True
+AUTO_EXPOSURE_TARGET = 110  # Target mean luminance (0-255)
+AUTO_EXPOSURE_MAX_GAIN = 2.5  # Maximum brightness factor for dark rooms
+# Preprocessing profiles per lighting setup; each lists only the keys it changes
+# (see DEFAULT_PROFILE in src/vision/preprocessing.py). Select one here or switch
+# at runtime with ImagePreprocessor.set_profile()
+PREPROCESSING_PROFILE = "default"
+PREPROCESSING_PROFILES = {
+    # Tone correction by auto exposure only
+    "default": {
+        "auto_exposure": AUTO_EXPOSURE_ENABLED,
+        "exposure_target": AUTO_EXPOSURE_TARGET,
+        "exposure_max_gain": AUTO_EXPOSURE_MAX_GAIN,
+    },
+    # Well lit room: frames go to the detector untouched
+    "bright_lab": {},
+    # Dark floor/warehouse: fixed brightening (or auto exposure), noise and contrast cleanup
+    "dim_warehouse": {
+        "denoise": 3,
+        "clahe_clip_limit": 2.0,
+        "brightness": 1.8,
+        "auto_exposure": AUTO_EXPOSURE_ENABLED,
+        "exposure_target": AUTO_EXPOSURE_TARGET,
+        "exposure_max_gain": AUTO_EXPOSURE_MAX_GAIN,
+    },
+}
+# Scene-change gate: skip detection while the camera sees the same scene
+SCENE_GATE_ENABLED = True
+SCENE_CHANGE_THRESHOLD = 0.02  # Fraction of thumbnail pixels that must change to re-detect
+SCENE_GATE_PIXEL_THRESHOLD = 20  # Gray level difference for a pixel to count as changed
+SCENE_GATE_MAX_AGE = 2.0  # seconds, re-detect a static scene at least this often (0 = never)
 
 # Supported object classes (minimum 2 for project requirements)
 # Note: Using COCO dataset classes from pre-trained YOLOv8
@@ -46,6 +90,16 @@ OBJECT_CLASSES = [
 # Tracking settings
 MAX_DISAPPEARED_FRAMES = 10
 TRACKING_ENABLED = True
+TRACKING_IOU_THRESHOLD = 0.3  # Minimum box overlap to continue a track
+TRACK_HISTORY_SIZE = 128  # Past boxes kept per track (fixed memory, oldest overwritten)
+# Motion between detections: "kalman" (predicted) or "optical_flow" (measured on the frames)
+TRACKING_MOTION = "optical_flow"
+OPTICAL_FLOW_SCALE = 0.5  # Downscale factor of the grayscale flow image
+# Typical height of the sorted objects (meters): depth estimate from box size when
+# tracks are moved by a chassis translation
+TRACKING_OBJECT_HEIGHT = 0.15
+# Object map: detections of one class closer than this (meters) in world coordinates are one object
+OBJECT_MAP_MERGE_RADIUS = 0.25
 
 # Sorting settings
 SORTING_STRATEGY = "class_based"  # Options: class_based, size_based, confidence_based
@@ -127,8 +181,8 @@ def validate_settings():
     if not 0.0 <= ROTATION_SPEED <= 1.0:
         raise ValueError("Rotation speed must be between 0.0 and 1.0")
 
-    return True
-
+    # Every track keeps at least its latest box
+    if TRACK_HISTORY_SIZE < 1:
+        raise ValueError("Track history size must be at least 1")
 
-# Initialize on import
-create_directories()
+    return True
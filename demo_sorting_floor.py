@@ -22,23 +22,28 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 # ========================================
 # CONFIGURATION
 # ========================================
-BRIGHTNESS_FACTOR = 1.8  # Image brightness for low light (1.0 = no change, higher = brighter)
+PREPROCESSING_PROFILE = "dim_warehouse"  # Lighting profile from settings.PREPROCESSING_PROFILES
 
 from robomaster import robot, camera as rm_camera
 from config import settings
-from src.vision.detection import ObjectDetector
+from src.vision.detection import ObjectDetector, scale_boxes
+from src.vision.preprocessing import ImagePreprocessor
+from src.vision.object_map import ObjectMap
+from src.vision.tracking import ObjectTracker, ego_motion_boxes
 from src.robot_control import ThreadedCamera
 
 
 class LiveDisplay:
     """Display live camera feed in separate window"""
 
-    def __init__(self, threaded_camera):
+    def __init__(self, threaded_camera, preprocessor=None):
         self.threaded_camera = threaded_camera
+        self.preprocessor = preprocessor  # 'p' cycles its lighting profiles
         self.stopped = False
         self.current_status = "Initializing..."
         self.current_detections = []
         self.lock = threading.Lock()
+        self.display_frame = None  # Reused drawing buffer (no per-frame allocation)
 
     def start(self):
         """Start display thread"""
@@ -61,7 +66,10 @@ class LiveDisplay:
             frame = self.threaded_camera.read()
 
             if frame is not None:
-                display_frame = frame.copy()
+                if self.display_frame is None or self.display_frame.shape != frame.shape:
+                    self.display_frame = np.empty_like(frame)
+                display_frame = self.display_frame
+                np.copyto(display_frame, frame)
 
                 # Draw detections
                 with self.lock:
@@ -78,40 +86,28 @@ class LiveDisplay:
 
                 cv2.imshow("Robot Camera - Live View", display_frame)
 
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
                 self.stopped = True
+            elif key == ord('p') and self.preprocessor is not None:
+                self._next_profile()
 
             time.sleep(0.03)  # ~30 FPS
 
+    def _next_profile(self):
+        """Switch the preprocessor to the next lighting profile (applies from the next frame)"""
+        names = list(self.preprocessor.profiles)
+        current = self.preprocessor.profile
+        name = names[(names.index(current) + 1) % len(names)] if current in names else names[0]
+        if self.preprocessor.set_profile(name):
+            print(f"\n[Display] Preprocessing profile: {name}")
+
     def stop(self):
         """Stop display"""
         self.stopped = True
         cv2.destroyAllWindows()
 
 
-def brighten_image(image, factor=1.3):
-    """
-    Brighten image for better detection in low light
-
-    Args:
-        image: Input image (BGR)
-        factor: Brightness factor (1.0 = no change, >1.0 = brighter)
-
-    Returns:
-        Brightened image
-    """
-    # Convert to HSV and increase V channel
-    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-    h, s, v = cv2.split(hsv)
-
-    # Increase brightness
-    v = np.clip(v * factor, 0, 255).astype(np.uint8)
-
-    # Merge and convert back
-    hsv = cv2.merge([h, s, v])
-    return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
-
-
 def print_header(text):
     """Print formatted header"""
     print("\n" + "=" * 60)
@@ -145,11 +141,12 @@ def calculate_object_position(detection, frame_width, frame_height):
     offset_x = center_x - frame_center_x
 
     # Approximate angle offset (very rough estimation)
-    # Assuming ~60° horizontal FOV
+    # Assuming settings.CAMERA_HORIZONTAL_FOV (~60°)
     # RoboMaster SDK: positive z = counter-clockwise (left), negative z = clockwise (right)
     # If object is RIGHT of center (+offset_x), robot needs to turn RIGHT (negative z)
     # If object is LEFT of center (-offset_x), robot needs to turn LEFT (positive z)
-    angle_offset = -(offset_x / frame_center_x) * 30  # degrees (negated for correct direction)
+    # degrees (negated for correct direction)
+    angle_offset = -(offset_x / frame_center_x) * settings.CAMERA_HORIZONTAL_FOV / 2
 
     # Debug output
     print(f"  [Debug] center_x={center_x:.0f}, frame_center={frame_center_x:.0f}, offset_x={offset_x:.0f}°")
@@ -176,6 +173,111 @@ def calculate_object_position(detection, frame_width, frame_height):
     return distance, angle_offset
 
 
+def predicted_bbox(bbox, frame_shape, yaw=0.0, forward=0.0):
+    """
+    Predict where a bounding box lands after a chassis move
+
+    Used as the region of interest for the next detection during the approach
+    when the box could not be followed on the camera frames.
+
+    Args:
+        bbox: Bounding box as (x1, y1, x2, y2) before the move
+        frame_shape: Shape of the camera frame
+        yaw: Commanded rotation in degrees (chassis.move z)
+        forward: Commanded forward distance in meters (chassis.move x)
+
+    Returns:
+        tuple: Predicted bounding box
+    """
+    h, w = frame_shape[:2]
+    boxes, _ = ego_motion_boxes(np.array([bbox]), (w, h), settings.CAMERA_HORIZONTAL_FOV,
+                                yaw=yaw, forward=forward, object_height=settings.TRACKING_OBJECT_HEIGHT)
+    return tuple(int(round(v)) for v in boxes[0])
+
+
+def capture_scan_frame(threaded_cam, preprocessor, scan_frames):
+    """
+    Add the latest camera frame and its brightened copy to the scan frames
+
+    Args:
+        threaded_cam: ThreadedCamera providing the frames
+        preprocessor: ImagePreprocessor brightening the frames for detection
+        scan_frames: List of (frame_id, frame, brightened frame) to append to
+    """
+    frame_id, latest = threaded_cam.read_with_id()
+    if latest is None:
+        return
+    if scan_frames and scan_frames[-1][0] == frame_id:
+        # No new frame arrived - reuse the brightened copy (detection is cached)
+        scan_frames.append(scan_frames[-1])
+    else:
+        # Brighten image for better detection in low light (own copy per scan frame:
+        # the profile may resize, so the output shape can differ from the frame)
+        scan_frames.append((frame_id, latest, preprocessor.preprocess_for_detection(latest).copy()))
+
+
+def detect_scan_frames(detector, scan_frames, start=0):
+    """
+    Detect objects in scan frames with one batched forward pass
+
+    Frames with the same sequence number are only inferred once.
+
+    Args:
+        detector: ObjectDetector
+        scan_frames: List of (frame_id, frame, brightened frame)
+        start: Index of the first scan frame to detect in
+
+    Returns:
+        tuple: (index, detections in camera frame pixels) of the first frame
+               with detections, or None
+    """
+    frames = scan_frames[start:]
+    if not frames:
+        return None
+    batch_detections = detector.detect_objects_batch(
+        [bright for _, _, bright in frames],
+        frame_ids=[frame_id for frame_id, _, _ in frames]
+    )
+    for offset, found_targets in enumerate(batch_detections):
+        if found_targets:
+            _, frame, bright = frames[offset]
+            return start + offset, found_targets.rescale(bright.shape, frame.shape)
+    return None
+
+
+def follow_while_moving(action, tracker, threaded_cam, live_display, class_name, timeout):
+    """
+    Follow the target with optical flow on every camera frame while the robot moves
+
+    Args:
+        action: RoboMaster chassis action that is running
+        tracker: ObjectTracker in optical_flow mode, seeded with the target
+        threaded_cam: ThreadedCamera providing the frames
+        live_display: LiveDisplay showing the followed box
+        class_name: Class of the target
+        timeout: Seconds to wait for the action
+
+    Returns:
+        tuple: Followed bounding box, or None if the flow lost the target
+    """
+    deadline = time.time() + timeout
+    last_frame_id = None
+    while not action.is_completed and time.time() < deadline:
+        frame_id, frame = threaded_cam.read_with_id()
+        if frame is None or frame_id == last_frame_id:
+            time.sleep(0.005)
+            continue
+        last_frame_id = frame_id
+        tracker.predict(frame)
+        live_display.update_detections(tracker.get_detections())
+    action.wait_for_completed(timeout=max(0.1, deadline - time.time()))
+
+    track = tracker.track_object(class_name)
+    if track is None or track.object_id not in tracker.flow.last_shifts:
+        return None
+    return track.current_bbox
+
+
 def main():
     print_header("RoboMaster EP Core - Floor-based Object Sorting")
 
@@ -189,6 +291,20 @@ def main():
 
     input("\nPress ENTER when ready to start...")
 
+    # Load and warm up YOLO in the background while the robot connects and the camera starts
+    startup_start = time.time()
+    detector = ObjectDetector(confidence_threshold=0.35,  # Lowered for dark environments
+                              backend=settings.DETECTION_BACKEND,
+                              classes=settings.OBJECT_CLASSES,
+                              cache_size=settings.DETECTION_CACHE_SIZE)
+    model_loading = detector.load_model_async(warmup_shapes=[(360, 640)],  # STREAM_360P frames
+                                              warmup_sizes=[settings.ROI_INPUT_SIZE])
+
+    # Low-light preprocessing compiled once from the lighting profile (brightening adapts to the room)
+    preprocessor = ImagePreprocessor(profiles=settings.PREPROCESSING_PROFILES,
+                                     profile=PREPROCESSING_PROFILE)
+    detector.cache_token = preprocessor.cache_token  # Cached results depend on the profile and gain
+
     # ========================================
     # INITIALIZATION
     # ========================================
@@ -219,14 +335,15 @@ def main():
 
     try:
         ep_camera.start_video_stream(display=False, resolution=rm_camera.STREAM_360P)
-        time.sleep(2)
 
+        # Ready as soon as the first frame arrives (instead of fixed waits)
         threaded_cam = ThreadedCamera(ep_camera).start()
-        time.sleep(1)
+        if not threaded_cam.wait_for_frame(timeout=10.0):
+            threaded_cam.stop()
+            raise RuntimeError("No frames from the camera stream")
 
         # Start live display
-        live_display = LiveDisplay(threaded_cam).start()
-        time.sleep(0.5)
+        live_display = LiveDisplay(threaded_cam, preprocessor).start()
 
         print("✓ Camera system ready (threaded mode)")
         print("✓ Live camera window opened!")
@@ -242,11 +359,14 @@ def main():
     print_step(3, "Loading YOLO Detection Model")
 
     try:
-        detector = ObjectDetector(confidence_threshold=0.35)  # Lowered for dark environments
-        if not detector.load_model():
+        if not model_loading.result():
             raise RuntimeError("Failed to load YOLO model")
 
-        print(f"✓ YOLO model loaded (confidence threshold: 0.35 for low light)")
+        startup = detector.get_startup_stats()
+        print(f"✓ YOLO model loaded in {startup['load_time']:.1f}s, "
+              f"warmed up in {startup['warmup_time']:.1f}s "
+              f"(confidence threshold: 0.35 for low light)")
+        print(f"✓ Startup complete in {time.time() - startup_start:.1f}s")
 
     except Exception as e:
         print(f"✗ Failed to load YOLO: {e}")
@@ -302,6 +422,15 @@ def main():
     rotations_without_find = 0
     total_objects_processed = 0
 
+    # Every object seen is remembered in world coordinates, so after a sort the
+    # robot turns straight to the next known object instead of searching again.
+    # The robot always drives back to where it started, so only the heading
+    # (sum of all turns, degrees) changes; the position stays at the origin.
+    object_map = ObjectMap(merge_radius=settings.OBJECT_MAP_MERGE_RADIUS,
+                           horizontal_fov=settings.CAMERA_HORIZONTAL_FOV,
+                           object_height=settings.TRACKING_OBJECT_HEIGHT)
+    heading = 0.0
+
     while rotations_without_find < MAX_ROTATIONS_WITHOUT_FIND:
         print(f"\n{'='*50}")
         print(f"Scanning current view...")
@@ -314,28 +443,25 @@ def main():
         # Scan multiple frames to improve detection reliability
         SCAN_FRAMES = 3
         target_detections = []
-        frame = None
-
-        for scan_attempt in range(SCAN_FRAMES):
-            frame = threaded_cam.read()
-
-            if frame is None:
-                time.sleep(0.3)
-                continue
-
-            # Brighten image for better detection in low light
-            bright_frame = brighten_image(frame, factor=BRIGHTNESS_FACTOR)
-
-            # Detect objects in brightened image
-            detections = detector.detect_objects(bright_frame)
-            found_targets = [d for d in detections if d.class_name in settings.OBJECT_CLASSES]
-
-            if found_targets:
-                target_detections = found_targets
-                print(f"  ✓ Found object on scan attempt {scan_attempt + 1}/{SCAN_FRAMES}")
-                break
-
-            time.sleep(0.3)  # Wait before next scan attempt
+        scan_frames = []  # (frame_id, frame, brightened frame) per scan attempt
+
+        # Detect on the first frame right away (most scans find the object there)
+        capture_scan_frame(threaded_cam, preprocessor, scan_frames)
+        hit = detect_scan_frames(detector, scan_frames)
+        if hit is None:
+            # Nothing found: capture the retries, then infer them in one batched pass
+            retries_start = len(scan_frames)
+            for _ in range(SCAN_FRAMES - 1):
+                time.sleep(0.3)  # Wait before next scan attempt
+                capture_scan_frame(threaded_cam, preprocessor, scan_frames)
+            hit = detect_scan_frames(detector, scan_frames, start=retries_start)
+
+        frame = scan_frames[-1][1] if scan_frames else None
+        if hit is not None:
+            scan_attempt, target_detections = hit
+            # Measure against the frame the detections came from
+            frame = scan_frames[scan_attempt][1]
+            print(f"  ✓ Found object on scan attempt {scan_attempt + 1}/{SCAN_FRAMES}")
 
         if frame is None:
             print("⚠ No frame available after multiple attempts")
@@ -343,6 +469,7 @@ def main():
             # Rotate and continue
             try:
                 ep_chassis.move(x=0, y=0, z=ROTATION_STEP, z_speed=45).wait_for_completed(timeout=5)
+                heading += ROTATION_STEP
                 time.sleep(0.5)
             except Exception as e:
                 print(f"✗ Rotation failed/timeout: {e}")
@@ -352,13 +479,25 @@ def main():
         live_display.update_detections(target_detections)
 
         if not target_detections:
-            # No objects found in current view
-            print("→ No objects in current view, rotating to search...")
+            # No objects found in current view: remembered ones that should be
+            # visible from here are gone (or were false detections)
+            pose = (0.0, 0.0, heading)
+            for stale in object_map.in_view(pose, margin=5):
+                object_map.remove(stale.object_id)
             rotations_without_find += 1
 
-            # Rotate to next position
+            # Turn to the closest remembered object, or to the next search position
+            remembered = sorted(object_map.query(), key=lambda known: abs(known.bearing(pose)))
+            if remembered:
+                turn = remembered[0].bearing(pose)
+                print(f"→ No objects in current view, turning {turn:.0f}° "
+                      f"to the remembered {remembered[0].class_name}...")
+            else:
+                turn = ROTATION_STEP
+                print("→ No objects in current view, rotating to search...")
             try:
-                ep_chassis.move(x=0, y=0, z=ROTATION_STEP, z_speed=45).wait_for_completed(timeout=5)
+                ep_chassis.move(x=0, y=0, z=turn, z_speed=45).wait_for_completed(timeout=5)
+                heading += turn
                 time.sleep(0.5)
             except Exception as e:
                 print(f"✗ Rotation failed/timeout: {e}")
@@ -368,6 +507,10 @@ def main():
         rotations_without_find = 0
         total_objects_processed += 1
 
+        # Remember everything in view; the first object is handled now
+        h, w = frame.shape[:2]
+        map_objects = object_map.add_detections(target_detections, (w, h), (0.0, 0.0, heading))
+
         # Take the first detected object
         obj = target_detections[0]
 
@@ -408,6 +551,13 @@ def main():
             bbox_width = obj.bbox[2] - obj.bbox[0]
             bbox_height = obj.bbox[3] - obj.bbox[1]
             current_bbox_area = bbox_width * bbox_height
+            last_bbox = obj.bbox  # Region of interest for the next detection
+
+            # Follow the object on every camera frame while driving, YOLO only runs between moves
+            approach_tracker = ObjectTracker(motion="optical_flow", flow_scale=settings.OPTICAL_FLOW_SCALE,
+                                             horizontal_fov=settings.CAMERA_HORIZONTAL_FOV,
+                                             object_height=settings.TRACKING_OBJECT_HEIGHT)
+            approach_tracker.update([obj], frame=frame)
 
             print(f"→ Initial bbox_area: {current_bbox_area:.0f} (target: {BBOX_AREA_THRESHOLD})")
 
@@ -420,38 +570,55 @@ def main():
                 if abs(angle_offset) > 2:
                     print(f"  → Centering ({angle_offset:.1f}°)...")
                     try:
-                        ep_chassis.move(x=0, y=0, z=angle_offset, z_speed=30).wait_for_completed(timeout=3)
+                        action = ep_chassis.move(x=0, y=0, z=angle_offset, z_speed=30)
+                        followed = follow_while_moving(action, approach_tracker, threaded_cam,
+                                                       live_display, obj.class_name, timeout=3)
+                        heading += angle_offset
                         time.sleep(0.3)
+                        last_bbox = followed or predicted_bbox(last_bbox, frame.shape, yaw=angle_offset)
                     except Exception as e:
                         print(f"  ✗ Centering failed/timeout: {e}")
 
                 # STEP 2: Move forward one step
                 print(f"  → Moving {STEP_SIZE}m forward...")
                 try:
-                    ep_chassis.move(x=STEP_SIZE, y=0, z=0, xy_speed=0.3).wait_for_completed(timeout=5)
+                    action = ep_chassis.move(x=STEP_SIZE, y=0, z=0, xy_speed=0.3)
+                    followed = follow_while_moving(action, approach_tracker, threaded_cam,
+                                                   live_display, obj.class_name, timeout=5)
                     total_distance_traveled += STEP_SIZE
                     time.sleep(0.4)
+                    last_bbox = followed or predicted_bbox(last_bbox, frame.shape, forward=STEP_SIZE)
                 except Exception as e:
                     print(f"  ✗ Movement failed/timeout: {e}")
                     break
 
                 # STEP 3: Re-scan and measure
                 time.sleep(0.3)
-                new_frame = threaded_cam.read()
+                new_frame_id, new_frame = threaded_cam.read_with_id()
                 if new_frame is None:
                     print("  ⚠ No frame, stopping approach")
                     break
 
-                bright_new_frame = brighten_image(new_frame, factor=BRIGHTNESS_FACTOR)
-                new_detections = detector.detect_objects(bright_new_frame)
-                target_det = [d for d in new_detections if d.class_name == obj.class_name]
+                # Only search around the last known position (full frame if lost there)
+                # (boxes are in camera frame pixels, the detector sees the preprocessed frame)
+                bright_new_frame = preprocessor.preprocess_for_detection(new_frame)
+                roi_bbox = tuple(scale_boxes(last_bbox, new_frame.shape, bright_new_frame.shape).tolist())
+                target_det = detector.detect_in_roi(
+                    bright_new_frame, roi_bbox,
+                    margin=settings.ROI_MARGIN, input_size=settings.ROI_INPUT_SIZE,
+                    classes=[obj.class_name], frame_id=new_frame_id
+                ).rescale(bright_new_frame.shape, new_frame.shape)
 
                 if not target_det:
                     print("  ⚠ Object lost! Stopping approach")
                     break
 
+                # Correct the followed box and pick new flow points on the object
+                approach_tracker.update(target_det, frame=new_frame)
+
                 # Update measurements
                 current_obj = target_det[0]
+                last_bbox = current_obj.bbox
                 h, w = new_frame.shape[:2]
                 _, angle_offset = calculate_object_position(current_obj, w, h)
 
@@ -475,11 +642,15 @@ def main():
             # FINAL CENTERING
             print("\n→ Final centering before grab...")
             time.sleep(0.3)
-            final_frame = threaded_cam.read()
+            final_frame_id, final_frame = threaded_cam.read_with_id()
             if final_frame is not None:
-                bright_final_frame = brighten_image(final_frame, factor=BRIGHTNESS_FACTOR)
-                final_detections = detector.detect_objects(bright_final_frame)
-                final_target = [d for d in final_detections if d.class_name == obj.class_name]
+                bright_final_frame = preprocessor.preprocess_for_detection(final_frame)
+                roi_bbox = tuple(scale_boxes(last_bbox, final_frame.shape, bright_final_frame.shape).tolist())
+                final_target = detector.detect_in_roi(
+                    bright_final_frame, roi_bbox,
+                    margin=settings.ROI_MARGIN, input_size=settings.ROI_INPUT_SIZE,
+                    classes=[obj.class_name], frame_id=final_frame_id
+                ).rescale(bright_final_frame.shape, final_frame.shape)
 
                 if final_target:
                     h, w = final_frame.shape[:2]
@@ -489,6 +660,7 @@ def main():
                         print(f"→ Final adjustment ({final_angle:.1f}°)...")
                         try:
                             ep_chassis.move(x=0, y=0, z=final_angle, z_speed=20).wait_for_completed(timeout=3)
+                            heading += final_angle
                             time.sleep(0.3)
                         except Exception as e:
                             print(f"✗ Final centering failed/timeout: {e}")
@@ -620,6 +792,9 @@ def main():
             except:
                 pass
 
+        # The handled object was picked up (or pushed away), forget its position
+        object_map.remove(map_objects[0].object_id)
+
         # Small pause before next scan
         print("→ Continuing to next scan...\n")
         time.sleep(1.5)
@@ -638,6 +813,16 @@ def main():
     if total_objects_processed > 0:
         print(f"Success rate:            {sorted_count/total_objects_processed*100:.1f}%")
 
+    if preprocessor.auto_exposure is not None:
+        exposure = preprocessor.auto_exposure.get_stats()
+        print(f"Auto exposure:           gain {exposure['gain']:.2f} "
+              f"({exposure['gain_updates']} updates over {exposure['frames']} frames)")
+
+    cache_stats = detector.get_cache_stats()
+    if cache_stats:
+        print(f"Detection cache:         {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']*100:.0f}% inference saved)")
+
     # ========================================
     # CLEANUP
     # ========================================
@@ -4,7 +4,9 @@ Main entry point for the application
 """
 
 import sys
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src to path
@@ -12,7 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from config import settings
 from src.robot_control import RobotConnection, RobotMovement, RobotCamera, RobotGripper
-from src.vision import ObjectDetector, ImagePreprocessor, ObjectTracker
+from src.vision import ObjectDetector, ImagePreprocessor, ObjectTracker, AsyncDetector, SceneChangeGate
 from src.sorting import SortingController, ClassBasedStrategy, ZoneManager
 
 
@@ -56,6 +58,29 @@ def initialize_robot():
     return connection, movement, camera, gripper
 
 
+def initialize_robot_and_camera():
+    """
+    Connect to the robot and bring up the camera stream (until the first frame arrives)
+
+    Returns:
+        tuple: (connection, movement, camera, gripper) instances, all None on failure
+    """
+    logger = logging.getLogger(__name__)
+
+    connection, movement, camera, gripper = initialize_robot()
+    if not connection:
+        return None, None, None, None
+
+    logger.info("Starting camera stream...")
+    if not camera.start_stream(display=False) or camera.wait_for_frame() is None:
+        logger.error("Failed to start camera stream")
+        camera.stop_stream()
+        connection.disconnect()
+        return None, None, None, None
+
+    return connection, movement, camera, gripper
+
+
 def initialize_vision():
     """
     Initialize vision components
@@ -73,16 +98,34 @@ def initialize_vision():
 
     detector = ObjectDetector(
         model_path=model_path,
-        confidence_threshold=settings.DETECTION_CONFIDENCE_THRESHOLD
+        confidence_threshold=settings.DETECTION_CONFIDENCE_THRESHOLD,
+        backend=settings.DETECTION_BACKEND,
+        iou_threshold=settings.DETECTION_IOU_THRESHOLD,
+        classes=settings.OBJECT_CLASSES,  # Only target classes reach NMS and result building
+        cache_size=settings.DETECTION_CACHE_SIZE
     )
 
     # Load detection model
     if not detector.load_model():
-        logger.error("Failed to load detection model! Make sure ultralytics is installed.")
+        logger.error(f"Failed to load detection model! Make sure the "
+                     f"'{settings.DETECTION_BACKEND}' backend is installed.")
         raise RuntimeError("Cannot initialize vision system - model loading failed")
 
-    preprocessor = ImagePreprocessor()
-    tracker = ObjectTracker(max_disappeared=settings.MAX_DISAPPEARED_FRAMES)
+    # Pay the first-inference cost now instead of on the first camera frame
+    width, height = settings.CAMERA_RESOLUTION
+    detector.warmup(shapes=[(height, width)], input_sizes=[settings.ROI_INPUT_SIZE])
+    logger.info(f"Detector startup: {detector.get_startup_stats()}")
+
+    preprocessor = ImagePreprocessor(profiles=settings.PREPROCESSING_PROFILES,
+                                     profile=settings.PREPROCESSING_PROFILE)
+    detector.cache_token = preprocessor.cache_token  # Frames are detected after preprocessing
+    tracker = ObjectTracker(max_disappeared=settings.MAX_DISAPPEARED_FRAMES,
+                            iou_threshold=settings.TRACKING_IOU_THRESHOLD,
+                            history_size=settings.TRACK_HISTORY_SIZE,
+                            motion=settings.TRACKING_MOTION,
+                            flow_scale=settings.OPTICAL_FLOW_SCALE,
+                            horizontal_fov=settings.CAMERA_HORIZONTAL_FOV,
+                            object_height=settings.TRACKING_OBJECT_HEIGHT)
 
     logger.info("Vision system initialized successfully")
     return detector, preprocessor, tracker
@@ -123,6 +166,7 @@ def main():
     """
     Main application loop
     """
+    settings.create_directories()
     logger = setup_logging()
     logger.info("=" * 50)
     logger.info("RoboMaster EP Core - AI Object Detection and Sorting")
@@ -133,24 +177,38 @@ def main():
         settings.validate_settings()
         logger.info(f"Configuration validated. Target objects: {settings.OBJECT_CLASSES}")
 
-        # Initialize robot
-        connection, movement, camera, gripper = initialize_robot()
+        # Robot connection + camera bring-up and model load + warm-up are independent,
+        # so run them concurrently
+        startup_start = time.perf_counter()
+        startup = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+        vision_future = startup.submit(initialize_vision)
+        robot_future = startup.submit(initialize_robot_and_camera)
+        startup.shutdown(wait=False)
+
+        connection, movement, camera, gripper = robot_future.result()
         if not connection:
             logger.error("Failed to initialize robot. Exiting.")
+            # The model load cannot be interrupted once started and its thread keeps the
+            # process alive, so let it finish here instead of hanging silently at exit
+            if not vision_future.cancel():
+                logger.info("Waiting for the vision system to finish loading before exiting...")
+                error = vision_future.exception()
+                if error is not None:
+                    logger.debug(f"Vision initialization also failed: {error}")
             return 1
+        logger.info(f"Robot and camera ready after {time.perf_counter() - startup_start:.2f}s")
 
-        # Initialize vision system
-        detector, preprocessor, tracker = initialize_vision()
+        try:
+            detector, preprocessor, tracker = vision_future.result()
+        except Exception:
+            camera.stop_stream()
+            connection.disconnect()
+            raise
+        logger.info(f"Vision system ready after {time.perf_counter() - startup_start:.2f}s")
 
         # Initialize sorting system
         sorting_controller = initialize_sorting(connection.robot)
 
-        # Start camera stream
-        logger.info("Starting camera stream...")
-        if not camera.start_stream(display=False):
-            logger.error("Failed to start camera stream")
-            return 1
-
         # Main application loop
         logger.info("=" * 50)
         logger.info("Starting main detection and sorting loop")
@@ -158,10 +216,27 @@ def main():
         logger.info("=" * 50)
 
         import cv2
-        import time
+        import numpy as np
 
         frame_count = 0
-        detection_interval = 30  # Detect every 30 frames to reduce processing load
+        first_detection_time = None
+        # Detect every Nth frame; the tracker predicts the boxes of the frames in between
+        detection_interval = settings.DETECTION_INTERVAL
+        last_result_time = 0.0
+        stale_until_frame = 0  # Results for frames up to this one predate the last robot move
+        detections = []
+        display_frame = None  # Reused drawing buffer (frames handed to the worker are never drawn on)
+
+        # Preprocessing and detection run on a worker thread so the camera loop never
+        # blocks on inference; a frame still waiting when a newer one arrives is dropped
+        async_detector = AsyncDetector(detector, preprocess=preprocessor.preprocess_for_detection).start()
+
+        # Skip detection while the robot keeps looking at an unchanged scene
+        scene_gate = None
+        if settings.SCENE_GATE_ENABLED:
+            scene_gate = SceneChangeGate(threshold=settings.SCENE_CHANGE_THRESHOLD,
+                                         pixel_threshold=settings.SCENE_GATE_PIXEL_THRESHOLD,
+                                         max_age=settings.SCENE_GATE_MAX_AGE)
 
         try:
             while True:
@@ -174,48 +249,70 @@ def main():
 
                 frame_count += 1
 
-                # Only run detection every N frames
+                # 2. Only submit every N frames for preprocessing + detection (non-blocking)
                 if frame_count % detection_interval == 0:
-                    logger.info(f"Processing frame {frame_count}...")
-
-                    # 2. Preprocess image (optional - can improve detection)
-                    processed = preprocessor.preprocess_for_detection(frame)
-
-                    # 3. Detect objects
-                    detections = detector.detect_objects(processed)
-
-                    if detections:
-                        logger.info(f"Found {len(detections)} objects")
-
-                        # Filter for target classes only
-                        target_detections = [
-                            obj for obj in detections
-                            if obj.class_name in settings.OBJECT_CLASSES
-                        ]
-
-                        if target_detections:
-                            logger.info(f"Found {len(target_detections)} target objects")
-
-                            # Sort the first detected target object
-                            # (In production, you might want to sort all or prioritize)
-                            obj_to_sort = target_detections[0]
-                            logger.info(f"Attempting to sort: {obj_to_sort}")
-
-                            if sorting_controller.sort_object(obj_to_sort):
-                                logger.info("Object sorted successfully!")
-                            else:
-                                logger.warning("Failed to sort object")
-
-                            # Show statistics
-                            stats = sorting_controller.get_sorting_statistics()
-                            logger.info(f"Statistics: {stats}")
+                    if scene_gate is None or scene_gate.should_detect(frame):
+                        logger.debug(f"Processing frame {frame_count}...")
+                        async_detector.submit(frame, frame_id=frame_count)
+                    else:
+                        logger.debug(f"Scene unchanged ({scene_gate.last_change:.3f}), "
+                                     f"reusing previous detections")
+
+                # 3. Pick up a finished result (detector only reports settings.OBJECT_CLASSES)
+                result = async_detector.get_latest()
+                new_result = (result is not None and result.timestamp > last_result_time
+                              and result.frame_id > stale_until_frame)
+                if settings.TRACKING_ENABLED and not new_result:
+                    tracker.predict(frame)  # No detection for this frame: move boxes along their motion
+
+                if new_result:
+                    last_result_time = result.timestamp
+                    detections = result.detections
+                    if first_detection_time is None:
+                        first_detection_time = time.perf_counter() - startup_start
+                        logger.info(f"Time to first detection: {first_detection_time:.2f}s")
+                    logger.debug(f"Detection for frame {result.frame_id} took {result.latency * 1000:.0f}ms")
+
+                    # Keep object ids stable across detections
+                    if settings.TRACKING_ENABLED:
+                        # The result belongs to an older frame: the flow carries it forward to this one
+                        tracked = tracker.update(detections, timestamp=result.timestamp, frame=frame,
+                                                 detection_frame=result.frame)
+                        logger.debug(f"Tracked objects: {tracked}")
 
-                # Optional: Display frame with detections (for debugging)
-                if settings.ENABLE_VISUALIZATION and frame_count % detection_interval == 0:
                     if detections:
-                        vis_frame = detector.draw_detections(frame, detections)
-                        cv2.imshow("Detection", vis_frame)
-                        cv2.waitKey(1)
+                        logger.info(f"Found {len(detections)} target objects")
+
+                        # Sort the highest-priority target (zones and priorities of
+                        # all detections come from one batched strategy call)
+                        obj_to_sort, zone_name = sorting_controller.prioritize(detections)[0]
+                        logger.info(f"Attempting to sort: {obj_to_sort}")
+
+                        if sorting_controller.sort_object(obj_to_sort, zone_name):
+                            logger.info("Object sorted successfully!")
+                        else:
+                            logger.warning("Failed to sort object")
+
+                        # The robot moved, so the next frame must be detected again
+                        # and earlier boxes no longer line up with the view. Frames
+                        # submitted before the move may still finish: ignore them
+                        stale_until_frame = frame_count
+                        if scene_gate is not None:
+                            scene_gate.reset()
+                        tracker.reset()
+
+                        # Show statistics
+                        stats = sorting_controller.get_sorting_statistics()
+                        logger.info(f"Statistics: {stats}")
+
+                # Optional: Display every frame with detected or predicted boxes (for debugging)
+                if settings.ENABLE_VISUALIZATION:
+                    boxes = tracker.get_detections() if settings.TRACKING_ENABLED else detections
+                    if display_frame is None or display_frame.shape != frame.shape:
+                        display_frame = np.empty_like(frame)
+                    vis_frame = detector.draw_detections(frame, boxes, out=display_frame)
+                    cv2.imshow("Detection", vis_frame)
+                    cv2.waitKey(1)
 
                 # Small delay to prevent overload
                 time.sleep(0.033)  # ~30 FPS
@@ -226,6 +323,10 @@ def main():
         finally:
             # Cleanup
             logger.info("Shutting down...")
+            async_detector.stop()
+            if scene_gate is not None:
+                logger.info(f"Scene gate: {scene_gate.get_stats()}")
+            logger.info(f"Detection cache: {detector.get_cache_stats()}")
             if settings.ENABLE_VISUALIZATION:
                 cv2.destroyAllWindows()
             camera.stop_stream()
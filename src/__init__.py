@@ -1,6 +1,22 @@
 """
 RoboMaster EP Core AI Detection and Sorting Project
 Main source package
+
+Subpackages (robot_control, vision, sorting) are imported on first access.
 """
 
+import importlib
+
 __version__ = "0.1.0"
+
+_SUBPACKAGES = ('robot_control', 'vision', 'sorting')
+
+
+def __getattr__(name):
+    if name not in _SUBPACKAGES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f".{name}", __name__)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBPACKAGES))
@@ -1,18 +1,32 @@
 """
 Robot Control Module
 Handles all robot connection, movement, camera, and gripper operations
+
+Submodules are imported on first attribute access (PEP 562), so importing the
+package does not load the RoboMaster SDK or OpenCV until they are needed.
 """
 
-from .connection import RobotConnection
-from .movement import RobotMovement
-from .camera import RobotCamera
-from .gripper import RobotGripper
-from .threaded_camera import ThreadedCamera
-
-__all__ = [
-    'RobotConnection',
-    'RobotMovement',
-    'RobotCamera',
-    'RobotGripper',
-    'ThreadedCamera'
-]
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'RobotConnection': 'connection',
+    'RobotMovement': 'movement',
+    'RobotCamera': 'camera',
+    'RobotGripper': 'gripper',
+    'ThreadedCamera': 'threaded_camera',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -107,6 +107,34 @@ class RobotCamera:
             logger.error(f"Failed to get frame: {e}")
             return None
 
+    def wait_for_frame(self, timeout: float = 5.0) -> Optional[np.ndarray]:
+        """
+        Wait until the stream delivers its first frame
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Optional[np.ndarray]: First frame received, None on timeout
+        """
+        if not self.is_streaming or not self.camera:
+            logger.warning("Camera stream not running. Call start_stream() first.")
+            return None
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                frame = self.camera.read_cv2_image(timeout=max(0.1, deadline - time.monotonic()))
+                if frame is not None:
+                    self.current_frame = frame
+                    return frame
+            except Exception:
+                pass  # Stream not producing frames yet
+            time.sleep(0.01)
+
+        logger.warning(f"No camera frame received within {timeout:.1f}s")
+        return None
+
     def capture_image(self, save_path: Optional[str] = None) -> Optional[np.ndarray]:
         """
         Capture a single image from the camera
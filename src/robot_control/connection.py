@@ -5,7 +5,6 @@ Handles connecting and disconnecting from the RoboMaster EP Core
 
 from typing import Optional
 import logging
-from robomaster import robot
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +33,9 @@ class RobotConnection:
         try:
             logger.info(f"Attempting to connect to robot using {conn_type} mode...")
 
+            # Imported here so the SDK is only loaded when a robot is actually used
+            from robomaster import robot
+
             # Create robot instance
             self.robot = robot.Robot()
 
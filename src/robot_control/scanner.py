@@ -5,8 +5,10 @@ Robot Scanner Module
 
 import time
 import logging
-from typing import List
+from typing import List, Optional
 from ..vision.detection import DetectedObject
+from ..vision.object_map import MapObject, ObjectMap, Pose
+from ..vision.tracking import ObjectTracker
 
 logger = logging.getLogger(__name__)
 
@@ -14,9 +16,15 @@ logger = logging.getLogger(__name__)
 class RobotScanner:
     """
     Handles 360-degree scanning and object detection
+
+    Every scan also feeds an ObjectMap in world coordinates. The scanner keeps
+    the robot's pose up to date with its own rotations; callers that move the
+    robot otherwise report the new pose with set_pose(). Later passes can then
+    ask known_objects() instead of scanning again.
     """
 
-    def __init__(self, robot, camera, detector):
+    def __init__(self, robot, camera, detector, horizontal_fov: float = 60.0,
+                 object_map: Optional[ObjectMap] = None):
         """
         Initialize scanner
 
@@ -24,11 +32,47 @@ class RobotScanner:
             robot: Connected robot instance
             camera: Camera instance (can be ThreadedCamera)
             detector: ObjectDetector instance
+            horizontal_fov: Camera horizontal field of view in degrees
+            object_map: Map to record the scans in (default: a new one for this FOV)
         """
         self.robot = robot
         self.camera = camera
         self.detector = detector
+        self.horizontal_fov = horizontal_fov
         self.chassis = robot.chassis if robot else None
+        self.object_map = object_map if object_map is not None else ObjectMap(horizontal_fov=horizontal_fov)
+        self.pose: Pose = (0.0, 0.0, 0.0)  # (x, y, heading) in the map's world frame
+
+    def set_pose(self, x: float, y: float, heading: float):
+        """
+        Set the robot's pose in the map's world frame (e.g. from odometry)
+
+        Args:
+            x: Meters forward of the start position
+            y: Meters left of the start position
+            heading: Degrees, counter-clockwise from the start heading
+        """
+        self.pose = (x, y, heading)
+
+    def _rotate(self, angle: float, speed: float = 45) -> bool:
+        """
+        Rotate the chassis and keep the pose's heading up to date
+
+        Args:
+            angle: Degrees (chassis.move z, positive = counter-clockwise)
+            speed: Rotation speed in degrees per second
+
+        Returns:
+            bool: True if the rotation completed
+        """
+        try:
+            self.chassis.move(x=0, y=0, z=angle, z_speed=speed).wait_for_completed()
+        except Exception as e:
+            logger.error(f"Failed to rotate: {e}")
+            return False
+        x, y, heading = self.pose
+        self.pose = (x, y, heading + angle)
+        return True
 
     def scan_360(self, steps: int = 8, target_classes: List[str] = None) -> List[DetectedObject]:
         """
@@ -47,9 +91,10 @@ class RobotScanner:
 
         logger.info(f"Starting 360° scan with {steps} positions...")
 
-        all_detections = []
         angle_per_step = 360.0 / steps
-        seen_objects = set()  # Track unique objects by position
+        frames = []
+        frame_ids = []
+        headings = []  # Robot heading of each frame
 
         for i in range(steps):
             logger.info(f"Scan position {i+1}/{steps} ({i*angle_per_step:.0f}°)")
@@ -57,43 +102,21 @@ class RobotScanner:
             # Wait for camera to stabilize
             time.sleep(0.5)
 
-            # Get frame
-            frame = None
-            if hasattr(self.camera, 'read'):
-                # ThreadedCamera
-                frame = self.camera.read()
-            else:
-                # Regular camera
-                frame = self.camera.get_frame()
-
+            # Get frame (detection runs batched once all positions are captured)
+            frame_id, frame = self._get_frame()
             if frame is None:
                 logger.warning(f"No frame at position {i+1}")
-                continue
-
-            # Detect objects
-            detections = self.detector.detect_objects(frame)
-
-            # Filter by target classes if specified
-            if target_classes:
-                detections = [d for d in detections if d.class_name in target_classes]
-
-            # Add unique detections
-            for det in detections:
-                # Simple uniqueness check based on class and approximate position
-                obj_key = f"{det.class_name}_{det.center[0]//50}_{det.center[1]//50}"
-
-                if obj_key not in seen_objects:
-                    seen_objects.add(obj_key)
-                    all_detections.append(det)
-                    logger.info(f"  Found: {det.class_name} (conf: {det.confidence:.2f})")
+            else:
+                frames.append(frame)
+                frame_ids.append(frame_id)
+                headings.append(self.pose[2])
 
             # Rotate to next position (except on last step)
             if i < steps - 1:
                 logger.debug(f"Rotating {angle_per_step:.0f}° to next position...")
-                try:
-                    self.chassis.move(x=0, y=0, z=angle_per_step, z_speed=45).wait_for_completed()
-                except Exception as e:
-                    logger.error(f"Failed to rotate: {e}")
+                self._rotate(angle_per_step)
+
+        all_detections = self._detect_unique(frames, frame_ids, headings, target_classes)
 
         logger.info(f"Scan complete! Found {len(all_detections)} unique objects")
         return all_detections
@@ -117,65 +140,46 @@ class RobotScanner:
 
         logger.info(f"Scanning {angle_range}° range with {steps} positions...")
 
-        all_detections = []
         angle_per_step = angle_range / (steps - 1) if steps > 1 else 0
         start_angle = -angle_range / 2  # Start from left
 
         # Rotate to start position
+        center_heading = self.pose[2]
         logger.info(f"Rotating to start position ({start_angle:.0f}°)")
-        try:
-            self.chassis.move(x=0, y=0, z=start_angle, z_speed=45).wait_for_completed()
-        except Exception as e:
-            logger.error(f"Failed to rotate to start: {e}")
+        if not self._rotate(start_angle):
+            logger.error("Failed to rotate to start")
             return []
 
         time.sleep(1)
 
         # Scan
-        seen_objects = set()
+        frames = []
+        frame_ids = []
+        headings = []
         for i in range(steps):
             logger.info(f"Scan position {i+1}/{steps}")
 
             time.sleep(0.5)
 
             # Get frame
-            frame = None
-            if hasattr(self.camera, 'read'):
-                frame = self.camera.read()
-            else:
-                frame = self.camera.get_frame()
-
+            frame_id, frame = self._get_frame()
             if frame is None:
                 logger.warning(f"No frame at position {i+1}")
-                continue
-
-            # Detect
-            detections = self.detector.detect_objects(frame)
-
-            if target_classes:
-                detections = [d for d in detections if d.class_name in target_classes]
-
-            for det in detections:
-                obj_key = f"{det.class_name}_{det.center[0]//50}_{det.center[1]//50}"
-                if obj_key not in seen_objects:
-                    seen_objects.add(obj_key)
-                    all_detections.append(det)
-                    logger.info(f"  Found: {det.class_name} (conf: {det.confidence:.2f})")
+            else:
+                frames.append(frame)
+                frame_ids.append(frame_id)
+                headings.append(self.pose[2])
 
             # Rotate to next position
             if i < steps - 1:
-                try:
-                    self.chassis.move(x=0, y=0, z=angle_per_step, z_speed=45).wait_for_completed()
-                except Exception as e:
-                    logger.error(f"Failed to rotate: {e}")
+                self._rotate(angle_per_step)
+
+        all_detections = self._detect_unique(frames, frame_ids, headings, target_classes)
 
         # Return to center
         logger.info("Returning to center position")
-        return_angle = -(start_angle + angle_per_step * (steps - 1))
-        try:
-            self.chassis.move(x=0, y=0, z=return_angle, z_speed=45).wait_for_completed()
-        except Exception as e:
-            logger.error(f"Failed to return to center: {e}")
+        if not self._rotate(center_heading - self.pose[2]):
+            logger.error("Failed to return to center")
 
         logger.info(f"Area scan complete! Found {len(all_detections)} unique objects")
         return all_detections
@@ -193,24 +197,113 @@ class RobotScanner:
         logger.info("Quick scan (current view only)...")
 
         # Get frame
-        frame = None
-        if hasattr(self.camera, 'read'):
-            frame = self.camera.read()
-        else:
-            frame = self.camera.get_frame()
+        frame_id, frame = self._get_frame()
 
         if frame is None:
             logger.error("No frame available")
             return []
 
-        # Detect
-        detections = self.detector.detect_objects(frame)
+        # Detect (only target classes, if specified)
+        detections = self.detector.detect_objects(frame, classes=target_classes or None,
+                                                  frame_id=frame_id)
 
-        if target_classes:
-            detections = [d for d in detections if d.class_name in target_classes]
+        height, width = frame.shape[:2]
+        self.object_map.add_detections(detections, (width, height), self.pose)
 
         logger.info(f"Found {len(detections)} objects in current view")
         for det in detections:
             logger.info(f"  - {det.class_name} (conf: {det.confidence:.2f})")
 
         return detections
+
+    def known_objects(self, target_classes: List[str] = None,
+                      max_age: Optional[float] = None) -> List[MapObject]:
+        """
+        Objects remembered from earlier scans, without moving or detecting
+
+        Args:
+            target_classes: Optional list of classes to filter for
+            max_age: Only objects seen within this many seconds
+
+        Returns:
+            List[MapObject]: Known objects, smallest turn from the current heading first
+        """
+        known = self.object_map.query(target_classes or None, max_age=max_age)
+        return sorted(known, key=lambda map_object: abs(map_object.bearing(self.pose)))
+
+    def face_object(self, map_object: MapObject) -> bool:
+        """
+        Turn the robot towards a known object
+
+        Args:
+            map_object: Object from the map
+
+        Returns:
+            bool: True if the rotation completed
+        """
+        if not self.chassis:
+            logger.error("Chassis not available - cannot turn")
+            return False
+        bearing = map_object.bearing(self.pose)
+        logger.info(f"Turning {bearing:.0f}° towards {map_object}")
+        return self._rotate(bearing)
+
+    def _get_frame(self):
+        """
+        Read the latest frame from either camera type
+
+        Returns:
+            tuple: (frame sequence number or None, latest frame or None)
+        """
+        if hasattr(self.camera, 'read_with_id'):
+            # ThreadedCamera
+            return self.camera.read_with_id()
+        # Regular camera (every read is a new frame, no sequence number)
+        return None, self.camera.get_frame()
+
+    def _detect_unique(self, frames: List, frame_ids: List, headings: List[float],
+                       target_classes: List[str] = None) -> List[DetectedObject]:
+        """
+        Run batched detection over the captured scan frames and deduplicate results
+
+        Neighboring scan positions overlap, so an object near the edge of the
+        view is seen twice. The detections are tracked from position to
+        position, with the tracks moved by each chassis rotation in between;
+        an object keeps its track across the turn and is reported once. All
+        detections are also recorded in the object map at their heading.
+
+        Args:
+            frames: Frames captured at each scan position
+            frame_ids: Camera sequence numbers of the frames (detection cache keys)
+            headings: Robot heading of each frame in degrees (same sign as chassis.move z)
+            target_classes: Optional list of classes to filter for
+
+        Returns:
+            List[DetectedObject]: Unique detected objects (the most confident view of each)
+        """
+        if not frames:
+            return []
+
+        height, width = frames[0].shape[:2]
+        tracker = ObjectTracker(max_disappeared=len(frames), horizontal_fov=self.horizontal_fov)
+        x, y, _ = self.pose
+        unique = {}  # Track id -> most confident detection, in order of discovery
+
+        # Target classes are filtered inside the detector, before NMS
+        batch = self.detector.detect_objects_batch(frames, classes=target_classes or None,
+                                                   frame_ids=frame_ids)
+        for index, detections in enumerate(batch):
+            if index:
+                tracker.apply_ego_motion((width, height), yaw=headings[index] - headings[index - 1])
+            tracker.update(detections)
+            self.object_map.add_detections(detections, (width, height), (x, y, headings[index]))
+
+            confidences = detections.confidence.tolist()
+            for object_id, col in tracker.last_matches.items():
+                best = unique.get(object_id)
+                if best is None or confidences[col] > best.confidence:
+                    det = unique[object_id] = detections[col]
+                    if best is None:
+                        logger.info(f"  Found: {det.class_name} (conf: {det.confidence:.2f})")
+
+        return list(unique.values())
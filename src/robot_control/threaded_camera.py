@@ -29,14 +29,15 @@ class ThreadedCamera:
         self.lock = threading.Lock()
         self.thread = None
         self.frame_count = 0
+        self.first_frame = threading.Event()
 
     def start(self):
         """Start background thread for frame reading"""
         logger.info("Starting threaded camera reader...")
         self.stopped = False
+        self.first_frame.clear()  # After a restart, wait for a frame of the new stream
         self.thread = threading.Thread(target=self._update, daemon=True)
         self.thread.start()
-        time.sleep(0.5)  # Give thread time to start
         logger.info("Threaded camera reader started")
         return self
 
@@ -57,6 +58,7 @@ class ThreadedCamera:
                     with self.lock:
                         self.frame = frame
                         self.frame_count += 1
+                    self.first_frame.set()
 
             except Exception as e:
                 logger.error(f"Error reading frame in background thread: {e}")
@@ -76,6 +78,34 @@ class ThreadedCamera:
         with self.lock:
             return self.frame
 
+    def read_with_id(self):
+        """
+        Get the latest available frame together with its sequence number
+
+        The sequence number only changes when a new frame arrives, so it can be
+        used as a cache key to avoid running detection twice on the same frame.
+
+        Returns:
+            tuple: (frame sequence number, latest frame or None)
+        """
+        with self.lock:
+            return self.frame_count, self.frame
+
+    def wait_for_frame(self, timeout: float = 5.0) -> bool:
+        """
+        Block until the first frame has been received
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            bool: True if a frame is available, False on timeout
+        """
+        if not self.first_frame.wait(timeout):
+            logger.warning(f"No camera frame received within {timeout:.1f}s")
+            return False
+        return True
+
     def stop(self):
         """Stop the background thread"""
         logger.info("Stopping threaded camera reader...")
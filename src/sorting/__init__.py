@@ -1,17 +1,32 @@
 """
 Sorting Module
 Handles object sorting logic and strategies
+
+Submodules are imported on first attribute access (PEP 562).
 """
 
-from .logic import SortingController
-from .strategy import SortingStrategy, ClassBasedStrategy, SizeBasedStrategy
-from .zones import SortingZone, ZoneManager
-
-__all__ = [
-    'SortingController',
-    'SortingStrategy',
-    'ClassBasedStrategy',
-    'SizeBasedStrategy',
-    'SortingZone',
-    'ZoneManager'
-]
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'SortingController': 'logic',
+    'SortingStrategy': 'strategy',
+    'ClassBasedStrategy': 'strategy',
+    'SizeBasedStrategy': 'strategy',
+    'SortingZone': 'zones',
+    'ZoneManager': 'zones',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
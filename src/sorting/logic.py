@@ -3,8 +3,9 @@ Sorting Logic Module
 Main controller for object sorting operations
 """
 
-from typing import List, Optional
-from ..vision.detection import DetectedObject
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+from ..vision.detection import DetectedObject, DetectionSet
 from .strategy import SortingStrategy
 from .zones import ZoneManager
 import logging
@@ -40,12 +41,37 @@ class SortingController:
         self.strategy = strategy
         logger.info(f"Set sorting strategy to {strategy.__class__.__name__}")
 
-    def sort_object(self, detected_object: DetectedObject) -> bool:
+    def prioritize(self, detections: Iterable[DetectedObject]) -> List[Tuple[DetectedObject, str]]:
+        """
+        Order objects for sorting and determine their target zones
+
+        Zones and priorities of all objects come from one batched strategy call
+        each (determine_zones/get_priorities) instead of one call per object.
+
+        Args:
+            detections: Objects to sort (DetectionSet or list of DetectedObject)
+
+        Returns:
+            List[Tuple[DetectedObject, str]]: (object, zone name), highest priority
+                                              first (ties keep the detection order)
+        """
+        if not self.strategy:
+            logger.error("No sorting strategy set")
+            return []
+
+        detections = DetectionSet.from_objects(detections)
+        zones = self.strategy.determine_zones(detections)
+        order = np.argsort(-self.strategy.get_priorities(detections), kind="stable")
+        return [(detections[index], zones[index]) for index in order.tolist()]
+
+    def sort_object(self, detected_object: DetectedObject, zone_name: Optional[str] = None) -> bool:
         """
         Sort a single detected object
 
         Args:
             detected_object: Object to sort
+            zone_name: Target zone if already known (e.g. from prioritize()),
+                       otherwise determined by the strategy
 
         Returns:
             bool: True if sorting successful
@@ -58,7 +84,8 @@ class SortingController:
             logger.info(f"Sorting object: {detected_object}")
 
             # 1. Determine target zone using strategy
-            zone_name = self.strategy.determine_zone(detected_object)
+            if zone_name is None:
+                zone_name = self.strategy.determine_zone(detected_object)
             zone = self.zone_manager.get_zone(zone_name)
 
             if not zone:
@@ -100,20 +127,19 @@ class SortingController:
 
     def sort_objects_batch(self, detected_objects: List[DetectedObject]) -> int:
         """
-        Sort multiple detected objects
+        Sort multiple detected objects, highest priority first
 
         Args:
-            detected_objects: List of objects to sort
+            detected_objects: Objects to sort (DetectionSet or list of DetectedObject)
 
         Returns:
             int: Number of successfully sorted objects
         """
-        # TODO: Implement batch sorting
         logger.info(f"Sorting batch of {len(detected_objects)} objects")
         sorted_count = 0
 
-        for obj in detected_objects:
-            if self.sort_object(obj):
+        for obj, zone_name in self.prioritize(detected_objects):
+            if self.sort_object(obj, zone_name):
                 sorted_count += 1
 
         return sorted_count
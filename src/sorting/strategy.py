@@ -4,8 +4,9 @@ Defines different strategies for sorting objects
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
-from ..vision.detection import DetectedObject
+from typing import Iterable, List, Optional
+import numpy as np
+from ..vision.detection import DetectedObject, DetectionSet
 import logging
 
 logger = logging.getLogger(__name__)
@@ -42,6 +43,33 @@ class SortingStrategy(ABC):
         """
         pass
 
+    def determine_zones(self, detections: Iterable[DetectedObject]) -> List[str]:
+        """
+        Determine target zones for several objects at once
+
+        Subclasses override this with a vectorized version working on the
+        DetectionSet arrays.
+
+        Args:
+            detections: Objects to sort (DetectionSet or list of DetectedObject)
+
+        Returns:
+            List[str]: Target zone name for each object, in order
+        """
+        return [self.determine_zone(det) for det in detections]
+
+    def get_priorities(self, detections: Iterable[DetectedObject]) -> np.ndarray:
+        """
+        Get sorting priorities for several objects at once
+
+        Args:
+            detections: Objects to evaluate (DetectionSet or list of DetectedObject)
+
+        Returns:
+            np.ndarray: Priority value for each object, in order
+        """
+        return np.array([self.get_priority(det) for det in detections], dtype=np.int64)
+
 
 class ClassBasedStrategy(SortingStrategy):
     """
@@ -88,6 +116,34 @@ class ClassBasedStrategy(SortingStrategy):
         """
         return 1
 
+    def determine_zones(self, detections: Iterable[DetectedObject]) -> List[str]:
+        """
+        Determine zones from class ids, resolving each distinct class only once
+
+        Args:
+            detections: Objects to sort
+
+        Returns:
+            List[str]: Target zone name for each object
+        """
+        detections = DetectionSet.from_objects(detections)
+        unique_ids, inverse = np.unique(detections.class_ids, return_inverse=True)
+        zones = [self.class_zone_mapping.get(detections.class_names[int(class_id)], "zone_default")
+                 for class_id in unique_ids]
+        return [zones[i] for i in inverse.reshape(-1).tolist()]
+
+    def get_priorities(self, detections: Iterable[DetectedObject]) -> np.ndarray:
+        """
+        All objects have equal priority in class-based sorting
+
+        Args:
+            detections: Objects to evaluate
+
+        Returns:
+            np.ndarray: Priority values (all 1)
+        """
+        return np.ones(len(DetectionSet.from_objects(detections)), dtype=np.int64)
+
     def add_class_mapping(self, class_name: str, zone_name: str):
         """
         Add or update a class to zone mapping
@@ -157,6 +213,37 @@ class SizeBasedStrategy(SortingStrategy):
             return 2
         return 1
 
+    def determine_zones(self, detections: Iterable[DetectedObject]) -> List[str]:
+        """
+        Determine zones from the bounding box areas of all objects at once
+
+        Args:
+            detections: Objects to sort
+
+        Returns:
+            List[str]: Target zone name for each object
+        """
+        zone_names = np.array(["zone_small", "zone_medium", "zone_large"])
+        return zone_names[self._size_bins(detections)].tolist()
+
+    def get_priorities(self, detections: Iterable[DetectedObject]) -> np.ndarray:
+        """
+        Smaller objects get higher priority
+
+        Args:
+            detections: Objects to evaluate
+
+        Returns:
+            np.ndarray: Priority values (1-3, higher for smaller objects)
+        """
+        return 3 - self._size_bins(detections)
+
+    def _size_bins(self, detections: Iterable[DetectedObject]) -> np.ndarray:
+        """Get size bin per object (0 = small, 1 = medium, 2 = large)"""
+        areas = DetectionSet.from_objects(detections).areas
+        thresholds = [self.size_thresholds["small"], self.size_thresholds["medium"]]
+        return np.searchsorted(thresholds, areas, side="right").astype(np.int64)
+
 
 class ConfidenceBasedStrategy(SortingStrategy):
     """
@@ -202,3 +289,30 @@ class ConfidenceBasedStrategy(SortingStrategy):
             int: Priority value based on confidence
         """
         return int(detected_object.confidence * 10)
+
+    def determine_zones(self, detections: Iterable[DetectedObject]) -> List[str]:
+        """
+        Determine zones from the confidence scores of all objects at once
+
+        Args:
+            detections: Objects to sort
+
+        Returns:
+            List[str]: Target zone name for each object
+        """
+        confidence = DetectionSet.from_objects(detections).confidence.astype(np.float64)
+        return np.where(confidence >= self.confidence_threshold,
+                        "zone_high_confidence", "zone_low_confidence").tolist()
+
+    def get_priorities(self, detections: Iterable[DetectedObject]) -> np.ndarray:
+        """
+        Higher confidence objects get higher priority
+
+        Args:
+            detections: Objects to evaluate
+
+        Returns:
+            np.ndarray: Priority values based on confidence
+        """
+        confidence = DetectionSet.from_objects(detections).confidence
+        return (confidence.astype(np.float64) * 10).astype(np.int64)
@@ -1,14 +1,35 @@
 """
 Vision Module
 Handles AI-based object detection, image preprocessing, and object tracking
+
+Submodules are imported on first attribute access (PEP 562), so importing the
+package does not pull in OpenCV or a model runtime until they are needed.
 """
 
-from .detection import ObjectDetector
-from .preprocessing import ImagePreprocessor
-from .tracking import ObjectTracker
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'ObjectDetector': 'detection',
+    'ImagePreprocessor': 'preprocessing',
+    'ObjectTracker': 'tracking',
+    'AsyncDetector': 'async_detector',
+    'DetectionResult': 'async_detector',
+    'SceneChangeGate': 'scene_gate',
+    'SpatialHash': 'spatial_index',
+    'ObjectMap': 'object_map',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
 
-__all__ = [
-    'ObjectDetector',
-    'ImagePreprocessor',
-    'ObjectTracker'
-]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
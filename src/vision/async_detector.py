@@ -0,0 +1,250 @@
+"""
+Asynchronous Detection Module
+Runs ObjectDetector on a background worker so motion and inference overlap
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, NamedTuple
+import numpy as np
+import logging
+
+from .detection import ObjectDetector, DetectionSet
+
+logger = logging.getLogger(__name__)
+
+
+class DetectionResult(NamedTuple):
+    """Detections for one frame, as published by AsyncDetector"""
+    frame_id: Optional[int]
+    detections: DetectionSet
+    timestamp: float        # time.time() when inference finished
+    latency: float          # Seconds from submission to result
+    frame: Optional[np.ndarray] = None  # Frame the detections were computed on (before preprocessing)
+
+
+class _Request:
+    """A frame waiting for the worker"""
+
+    __slots__ = ("frame", "frame_id", "classes", "future", "submitted")
+
+    def __init__(self, frame, frame_id, classes, future):
+        self.frame = frame
+        self.frame_id = frame_id
+        self.classes = classes
+        self.future = future
+        self.submitted = time.perf_counter()
+
+
+class AsyncDetector:
+    """
+    Background detection worker with latest-frame semantics
+
+    Only the newest frame is ever waiting for inference: submitting a frame
+    while another is still pending cancels the older request instead of
+    queueing it. With a camera attached the worker also pulls the newest
+    camera frame whenever it is idle, so get_latest() always reflects the
+    freshest frame the detector could keep up with.
+    """
+
+    def __init__(self, detector: ObjectDetector, camera=None,
+                 classes: Optional[List[str]] = None,
+                 preprocess: Optional[Callable[[np.ndarray], np.ndarray]] = None):
+        """
+        Initialize the asynchronous detector
+
+        Args:
+            detector: Loaded ObjectDetector used for inference
+            camera: Optional ThreadedCamera to follow (read_with_id() or read())
+            classes: Class names to detect (None = detector's target classes)
+            preprocess: Optional function applied to each frame on the worker thread
+        """
+        self.detector = detector
+        self.camera = camera
+        self.classes = classes
+        self.preprocess = preprocess
+
+        self._pending: Optional[_Request] = None
+        self._latest: Optional[DetectionResult] = None
+        self._last_camera_id = None
+        self._condition = threading.Condition()
+        self._stopped = True
+        self._thread = None
+
+        self.processed_count = 0
+        self.dropped_count = 0
+        self.error_count = 0
+
+    def start(self):
+        """Start the background worker thread"""
+        if self.is_running():
+            return self
+
+        logger.info("Starting asynchronous detector...")
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the worker thread, cancelling any pending request"""
+        logger.info("Stopping asynchronous detector...")
+        with self._condition:
+            self._stopped = True
+            if self._pending is not None:
+                self._pending.future.cancel()
+                self._pending = None
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+        logger.info(f"Asynchronous detector stopped ({self.processed_count} processed, "
+                    f"{self.dropped_count} stale frames dropped)")
+
+    def is_running(self) -> bool:
+        """Check if the worker thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, frame: np.ndarray, frame_id: Optional[int] = None,
+               classes: Optional[List[str]] = None) -> Future:
+        """
+        Queue a frame for detection, replacing any frame still waiting
+
+        Args:
+            frame: Input image as numpy array
+            frame_id: Optional frame sequence number (used by the detection cache)
+            classes: Class names to detect (None = this detector's classes)
+
+        Returns:
+            Future: Resolves to a DetectionResult, or is cancelled if a newer
+                    frame is submitted before this one starts
+        """
+        future = Future()
+        request = _Request(frame, frame_id, classes if classes is not None else self.classes, future)
+
+        with self._condition:
+            if self._stopped:
+                future.set_exception(RuntimeError("AsyncDetector is not running"))
+                return future
+
+            if self._pending is not None:
+                self._pending.future.cancel()
+                self.dropped_count += 1
+            self._pending = request
+            self._condition.notify()
+
+        return future
+
+    def get_latest(self) -> Optional[DetectionResult]:
+        """
+        Get the most recent detection result without blocking
+
+        Returns:
+            Optional[DetectionResult]: Latest result, or None if nothing finished yet
+        """
+        with self._condition:
+            return self._latest
+
+    def wait_for_result(self, newer_than: Optional[float] = None,
+                        timeout: Optional[float] = None) -> Optional[DetectionResult]:
+        """
+        Block until a result newer than a given timestamp is available
+
+        Args:
+            newer_than: Result timestamp to wait past (None = any result)
+            timeout: Maximum seconds to wait (None = wait forever)
+
+        Returns:
+            Optional[DetectionResult]: The new result, or None on timeout
+        """
+        def is_newer():
+            return self._latest is not None and \
+                (newer_than is None or self._latest.timestamp > newer_than)
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: is_newer() or self._stopped, timeout):
+                return None
+            return self._latest if is_newer() else None
+
+    def get_stats(self) -> dict:
+        """
+        Get worker statistics
+
+        Returns:
+            dict: processed, dropped and failed frame counts and latest latency
+        """
+        with self._condition:
+            return {
+                "processed": self.processed_count,
+                "dropped": self.dropped_count,
+                "errors": self.error_count,
+                "last_latency": self._latest.latency if self._latest else None,
+            }
+
+    def _next_request(self) -> Optional[_Request]:
+        """
+        Wait for the next frame to process
+
+        Explicit submissions take priority; with a camera attached the newest
+        camera frame is used otherwise (frames already processed are skipped).
+        """
+        with self._condition:
+            while not self._stopped:
+                if self._pending is not None:
+                    request, self._pending = self._pending, None
+                    if request.future.set_running_or_notify_cancel():
+                        return request
+                    continue
+
+                if self.camera is not None:
+                    frame_id, frame = self._read_camera()
+                    if frame is not None and (frame_id is None or frame_id != self._last_camera_id):
+                        self._last_camera_id = frame_id
+                        future = Future()
+                        future.set_running_or_notify_cancel()
+                        return _Request(frame, frame_id, self.classes, future)
+                    # No new camera frame yet - poll again shortly
+                    self._condition.wait(timeout=0.01)
+                else:
+                    self._condition.wait()
+        return None
+
+    def _read_camera(self):
+        """Read the newest camera frame and its sequence number if available"""
+        if hasattr(self.camera, "read_with_id"):
+            return self.camera.read_with_id()
+        return None, self.camera.read()
+
+    def _run(self):
+        """Worker thread - runs detection on the newest frame"""
+        logger.info("Asynchronous detection worker running")
+
+        while True:
+            request = self._next_request()
+            if request is None:
+                break
+
+            try:
+                frame = self.preprocess(request.frame) if self.preprocess else request.frame
+                detections = self.detector.detect_objects(frame, classes=request.classes,
+                                                          frame_id=request.frame_id)
+                # Boxes in the coordinates of the submitted frame, even if preprocess resized it
+                detections = detections.rescale(frame.shape, request.frame.shape)
+            except Exception as e:
+                logger.error(f"Asynchronous detection failed: {e}")
+                with self._condition:
+                    self.error_count += 1
+                request.future.set_exception(e)
+                continue
+
+            result = DetectionResult(request.frame_id, detections, time.time(),
+                                     time.perf_counter() - request.submitted, request.frame)
+            with self._condition:
+                self._latest = result
+                self.processed_count += 1
+                self._condition.notify_all()
+            request.future.set_result(result)
+
+        logger.info("Asynchronous detection worker stopped")
@@ -0,0 +1,448 @@
+"""
+Inference Backends Module
+Pluggable model runtimes used by ObjectDetector (Ultralytics/PyTorch, ONNX Runtime CPU)
+"""
+
+import ast
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import logging
+from .buffers import BufferPool
+
+logger = logging.getLogger(__name__)
+
+# Default pre-trained model used when no model path is configured
+DEFAULT_MODEL = "yolov8n.pt"
+
+# Upper bounds used by the NMS step (same defaults as Ultralytics)
+MAX_DETECTIONS = 300
+MAX_NMS_CANDIDATES = 30000
+MAX_BOX_WH = 7680  # Class offset for batched class-aware NMS
+
+
+def letterbox(image: np.ndarray, new_shape: Tuple[int, int], color: int = 114,
+              out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """
+    Resize image keeping aspect ratio and pad it to new_shape
+
+    Args:
+        image: Input image as numpy array (H, W, 3)
+        new_shape: Target size as (height, width)
+        color: Padding value
+        out: Optional (height, width, 3) uint8 array to write into; the image is
+             resized straight into its interior and only the borders are filled
+
+    Returns:
+        tuple: (letterboxed image, scale gain, (pad_x, pad_y))
+    """
+    import cv2
+
+    height, width = image.shape[:2]
+    gain = min(new_shape[0] / height, new_shape[1] / width)
+    resized_w, resized_h = int(round(width * gain)), int(round(height * gain))
+    pad_x = (new_shape[1] - resized_w) / 2
+    pad_y = (new_shape[0] - resized_h) / 2
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+
+    if out is None:
+        if (width, height) != (resized_w, resized_h):
+            image = cv2.resize(image, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+        image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT,
+                                   value=(color, color, color))
+        return image, gain, (left, top)
+
+    interior = out[top:top + resized_h, left:left + resized_w]
+    if (width, height) != (resized_w, resized_h):
+        cv2.resize(image, (resized_w, resized_h), dst=interior, interpolation=cv2.INTER_LINEAR)
+    else:
+        np.copyto(interior, image)
+    out[:top] = color
+    out[top + resized_h:] = color
+    out[top:top + resized_h, :left] = color
+    out[top:top + resized_h, left + resized_w:] = color
+    return out, gain, (left, top)
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float,
+                        max_detections: int = MAX_DETECTIONS) -> np.ndarray:
+    """
+    Greedy non-maximum suppression with vectorized IoU computation
+
+    Args:
+        boxes: (N, 4) array of boxes as (x1, y1, x2, y2)
+        scores: (N,) array of scores
+        iou_threshold: Boxes overlapping a kept box by more than this are dropped
+        max_detections: Maximum number of boxes to keep
+
+    Returns:
+        np.ndarray: Indices of kept boxes, sorted by descending score
+    """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind="stable")
+    keep = []
+
+    while order.size > 0 and len(keep) < max_detections:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+
+        inter_w = np.clip(np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / (areas[best] + areas[rest] - inter + 1e-7)
+
+        order = rest[iou <= iou_threshold]
+
+    return np.array(keep, dtype=np.int64)
+
+
+class InferenceBackend(ABC):
+    """
+    Abstract base class for detection model runtimes
+
+    A backend turns a list of BGR frames into one (N, 6) float32 array per
+    frame with rows of [x1, y1, x2, y2, confidence, class_id] in original
+    image coordinates.
+    """
+
+    #: Hint logged when the runtime's package is not installed
+    install_hint = ""
+
+    def __init__(self, model_path: Optional[str] = None):
+        """
+        Initialize the backend
+
+        Args:
+            model_path: Path to the model file (None for the default model)
+        """
+        self.model_path = model_path
+        self.names: Dict[int, str] = {}
+
+    @abstractmethod
+    def load(self):
+        """
+        Load the model (raises ImportError if the runtime is missing)
+        """
+        pass
+
+    @abstractmethod
+    def infer(self, frames: List[np.ndarray], conf: float, iou: float,
+              classes: Optional[np.ndarray] = None,
+              imgsz: Optional[int] = None,
+              timings: Optional[Dict[str, float]] = None) -> List[np.ndarray]:
+        """
+        Run detection on a batch of frames
+
+        Args:
+            frames: Input images as numpy arrays (BGR format from OpenCV)
+            conf: Minimum confidence for detections
+            iou: IoU threshold for non-maximum suppression
+            classes: Optional class ids to keep; other classes are discarded before NMS
+            imgsz: Optional network input size for this call (e.g. smaller for ROI crops);
+                   ignored by models with a fixed input shape
+            timings: Optional dict that receives the "preprocess", "inference" and
+                     "postprocess" durations of the call in seconds
+
+        Returns:
+            List[np.ndarray]: (N, 6) detection array for each frame
+        """
+        pass
+
+
+class UltralyticsBackend(InferenceBackend):
+    """
+    Runs YOLO models through Ultralytics and PyTorch
+    """
+
+    install_hint = "Ultralytics YOLO not installed. Run: pip install ultralytics"
+
+    def __init__(self, model_path: Optional[str] = None):
+        super().__init__(model_path)
+        self.model = None
+
+    def load(self):
+        """Load the YOLO model with Ultralytics"""
+        from ultralytics import YOLO
+
+        # If no model path specified, use pre-trained YOLOv8n
+        if not self.model_path:
+            logger.info("Loading pre-trained YOLOv8n model...")
+            self.model = YOLO(DEFAULT_MODEL)  # Nano model (fastest)
+        else:
+            logger.info(f"Loading custom model from {self.model_path}")
+            self.model = YOLO(self.model_path)
+
+        self.names = dict(self.model.names)
+
+    def infer(self, frames: List[np.ndarray], conf: float, iou: float,
+              classes: Optional[np.ndarray] = None,
+              imgsz: Optional[int] = None,
+              timings: Optional[Dict[str, float]] = None) -> List[np.ndarray]:
+        """Run a batched forward pass through the YOLO model"""
+        class_list = None if classes is None else classes.tolist()
+        options = {"imgsz": imgsz} if imgsz else {}
+        results = self.model(list(frames), conf=conf, iou=iou, classes=class_list, verbose=False,
+                             **options)
+
+        if timings is not None and results:
+            # Ultralytics measures the stages itself (per-image averages in ms)
+            speed = results[0].speed
+            for stage in ("preprocess", "inference", "postprocess"):
+                timings[stage] = (speed.get(stage) or 0.0) * len(results) / 1000
+
+        # One device-to-host transfer per frame: rows of [x1, y1, x2, y2, conf, cls]
+        return [result.boxes.data.cpu().numpy()[:, :6] for result in results]
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """
+    Runs exported YOLOv8 ONNX models on CPU through ONNX Runtime
+
+    Letterboxing and NMS are done in NumPy, so neither torch nor ultralytics
+    is imported once the ONNX file exists.
+    """
+
+    install_hint = "ONNX Runtime not installed. Run: pip install onnxruntime"
+
+    def __init__(self, model_path: Optional[str] = None, input_size: int = 640,
+                 num_threads: int = 0):
+        """
+        Initialize the ONNX Runtime backend
+
+        Args:
+            model_path: Path to a .onnx file, or to a .pt model that is exported
+                        to ONNX next to it on first use (None for YOLOv8n)
+            input_size: Network input size used for dynamic-shape models
+            num_threads: Intra-op threads for ONNX Runtime (0 = runtime default)
+        """
+        super().__init__(model_path)
+        self.input_size = input_size
+        self.num_threads = num_threads
+        self.pool = BufferPool()
+        self.session = None
+        self.input_name = None
+        self.input_shape = (input_size, input_size)
+        self.fixed_batch = None
+        self.dynamic_shape = True
+
+    def load(self):
+        """Create the ONNX Runtime session, exporting the model first if needed"""
+        import onnxruntime as ort
+
+        onnx_path = self.resolve_onnx_path()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+
+        logger.info(f"Loading ONNX model from {onnx_path}")
+        self.session = ort.InferenceSession(onnx_path, sess_options=options,
+                                            providers=["CPUExecutionProvider"])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, width = model_input.shape
+        self.fixed_batch = batch if isinstance(batch, int) else None
+        if isinstance(height, int) and isinstance(width, int):
+            self.input_shape = (height, width)
+            self.dynamic_shape = False
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        if "names" in metadata:
+            self.names = {int(k): v for k, v in ast.literal_eval(metadata["names"]).items()}
+        else:
+            num_classes = self.session.get_outputs()[0].shape[1] - 4
+            self.names = {i: str(i) for i in range(num_classes)}
+
+    def resolve_onnx_path(self) -> str:
+        """
+        Get the ONNX file to load, exporting it once from the source model if missing
+
+        Returns:
+            str: Path to the ONNX model
+        """
+        source = self.model_path or DEFAULT_MODEL
+        if source.endswith(".onnx"):
+            return source
+
+        onnx_path = os.path.splitext(source)[0] + ".onnx"
+        if os.path.exists(onnx_path):
+            return onnx_path
+
+        logger.info(f"Exporting {source} to ONNX (one-time)...")
+        from ultralytics import YOLO
+
+        exported = YOLO(source).export(format="onnx", imgsz=self.input_size, dynamic=True)
+        if os.path.abspath(exported) != os.path.abspath(onnx_path):
+            os.replace(exported, onnx_path)
+        logger.info(f"Exported ONNX model to {onnx_path}")
+        return onnx_path
+
+    def prepare_batch(self, frames: List[np.ndarray],
+                      imgsz: Optional[int] = None) -> Tuple[np.ndarray, List[tuple]]:
+        """
+        Letterbox frames into a network input tensor
+
+        Args:
+            frames: Input images as numpy arrays (BGR format from OpenCV)
+            imgsz: Optional square input size (only used by dynamic-shape models)
+
+        Returns:
+            tuple: (NCHW float32 RGB batch in [0, 1], per-frame (gain, pad, shape) transforms).
+            The batch is a reused buffer, overwritten by the next call.
+        """
+        input_shape = self.input_shape
+        if imgsz and self.dynamic_shape:
+            size = max(32, int(round(imgsz / 32)) * 32)  # Multiple of the model stride
+            input_shape = (size, size)
+
+        # Letterbox every frame straight into one reused uint8 batch
+        height, width = input_shape
+        blobs = self.pool.get("letterbox", (len(frames), height, width, 3), np.uint8)
+        transforms = []
+        for blob, frame in zip(blobs, frames):
+            _, gain, pad = letterbox(frame, input_shape, out=blob)
+            transforms.append((gain, pad, frame.shape[:2]))
+
+        # BGR HWC uint8 -> RGB NCHW float32 in [0, 1], in one pass into a reused buffer
+        batch = self.pool.get("input", (len(frames), 3, height, width), np.float32)
+        np.multiply(blobs[..., ::-1].transpose(0, 3, 1, 2), np.float32(1.0 / 255.0), out=batch)
+        return batch, transforms
+
+    def infer(self, frames: List[np.ndarray], conf: float, iou: float,
+              classes: Optional[np.ndarray] = None,
+              imgsz: Optional[int] = None,
+              timings: Optional[Dict[str, float]] = None) -> List[np.ndarray]:
+        """Letterbox the frames, run the ONNX graph and apply NMS"""
+        if timings is not None:
+            return self._timed_infer(frames, conf, iou, classes, imgsz, timings)
+
+        batch, transforms = self.prepare_batch(frames, imgsz)
+        predictions = self._run(batch)
+        return [self._postprocess(pred, conf, iou, classes, *transform)
+                for pred, transform in zip(predictions, transforms)]
+
+    def _timed_infer(self, frames: List[np.ndarray], conf: float, iou: float,
+                     classes: Optional[np.ndarray], imgsz: Optional[int],
+                     timings: Dict[str, float]) -> List[np.ndarray]:
+        """infer() with per-stage timing (kept separate so the plain path stays lean)"""
+        start = time.perf_counter()
+        batch, transforms = self.prepare_batch(frames, imgsz)
+        prepared = time.perf_counter()
+        predictions = self._run(batch)
+        inferred = time.perf_counter()
+        outputs = [self._postprocess(pred, conf, iou, classes, *transform)
+                   for pred, transform in zip(predictions, transforms)]
+        timings["preprocess"] = prepared - start
+        timings["inference"] = inferred - prepared
+        timings["postprocess"] = time.perf_counter() - inferred
+        return outputs
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Run the ONNX graph on a prepared batch
+
+        Args:
+            batch: NCHW float32 input batch
+
+        Returns:
+            np.ndarray: Raw predictions, one per frame
+        """
+        if self.fixed_batch in (None, len(batch)):
+            return self.session.run(None, {self.input_name: batch})[0]
+
+        # Fixed batch-1 export: run frame by frame
+        return np.concatenate([
+            self.session.run(None, {self.input_name: batch[i:i + 1]})[0]
+            for i in range(len(batch))
+        ])
+
+    def _postprocess(self, prediction: np.ndarray, conf: float, iou: float,
+                     classes: Optional[np.ndarray], gain: float,
+                     pad: Tuple[float, float], image_shape: Tuple[int, int]) -> np.ndarray:
+        """
+        Decode one raw YOLOv8 output (4 + num_classes, anchors) into detections
+
+        Args:
+            prediction: Raw network output for one frame
+            conf: Minimum confidence
+            iou: NMS IoU threshold
+            classes: Optional class ids to keep
+            gain: Letterbox scale gain
+            pad: Letterbox padding as (pad_x, pad_y)
+            image_shape: Original image size as (height, width)
+
+        Returns:
+            np.ndarray: (N, 6) detections in original image coordinates
+        """
+        prediction = prediction.T  # (anchors, 4 + num_classes)
+        class_scores = prediction[:, 4:]
+        scores = class_scores.max(axis=1)
+
+        candidates = scores >= conf
+        if not candidates.any():
+            return np.empty((0, 6), dtype=np.float32)
+
+        # Only resolve the best class for anchors that passed the threshold
+        class_ids = class_scores[candidates].argmax(axis=1)
+        boxes, scores = prediction[candidates, :4], scores[candidates]
+
+        # Drop other classes before NMS (same semantics as Ultralytics' classes=)
+        if classes is not None:
+            allowed = np.isin(class_ids, classes)
+            boxes, scores, class_ids = boxes[allowed], scores[allowed], class_ids[allowed]
+            if not len(scores):
+                return np.empty((0, 6), dtype=np.float32)
+
+        if len(scores) > MAX_NMS_CANDIDATES:
+            top = np.argpartition(-scores, MAX_NMS_CANDIDATES)[:MAX_NMS_CANDIDATES]
+            boxes, scores, class_ids = boxes[top], scores[top], class_ids[top]
+
+        # cx, cy, w, h -> x1, y1, x2, y2
+        xyxy = np.empty_like(boxes)
+        xyxy[:, :2] = boxes[:, :2] - boxes[:, 2:] / 2
+        xyxy[:, 2:] = boxes[:, :2] + boxes[:, 2:] / 2
+
+        # Class-aware NMS in one pass by offsetting boxes per class
+        keep = non_max_suppression(xyxy + class_ids[:, None] * MAX_BOX_WH, scores, iou)
+        xyxy, scores, class_ids = xyxy[keep], scores[keep], class_ids[keep]
+
+        # Undo letterbox and clip to the original image
+        xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad[0]) / gain).clip(0, image_shape[1])
+        xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad[1]) / gain).clip(0, image_shape[0])
+
+        return np.concatenate([xyxy, scores[:, None], class_ids[:, None]], axis=1).astype(np.float32)
+
+
+# Registry of available backends, selected by name from settings
+BACKENDS = {
+    "ultralytics": UltralyticsBackend,
+    "onnxruntime": OnnxRuntimeBackend,
+}
+
+
+def create_backend(name: str, model_path: Optional[str] = None, **kwargs) -> InferenceBackend:
+    """
+    Create an inference backend by name
+
+    Args:
+        name: Backend name (see BACKENDS)
+        model_path: Path to the model file
+        **kwargs: Backend-specific options
+
+    Returns:
+        InferenceBackend: Unloaded backend instance
+    """
+    if model_path and model_path.endswith(".onnx"):
+        name = "onnxruntime"
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown detection backend '{name}'. Options: {list(BACKENDS)}")
+
+    return BACKENDS[name](model_path, **kwargs)
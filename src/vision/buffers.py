@@ -0,0 +1,80 @@
+"""
+Buffer Pool Module
+Reusable NumPy work buffers (no OpenCV dependency, so tracking can use them cheaply)
+"""
+
+import threading
+import numpy as np
+from typing import Dict, Tuple
+
+
+class BufferPool:
+    """
+    Reusable arrays handed out by name, shape and dtype
+
+    Each name holds one buffer; asking for a different shape or dtype replaces
+    it. Buffers are kept per thread, so e.g. a detection worker and the main
+    loop never write into the same array.
+    """
+
+    def __init__(self):
+        """Initialize an empty pool"""
+        self._local = threading.local()
+        self.allocations = 0
+
+    def _buffers(self) -> Dict[str, np.ndarray]:
+        """Buffers of the calling thread"""
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        return buffers
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """
+        Get the reusable buffer for a name
+
+        Args:
+            name: Buffer name (one buffer per name and thread)
+            shape: Required shape
+            dtype: Required dtype
+
+        Returns:
+            np.ndarray: Buffer with undefined contents (overwritten by later users of the name)
+        """
+        buffers = self._buffers()
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = buffers[name] = np.empty(shape, dtype=dtype)
+            self.allocations += 1
+        return buffer
+
+    def like(self, name: str, image: np.ndarray) -> np.ndarray:
+        """
+        Get the reusable buffer for a name, shaped like image
+
+        Args:
+            name: Buffer name
+            image: Array whose shape and dtype are used
+
+        Returns:
+            np.ndarray: Buffer with undefined contents
+        """
+        return self.get(name, image.shape, image.dtype)
+
+    def clear(self):
+        """Release the calling thread's buffers"""
+        self._buffers().clear()
+
+    def get_stats(self) -> dict:
+        """
+        Get pool statistics
+
+        Returns:
+            dict: total allocations, and buffer count and bytes of the calling thread
+        """
+        buffers = self._buffers()
+        return {
+            "allocations": self.allocations,
+            "buffers": len(buffers),
+            "bytes": sum(buffer.nbytes for buffer in buffers.values()),
+        }
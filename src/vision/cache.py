@@ -0,0 +1,124 @@
+"""
+Detection Cache Module
+Bounded LRU cache so the same camera frame is never inferred twice
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sampling stride (pixels) for content fingerprints
+FINGERPRINT_STRIDE = 8
+
+
+def frame_fingerprint(image: np.ndarray, stride: int = FINGERPRINT_STRIDE) -> bytes:
+    """
+    Compute a cheap content fingerprint of a frame
+
+    Only a strided subsample of the pixels is hashed, so this costs a few
+    microseconds per frame. Camera frames carry sensor noise, so two different
+    frames practically never share a fingerprint.
+
+    Args:
+        image: Input image as numpy array
+        stride: Sampling stride in pixels
+
+    Returns:
+        bytes: Fingerprint of the frame contents
+    """
+    sample = np.ascontiguousarray(image[::stride, ::stride])
+    digest = hashlib.blake2b(sample.data, digest_size=16)
+    digest.update(str((image.shape, image.dtype.str)).encode())
+    return digest.digest()
+
+
+class DetectionCache:
+    """
+    Thread-safe LRU cache of detection results with hit/miss counters
+    """
+
+    def __init__(self, capacity: int = 16):
+        """
+        Initialize the cache
+
+        Args:
+            capacity: Maximum number of cached results (least recently used are evicted)
+        """
+        self.capacity = max(1, capacity)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached result
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[Any]: Cached result, or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Store a result, evicting the least recently used entry if full
+
+        Args:
+            key: Cache key
+            value: Result to cache
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all cached results (counters are kept)
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def reset_stats(self):
+        """
+        Reset hit/miss counters
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> dict:
+        """
+        Get cache statistics
+
+        Returns:
+            dict: hits, misses, hit_rate, size and capacity
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
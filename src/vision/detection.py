@@ -3,13 +3,62 @@ Object Detection Module
 Handles AI model loading and object detection using YOLO or other models
 """
 
-import cv2
+import threading
+import time
+from concurrent.futures import Future
 import numpy as np
-from typing import List, Tuple, Optional
+from collections.abc import Sequence
+from typing import Callable, Dict, Hashable, Iterable, List, Tuple, Optional, Union
 import logging
+from .backends import InferenceBackend, create_backend
+from .cache import DetectionCache, frame_fingerprint
+from .timing import StageTimer
 
 logger = logging.getLogger(__name__)
 
+# Frame shape (height, width) used for warm-up when none is given (720p camera stream)
+DEFAULT_WARMUP_SHAPE = (720, 1280)
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Compute the pairwise IoU matrix between two sets of boxes
+
+    Args:
+        boxes_a: (N, 4) array of boxes as (x1, y1, x2, y2)
+        boxes_b: (M, 4) array of boxes as (x1, y1, x2, y2)
+
+    Returns:
+        np.ndarray: (N, M) IoU matrix
+    """
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 1, 4)
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(1, -1, 4)
+
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+def scale_boxes(xyxy: np.ndarray, from_shape: Tuple[int, ...], to_shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Map boxes from one image size to another (e.g. a resized detection input to the camera frame)
+
+    Args:
+        xyxy: (N, 4) array (or a single box) of (x1, y1, x2, y2) in from_shape pixels
+        from_shape: Shape (height, width, ...) of the image the boxes refer to
+        to_shape: Shape (height, width, ...) of the image to map them to
+
+    Returns:
+        np.ndarray: int32 boxes in to_shape pixels, same layout as xyxy
+    """
+    (from_h, from_w), (to_h, to_w) = from_shape[:2], to_shape[:2]
+    scale = np.array([to_w / from_w, to_h / from_h, to_w / from_w, to_h / from_h])
+    return np.rint(np.asarray(xyxy, dtype=np.float64) * scale).astype(np.int32)
+
 
 class DetectedObject:
     """
@@ -45,23 +94,244 @@ class DetectedObject:
         return f"DetectedObject(class={self.class_name}, conf={self.confidence:.2f}, bbox={self.bbox})"
 
 
+class DetectionSet(Sequence):
+    """
+    Detections of a single frame stored as contiguous NumPy arrays
+
+    Behaves like a read-only list of DetectedObject for existing callers, but
+    the objects are only built lazily when an element is accessed. Vectorized
+    consumers (tracker, strategies, scanner) should use the arrays directly.
+    """
+
+    def __init__(self, xyxy: np.ndarray, confidence: np.ndarray, class_ids: np.ndarray,
+                 class_names: Union[dict, List[str], None] = None):
+        """
+        Initialize detection set
+
+        Args:
+            xyxy: Bounding boxes as (N, 4) array of (x1, y1, x2, y2)
+            confidence: Confidence scores as (N,) array
+            class_ids: Class ids as (N,) array
+            class_names: Mapping from class id to class name (model.names)
+        """
+        self.xyxy = np.ascontiguousarray(xyxy, dtype=np.int32).reshape(-1, 4)
+        self.confidence = np.ascontiguousarray(confidence, dtype=np.float32).reshape(-1)
+        self.class_ids = np.ascontiguousarray(class_ids, dtype=np.int32).reshape(-1)
+        self.class_names = class_names if class_names is not None else {}
+        self._views: Optional[List[Optional[DetectedObject]]] = None
+
+    @classmethod
+    def empty(cls, class_names: Union[dict, List[str], None] = None) -> 'DetectionSet':
+        """Create a detection set without detections"""
+        return cls(np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32),
+                   np.empty(0, dtype=np.int32), class_names)
+
+    @classmethod
+    def from_array(cls, data: np.ndarray,
+                   class_names: Union[dict, List[str], None] = None) -> 'DetectionSet':
+        """
+        Create a detection set from an (N, 6) array of [x1, y1, x2, y2, conf, class_id]
+
+        Args:
+            data: Raw detection rows as returned by the model
+            class_names: Mapping from class id to class name
+
+        Returns:
+            DetectionSet: Detection set backed by the array columns
+        """
+        data = np.asarray(data, dtype=np.float32).reshape(-1, 6)
+        return cls(data[:, :4], data[:, 4], data[:, 5], class_names)
+
+    @classmethod
+    def from_objects(cls, detections: Iterable[DetectedObject]) -> 'DetectionSet':
+        """
+        Create a detection set from DetectedObjects (returned as-is if already a set)
+
+        Args:
+            detections: Detected objects to convert
+
+        Returns:
+            DetectionSet: Columnar copy of the detections
+        """
+        if isinstance(detections, DetectionSet):
+            return detections
+
+        detections = list(detections)
+        class_names = {}
+        class_lookup = {}
+        class_ids = []
+        for det in detections:
+            if det.class_name not in class_lookup:
+                class_lookup[det.class_name] = len(class_lookup)
+                class_names[class_lookup[det.class_name]] = det.class_name
+            class_ids.append(class_lookup[det.class_name])
+
+        if not detections:
+            return cls.empty()
+
+        return cls(np.array([det.bbox for det in detections]),
+                   np.array([det.confidence for det in detections]),
+                   np.array(class_ids), class_names)
+
+    @property
+    def centers(self) -> np.ndarray:
+        """Get (N, 2) array of bounding box center points"""
+        return (self.xyxy[:, :2] + self.xyxy[:, 2:]) // 2
+
+    @property
+    def areas(self) -> np.ndarray:
+        """Get (N,) array of bounding box areas"""
+        wh = self.xyxy[:, 2:] - self.xyxy[:, :2]
+        return wh[:, 0].astype(np.int64) * wh[:, 1]
+
+    def class_ids_for(self, class_names: Iterable[str]) -> np.ndarray:
+        """
+        Resolve class names to the class ids used by this set
+
+        Args:
+            class_names: Class names to resolve (unknown names are ignored)
+
+        Returns:
+            np.ndarray: Matching class ids
+        """
+        wanted = set(class_names)
+        items = self.class_names.items() if isinstance(self.class_names, dict) \
+            else enumerate(self.class_names)
+        return np.array([class_id for class_id, name in items if name in wanted], dtype=np.int32)
+
+    def class_mask(self, class_names: Iterable[str]) -> np.ndarray:
+        """
+        Get a boolean mask of detections belonging to the given classes
+
+        Args:
+            class_names: Class names to select
+
+        Returns:
+            np.ndarray: (N,) boolean mask
+        """
+        return np.isin(self.class_ids, self.class_ids_for(class_names))
+
+    def filter(self, mask: np.ndarray) -> 'DetectionSet':
+        """
+        Select detections by boolean mask or index array
+
+        Args:
+            mask: Boolean mask or integer indices
+
+        Returns:
+            DetectionSet: Selected detections
+        """
+        return DetectionSet(self.xyxy[mask], self.confidence[mask], self.class_ids[mask],
+                            self.class_names)
+
+    def filter_classes(self, class_names: Iterable[str]) -> 'DetectionSet':
+        """Keep only detections of the given classes"""
+        return self.filter(self.class_mask(class_names))
+
+    def filter_confidence(self, min_confidence: float) -> 'DetectionSet':
+        """Keep only detections with confidence >= min_confidence"""
+        return self.filter(self.confidence >= min_confidence)
+
+    def class_name_of(self, index: int) -> str:
+        """Get the class name of the detection at index"""
+        return self.class_names[int(self.class_ids[index])]
+
+    def to_objects(self) -> List[DetectedObject]:
+        """Materialize all detections as DetectedObjects"""
+        return list(self)
+
+    def rescale(self, from_shape: Tuple[int, ...], to_shape: Tuple[int, ...]) -> 'DetectionSet':
+        """
+        Map the boxes from the image they were detected on to another image size
+
+        Args:
+            from_shape: Shape of the detection input (e.g. a resized, preprocessed frame)
+            to_shape: Shape of the image the boxes are used on (e.g. the camera frame)
+
+        Returns:
+            DetectionSet: Detections in to_shape coordinates (self if the sizes match)
+        """
+        if tuple(from_shape[:2]) == tuple(to_shape[:2]):
+            return self
+        return DetectionSet(scale_boxes(self.xyxy, from_shape, to_shape), self.confidence,
+                            self.class_ids, self.class_names)
+
+    def copy(self) -> 'DetectionSet':
+        """Get an independent copy of the detection set"""
+        return DetectionSet(self.xyxy.copy(), self.confidence.copy(), self.class_ids.copy(),
+                            self.class_names)
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, (slice, np.ndarray, list)):
+            return self.filter(index)
+
+        index = range(len(self))[index]  # Normalize negative indices, raise IndexError
+        if self._views is None:
+            self._views = [None] * len(self)
+
+        view = self._views[index]
+        if view is None:
+            x1, y1, x2, y2 = self.xyxy[index].tolist()
+            view = DetectedObject(
+                class_name=self.class_name_of(index),
+                confidence=float(self.confidence[index]),
+                bbox=(x1, y1, x2, y2)
+            )
+            self._views[index] = view
+        return view
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        return f"DetectionSet(n={len(self)})"
+
+
 class ObjectDetector:
     """
     Manages AI model loading and object detection using YOLOv8
     """
 
-    def __init__(self, model_path: Optional[str] = None, confidence_threshold: float = 0.5):
+    def __init__(self, model_path: Optional[str] = None, confidence_threshold: float = 0.5,
+                 max_batch_size: int = 8, backend: str = "ultralytics",
+                 iou_threshold: float = 0.45, classes: Optional[Iterable[str]] = None,
+                 cache_size: int = 0):
         """
         Initialize the object detector
 
         Args:
             model_path: Path to the trained model file (if None, uses pre-trained YOLOv8n)
             confidence_threshold: Minimum confidence for detections (0.0 to 1.0)
+            max_batch_size: Maximum number of frames per forward pass in detect_objects_batch()
+            backend: Inference backend name ("ultralytics" or "onnxruntime");
+                     .onnx model files always use "onnxruntime"
+            iou_threshold: IoU threshold for non-maximum suppression
+            classes: Optional class allow-list; other classes are dropped inside the
+                     model's postprocessing (before NMS) instead of afterwards
+            cache_size: Number of frame results kept in the detection cache (0 = disabled)
         """
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
-        self.model = None
+        self.iou_threshold = iou_threshold
+        self.max_batch_size = max(1, max_batch_size)
+        self.backend_name = backend
+        self.backend: Optional[InferenceBackend] = None
         self.class_names = []
+        self.target_classes = list(classes) if classes else None
+        self._target_class_ids: Optional[np.ndarray] = None
+        self._class_ids_by_name = {}
+        self._resolved_class_ids = {}
+        self.cache: Optional[DetectionCache] = DetectionCache(cache_size) if cache_size > 0 else None
+        # Optional state of the image preparation (e.g. ImagePreprocessor.cache_token) added to
+        # the cache keys, so a frame id preprocessed differently is not served a stale result
+        self.cache_token: Optional[Callable[[], Hashable]] = None
+        self.timer: Optional[StageTimer] = None
+        self.load_time: Optional[float] = None
+        self.warmup_time: Optional[float] = None
 
     def load_model(self, model_path: Optional[str] = None) -> bool:
         """
@@ -73,81 +343,469 @@ class ObjectDetector:
         Returns:
             bool: True if model loaded successfully
         """
+        backend = None
         try:
-            from ultralytics import YOLO
-
             if model_path:
                 self.model_path = model_path
 
-            # If no model path specified, use pre-trained YOLOv8n
-            if not self.model_path:
-                logger.info("Loading pre-trained YOLOv8n model...")
-                self.model = YOLO('yolov8n.pt')  # Nano model (fastest)
-            else:
-                logger.info(f"Loading custom model from {self.model_path}")
-                self.model = YOLO(self.model_path)
+            start = time.perf_counter()
+            backend = create_backend(self.backend_name, self.model_path)
+            backend.load()
+            self.load_time = time.perf_counter() - start
 
             # Get class names from model
-            self.class_names = list(self.model.names.values())
-            logger.info(f"Model loaded successfully. Available classes: {len(self.class_names)}")
+            self.class_names = list(backend.names.values())
+            self._class_ids_by_name = {name: class_id for class_id, name in backend.names.items()}
+            self._resolved_class_ids = {}
+            self._target_class_ids = self._resolve_class_ids(self.target_classes)
+            if self.cache is not None:
+                self.cache.clear()
+
+            # Publish the backend last so concurrent callers never see a half-loaded model
+            self.backend = backend
+            logger.info(f"Model loaded successfully ({type(backend).__name__}) in "
+                        f"{self.load_time:.2f}s. Available classes: {len(self.class_names)}")
             logger.info(f"Classes: {self.class_names[:10]}...")  # Show first 10
 
             return True
 
-        except ImportError:
-            logger.error("Ultralytics YOLO not installed. Run: pip install ultralytics")
+        except ImportError as e:
+            logger.error(backend.install_hint if backend and backend.install_hint else str(e))
             return False
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             return False
 
-    def detect_objects(self, image: np.ndarray) -> List[DetectedObject]:
+    def load_model_async(self, model_path: Optional[str] = None, warmup: bool = True,
+                         warmup_shapes: Optional[List[Tuple[int, int]]] = None,
+                         warmup_sizes: Optional[List[int]] = None) -> Future:
+        """
+        Load (and optionally warm up) the model on a background thread
+
+        Lets model loading overlap robot connection and camera startup. Detection
+        calls made before the future resolves return empty results.
+
+        Args:
+            model_path: Path to model file. If None, uses pre-trained YOLOv8n
+            warmup: Run warm-up inferences after loading
+            warmup_shapes: Frame shapes for warm-up (see warmup())
+            warmup_sizes: Extra network input sizes for warm-up (see warmup())
+
+        Returns:
+            Future: Resolves to True if the model loaded successfully
+        """
+        future = Future()
+
+        def run():
+            try:
+                loaded = self.load_model(model_path)
+                if loaded and warmup:
+                    self.warmup(warmup_shapes, warmup_sizes)
+                future.set_result(loaded)
+            except Exception as e:
+                logger.error(f"Background model loading failed: {e}")
+                future.set_exception(e)
+
+        threading.Thread(target=run, daemon=True, name="model-loader").start()
+        return future
+
+    def warmup(self, shapes: Optional[List[Tuple[int, int]]] = None,
+               input_sizes: Optional[List[int]] = None, runs: int = 2) -> float:
+        """
+        Run dummy inferences so the first real frame is not slowed down
+
+        The first forward passes pay for lazy initialization (memory allocation,
+        kernel selection, graph optimization), so warm-up uses the same frame
+        shapes and input sizes as the real frames will.
+
+        Args:
+            shapes: Frame shapes as (height, width) (defaults to 720p)
+            input_sizes: Extra network input sizes to warm up (e.g. ROI_INPUT_SIZE)
+            runs: Inferences per shape
+
+        Returns:
+            float: Warm-up time in seconds (0.0 if the model is not loaded)
+        """
+        if self.backend is None:
+            logger.error("Model not loaded. Call load_model() first.")
+            return 0.0
+
+        shapes = shapes or [DEFAULT_WARMUP_SHAPE]
+        start = time.perf_counter()
+        try:
+            # Untimed: warm-up stays out of the timing stats
+            for height, width in shapes:
+                frame = np.full((height, width, 3), 114, dtype=np.uint8)
+                for _ in range(runs):
+                    self._infer([frame], timed=False)
+                for size in input_sizes or []:
+                    for _ in range(runs):
+                        self._infer([frame[:size, :size]], imgsz=size, timed=False)
+        except Exception as e:
+            logger.warning(f"Model warm-up failed: {e}")
+
+        self.warmup_time = time.perf_counter() - start
+        logger.info(f"Model warm-up took {self.warmup_time:.2f}s")
+        return self.warmup_time
+
+    def get_startup_stats(self) -> dict:
+        """
+        Get model startup timings
+
+        Returns:
+            dict: load_time and warmup_time in seconds (None if not done)
+        """
+        return {"load_time": self.load_time, "warmup_time": self.warmup_time}
+
+    def detect_objects(self, image: np.ndarray, classes: Optional[Iterable[str]] = None,
+                       frame_id: Optional[Hashable] = None) -> DetectionSet:
         """
         Detect objects in an image
 
         Args:
             image: Input image as numpy array (BGR format from OpenCV)
+            classes: Optional class allow-list for this call (defaults to target_classes)
+            frame_id: Optional id of the frame the image was produced from (e.g. the
+                      ThreadedCamera sequence number) used as the cache key instead of
+                      a content fingerprint
 
         Returns:
-            List[DetectedObject]: List of detected objects
+            DetectionSet: Detected objects (usable as a list of DetectedObject).
+            Results may be shared with the cache - copy() before modifying them.
         """
-        if self.model is None:
+        if self.backend is None:
             logger.error("Model not loaded. Call load_model() first.")
-            return []
+            return DetectionSet.empty()
 
         try:
-            # Run inference
-            results = self.model(image, conf=self.confidence_threshold, verbose=False)
-
-            detections = []
-
-            # Process results
-            for result in results:
-                boxes = result.boxes
-
-                for box in boxes:
-                    # Get box coordinates (xyxy format)
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    confidence = float(box.conf[0])
-                    class_id = int(box.cls[0])
-                    class_name = self.model.names[class_id]
-
-                    # Create DetectedObject
-                    detected_obj = DetectedObject(
-                        class_name=class_name,
-                        confidence=confidence,
-                        bbox=(int(x1), int(y1), int(x2), int(y2))
-                    )
-                    detections.append(detected_obj)
+            # Run inference (unless this frame was already inferred)
+            detections = self._detect_cached([image], classes, [frame_id], 1)[0]
 
             logger.info(f"Detected {len(detections)} objects")
             return detections
 
         except Exception as e:
             logger.error(f"Error during object detection: {e}")
+            return DetectionSet.empty(self.backend.names)
+
+    def detect_objects_batch(self, frames: List[np.ndarray], batch_size: Optional[int] = None,
+                             classes: Optional[Iterable[str]] = None,
+                             frame_ids: Optional[List[Hashable]] = None) -> List[DetectionSet]:
+        """
+        Detect objects in several frames with batched forward passes
+
+        Running one forward pass over a stack of frames is considerably cheaper
+        on CPU than calling detect_objects() once per frame. With the cache
+        enabled, cached frames and duplicates within the batch are inferred once.
+
+        Args:
+            frames: Input images as numpy arrays (BGR format from OpenCV)
+            batch_size: Maximum frames per forward pass (defaults to max_batch_size)
+            classes: Optional class allow-list for this call (defaults to target_classes)
+            frame_ids: Optional frame ids (one per frame) used as cache keys
+
+        Returns:
+            List[DetectionSet]: Detections for each input frame, in order
+        """
+        if self.backend is None:
+            logger.error("Model not loaded. Call load_model() first.")
+            return [DetectionSet.empty() for _ in frames]
+
+        if not frames:
             return []
 
-    def detect_specific_class(self, image: np.ndarray, class_name: str) -> List[DetectedObject]:
+        try:
+            batch_detections = self._detect_cached(frames, classes, frame_ids,
+                                                   batch_size or self.max_batch_size)
+
+            total = sum(len(detections) for detections in batch_detections)
+            logger.info(f"Detected {total} objects in batch of {len(frames)} frames")
+            return batch_detections
+
+        except Exception as e:
+            logger.error(f"Error during batched object detection: {e}")
+            return [DetectionSet.empty(self.backend.names) for _ in frames]
+
+    def _detect_cached(self, frames: List[np.ndarray], classes: Optional[Iterable[str]],
+                       frame_ids: Optional[List[Hashable]], batch_size: int) -> List[DetectionSet]:
+        """
+        Run detection on frames, serving repeated frames from the cache
+
+        Args:
+            frames: Input images
+            classes: Optional class allow-list
+            frame_ids: Optional frame ids used as cache keys
+            batch_size: Maximum frames per forward pass
+
+        Returns:
+            List[DetectionSet]: Detections for each frame, in order
+        """
+        if self.cache is None:
+            results = []
+            for start in range(0, len(frames), batch_size):
+                results.extend(self._infer(frames[start:start + batch_size], classes))
+            return results
+
+        frame_ids = frame_ids or [None] * len(frames)
+        keys = [self._cache_key(frame, classes, frame_id) for frame, frame_id in zip(frames, frame_ids)]
+        results: List[Optional[DetectionSet]] = [self.cache.get(key) for key in keys]
+
+        # Infer each distinct missing frame once
+        pending = {}
+        for index, key in enumerate(keys):
+            if results[index] is None and key not in pending:
+                pending[key] = frames[index]
+
+        pending_keys = list(pending)
+        for start in range(0, len(pending_keys), batch_size):
+            chunk = pending_keys[start:start + batch_size]
+            for key, detections in zip(chunk, self._infer([pending[key] for key in chunk], classes)):
+                self.cache.put(key, detections)
+                pending[key] = detections
+
+        return [result if result is not None else pending[key] for result, key in zip(results, keys)]
+
+    def _cache_key(self, image: np.ndarray, classes: Optional[Iterable[str]],
+                   frame_id: Optional[Hashable], *extra) -> tuple:
+        """
+        Build the cache key for a detection call
+
+        Args:
+            image: Input image (fingerprinted when no frame_id is given)
+            classes: Optional class allow-list
+            frame_id: Optional frame id
+            *extra: Additional call parameters that affect the result
+
+        Returns:
+            tuple: Cache key
+        """
+        frame_key = ("id", frame_id) if frame_id is not None else ("fp", frame_fingerprint(image))
+        class_ids = self._target_class_ids if classes is None else self._resolve_class_ids(classes)
+        class_key = None if class_ids is None else tuple(class_ids.tolist())
+        if self.cache_token is not None:
+            extra += (self.cache_token(),)
+        return (frame_key, class_key, self.confidence_threshold, self.iou_threshold) + extra
+
+    def enable_cache(self, capacity: int = 16):
+        """
+        Enable the detection cache
+
+        Args:
+            capacity: Number of frame results to keep
+        """
+        self.cache = DetectionCache(capacity)
+        logger.info(f"Detection cache enabled (capacity {capacity})")
+
+    def disable_cache(self):
+        """
+        Disable the detection cache
+        """
+        self.cache = None
+
+    def get_cache_stats(self) -> dict:
+        """
+        Get detection cache statistics
+
+        Returns:
+            dict: hits, misses, hit_rate, size and capacity (empty if the cache is disabled)
+        """
+        return self.cache.get_stats() if self.cache is not None else {}
+
+    def detect_in_roi(self, image: np.ndarray, bbox: Tuple[int, int, int, int],
+                      margin: float = 0.5, input_size: int = 320,
+                      classes: Optional[Iterable[str]] = None,
+                      fallback: bool = True,
+                      frame_id: Optional[Hashable] = None) -> DetectionSet:
+        """
+        Detect objects in a region of interest around a previously known bounding box
+
+        The region is the prior bbox grown by margin (as a fraction of its width and
+        height on each side). It is inferred at a smaller input size than full frames,
+        and the boxes are mapped back to full-frame coordinates. If nothing is found
+        in the region, full-frame detection is used instead (when fallback is True).
+
+        Args:
+            image: Full input frame (BGR format from OpenCV)
+            bbox: Prior bounding box as (x1, y1, x2, y2) in full-frame coordinates
+            margin: Region growth relative to the bbox size on each side
+            input_size: Network input size used for the region
+            classes: Optional class allow-list (defaults to target_classes)
+            fallback: Run full-frame detection if the target is lost in the region
+            frame_id: Optional frame id used as the cache key
+
+        Returns:
+            DetectionSet: Detections in full-frame coordinates
+        """
+        if self.backend is None:
+            logger.error("Model not loaded. Call load_model() first.")
+            return DetectionSet.empty()
+
+        height, width = image.shape[:2]
+        x1, y1, x2, y2 = bbox
+        grow_x, grow_y = (x2 - x1) * margin, (y2 - y1) * margin
+        rx1, ry1 = max(0, int(x1 - grow_x)), max(0, int(y1 - grow_y))
+        rx2, ry2 = min(width, int(x2 + grow_x)), min(height, int(y2 + grow_y))
+
+        if rx2 - rx1 < 2 or ry2 - ry1 < 2:
+            logger.debug(f"ROI {bbox} outside the frame - using full frame")
+            return self.detect_objects(image, classes, frame_id) if fallback \
+                else DetectionSet.empty(self.backend.names)
+
+        region = (rx1, ry1, rx2, ry2)
+        key = None
+        detections = None
+        if self.cache is not None:
+            key = self._cache_key(image, classes, frame_id, "roi", region, input_size)
+            detections = self.cache.get(key)
+
+        if detections is None:
+            try:
+                # Crop is a view - no pixel copy before letterboxing
+                detections = self._infer([image[ry1:ry2, rx1:rx2]], classes, imgsz=input_size)[0]
+                detections.xyxy += np.array([rx1, ry1, rx1, ry1], dtype=np.int32)
+                if key is not None:
+                    self.cache.put(key, detections)
+            except Exception as e:
+                logger.error(f"Error during ROI detection: {e}")
+                detections = DetectionSet.empty(self.backend.names)
+
+        if len(detections):
+            logger.info(f"Detected {len(detections)} objects in ROI ({rx1}, {ry1}, {rx2}, {ry2})")
+            return detections
+
+        if not fallback:
+            return detections
+
+        logger.info("Target lost in ROI - falling back to full-frame detection")
+        return self.detect_objects(image, classes, frame_id)
+
+    def _infer(self, frames: List[np.ndarray], classes: Optional[Iterable[str]] = None,
+               imgsz: Optional[int] = None, timed: bool = True) -> List[DetectionSet]:
+        """
+        Run the backend on a batch of frames
+
+        Args:
+            frames: Input images as numpy arrays
+            classes: Optional class allow-list (defaults to target_classes)
+            imgsz: Optional network input size for this call
+            timed: Record the call in the stage timer (if timing is enabled)
+
+        Returns:
+            List[DetectionSet]: Detections for each frame
+        """
+        class_ids = self._target_class_ids if classes is None else self._resolve_class_ids(classes)
+        if class_ids is not None and len(class_ids) == 0:
+            # None of the requested classes exist in the model
+            return [DetectionSet.empty(self.backend.names) for _ in frames]
+
+        # Read the timer once: enable/disable_timing() may run on another thread
+        timer = self.timer if timed else None
+        if timer is not None:
+            return self._timed_infer(frames, class_ids, imgsz, timer)
+
+        outputs = self.backend.infer(list(frames), conf=self.confidence_threshold,
+                                     iou=self.iou_threshold, classes=class_ids, imgsz=imgsz)
+        return [DetectionSet.from_array(output, self.backend.names) for output in outputs]
+
+    def _timed_infer(self, frames: List[np.ndarray], class_ids: Optional[np.ndarray],
+                     imgsz: Optional[int], timer: StageTimer) -> List[DetectionSet]:
+        """
+        _infer() with per-stage timing recorded into a stage timer
+
+        Args:
+            frames: Input images as numpy arrays
+            class_ids: Resolved class ids to keep (None = all)
+            imgsz: Optional network input size for this call
+            timer: Stage timer receiving the durations
+
+        Returns:
+            List[DetectionSet]: Detections for each frame
+        """
+        timings = timer.durations()
+        start = time.perf_counter()
+        outputs = self.backend.infer(list(frames), conf=self.confidence_threshold,
+                                     iou=self.iou_threshold, classes=class_ids, imgsz=imgsz,
+                                     timings=timings)
+        inferred = time.perf_counter()
+        results = [DetectionSet.from_array(output, self.backend.names) for output in outputs]
+        end = time.perf_counter()
+
+        timings["results"] = end - inferred
+        timings["total"] = end - start
+        timer.record(timings, len(frames))
+        return results
+
+    def enable_timing(self, capacity: int = 256,
+                      callback: Optional[Callable[[Dict[str, float], int], None]] = None):
+        """
+        Enable per-stage timing of inference calls
+
+        Stages are preprocess (letterbox), inference (forward pass), postprocess
+        (decoding and NMS), results (building the DetectionSet) and total, all in
+        milliseconds per call. Cache hits are not timed.
+
+        Args:
+            capacity: Number of calls kept in the ring buffer
+            callback: Optional function called with (stage durations in ms, frame count)
+                      after every inference call
+        """
+        self.timer = StageTimer(capacity, callback)
+        logger.info(f"Detection timing enabled (last {capacity} calls)")
+
+    def disable_timing(self):
+        """
+        Disable per-stage timing
+        """
+        self.timer = None
+
+    def get_timing_stats(self) -> dict:
+        """
+        Get per-stage timing statistics
+
+        Returns:
+            dict: calls, frames and per-stage mean/p50/p95/p99/max in ms
+                  (empty if timing is disabled)
+        """
+        timer = self.timer
+        return timer.get_stats() if timer is not None else {}
+
+    def _resolve_class_ids(self, class_names: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        """
+        Resolve class names to model class ids (memoized per name list)
+
+        Args:
+            class_names: Class names, or None for all classes
+
+        Returns:
+            Optional[np.ndarray]: Sorted class ids, or None for all classes
+        """
+        if class_names is None:
+            return None
+
+        key = tuple(class_names)
+        class_ids = self._resolved_class_ids.get(key)
+        if class_ids is None:
+            unknown = [name for name in key if name not in self._class_ids_by_name]
+            if unknown:
+                logger.warning(f"Classes not supported by the model: {unknown}")
+            class_ids = np.array(sorted({self._class_ids_by_name[name] for name in key
+                                         if name in self._class_ids_by_name}), dtype=np.int64)
+            self._resolved_class_ids[key] = class_ids
+        return class_ids
+
+    def set_target_classes(self, class_names: Optional[Iterable[str]]):
+        """
+        Set the class allow-list applied to every detection call
+
+        Args:
+            class_names: Class names to detect, or None to detect all classes
+        """
+        self.target_classes = list(class_names) if class_names else None
+        if self.backend is not None:
+            self._target_class_ids = self._resolve_class_ids(self.target_classes)
+        logger.info(f"Set target classes to {self.target_classes or 'all'}")
+
+    def detect_specific_class(self, image: np.ndarray, class_name: str) -> DetectionSet:
         """
         Detect only objects of a specific class
 
@@ -156,25 +814,34 @@ class ObjectDetector:
             class_name: Name of the class to detect
 
         Returns:
-            List[DetectedObject]: List of detected objects of the specified class
+            DetectionSet: Detected objects of the specified class
         """
-        all_detections = self.detect_objects(image)
-        filtered = [obj for obj in all_detections if obj.class_name == class_name]
+        filtered = self.detect_objects(image, classes=[class_name])
         logger.info(f"Found {len(filtered)} objects of class '{class_name}'")
         return filtered
 
-    def draw_detections(self, image: np.ndarray, detections: List[DetectedObject]) -> np.ndarray:
+    def draw_detections(self, image: np.ndarray, detections: List[DetectedObject],
+                        out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Draw bounding boxes and labels on image
 
         Args:
             image: Input image as numpy array
             detections: List of detected objects to draw
+            out: Optional array of the image's shape to draw into (pass image
+                 itself to draw in place); a new copy is made if None
 
         Returns:
             np.ndarray: Image with drawn detections
         """
-        output_image = image.copy()
+        import cv2
+
+        if out is None:
+            output_image = image.copy()
+        else:
+            if out is not image:
+                np.copyto(out, image)
+            output_image = out
 
         for detection in detections:
             x1, y1, x2, y2 = detection.bbox
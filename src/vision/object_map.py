@@ -0,0 +1,293 @@
+"""
+Object Map Module
+Persistent world-frame map of the objects seen during scans
+"""
+
+import math
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from .detection import DetectionSet
+from .spatial_index import SpatialHash
+from .tracking import box_positions
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Robot pose in the world frame: (x meters, y meters, heading degrees)
+Pose = Tuple[float, float, float]
+
+
+def angle_difference(a: float, b: float) -> float:
+    """Signed difference a - b of two angles in degrees, in [-180, 180)"""
+    return (a - b + 180.0) % 360.0 - 180.0
+
+
+class MapObject:
+    """
+    An object in the map, merged from one or more observations
+    """
+
+    __slots__ = ("object_id", "class_name", "position", "confidence", "observations",
+                 "first_seen", "last_seen", "_weight")
+
+    def __init__(self, object_id: int, class_name: str, position: Tuple[float, float],
+                 confidence: float, timestamp: float):
+        """
+        Initialize a map object from its first observation
+
+        Args:
+            object_id: Unique identifier in the map
+            class_name: Object class
+            position: (x, y) world position in meters
+            confidence: Detection confidence
+            timestamp: Time of the observation
+        """
+        self.object_id = object_id
+        self.class_name = class_name
+        self.position = position
+        self.confidence = confidence  # Highest detection confidence so far
+        self.observations = 1
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self._weight = confidence
+
+    def observe(self, position: Tuple[float, float], confidence: float, timestamp: float):
+        """
+        Merge another observation (confidence-weighted mean of the positions)
+
+        Args:
+            position: (x, y) world position in meters
+            confidence: Detection confidence
+            timestamp: Time of the observation
+        """
+        weight = self._weight + confidence
+        x, y = self.position
+        self.position = (x + (position[0] - x) * confidence / weight,
+                         y + (position[1] - y) * confidence / weight)
+        self._weight = weight
+        self.confidence = max(self.confidence, confidence)
+        self.observations += 1
+        self.last_seen = max(self.last_seen, timestamp)
+
+    def bearing(self, pose: Pose = (0.0, 0.0, 0.0)) -> float:
+        """
+        Direction of the object seen from a pose
+
+        Args:
+            pose: Robot pose (x, y, heading)
+
+        Returns:
+            float: Degrees relative to the pose's heading, positive = to the left
+        """
+        x, y, heading = pose
+        angle = math.degrees(math.atan2(self.position[1] - y, self.position[0] - x))
+        return angle_difference(angle, heading)
+
+    def distance(self, pose: Pose = (0.0, 0.0, 0.0)) -> float:
+        """Distance in meters from a pose"""
+        return math.hypot(self.position[0] - pose[0], self.position[1] - pose[1])
+
+    def __repr__(self):
+        return (f"MapObject(id={self.object_id}, class={self.class_name}, "
+                f"position=({self.position[0]:.2f}, {self.position[1]:.2f}), "
+                f"conf={self.confidence:.2f}, seen={self.observations}x)")
+
+
+class ObjectMap:
+    """
+    Objects in world coordinates, merged across scans
+
+    Detections are projected from the image into the world frame using the
+    robot's pose and a pinhole distance estimate (from the box height), then
+    clustered incrementally: an observation within merge_radius of a known
+    object of the same class refines that object, otherwise it starts a new
+    one. A spatial hash over the positions keeps each merge O(k) in the
+    number of nearby objects, so the map can grow over many scans.
+
+    The world frame is the robot's start pose: x forward, y to the left,
+    headings in degrees counter-clockwise (positive = turned left, as
+    ObjectTracker.apply_ego_motion).
+    """
+
+    def __init__(self, merge_radius: float = 0.25, horizontal_fov: float = 60.0,
+                 object_height: float = 0.15):
+        """
+        Initialize an empty map
+
+        Args:
+            merge_radius: Observations of a class closer than this (meters) are one object
+            horizontal_fov: Camera horizontal field of view in degrees
+            object_height: Typical real object height in meters (distance estimate)
+        """
+        self.merge_radius = merge_radius
+        self.horizontal_fov = horizontal_fov
+        self.object_height = object_height
+        self.objects: Dict[int, MapObject] = {}
+        self.index = SpatialHash(merge_radius)
+        self.next_object_id = 0
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def project(self, detections: DetectionSet, frame_size: Tuple[int, int],
+                pose: Pose = (0.0, 0.0, 0.0)) -> np.ndarray:
+        """
+        Project detections into the world frame
+
+        Args:
+            detections: Detections of one frame
+            frame_size: Frame (width, height) in pixels
+            pose: Robot pose (x, y, heading) when the frame was taken
+
+        Returns:
+            np.ndarray: (N, 2) world positions in meters
+        """
+        camera = box_positions(detections.xyxy, frame_size, self.horizontal_fov, self.object_height)
+        forward, left = camera[:, 2], -camera[:, 0]
+        x, y, heading = pose
+        angle = math.radians(heading)
+        cos, sin = math.cos(angle), math.sin(angle)
+        return np.stack([x + forward * cos - left * sin, y + forward * sin + left * cos], axis=1)
+
+    def add_detections(self, detections: DetectionSet, frame_size: Tuple[int, int],
+                       pose: Pose = (0.0, 0.0, 0.0), timestamp: Optional[float] = None) -> List[MapObject]:
+        """
+        Add the detections of one frame to the map
+
+        Args:
+            detections: Detections of one frame (DetectionSet or list of DetectedObject)
+            frame_size: Frame (width, height) in pixels
+            pose: Robot pose (x, y, heading) when the frame was taken
+            timestamp: Time of the frame (default: now)
+
+        Returns:
+            List[MapObject]: Map object of each detection (new or merged)
+        """
+        detections = DetectionSet.from_objects(detections)
+        if not len(detections):
+            return []
+        timestamp = time.time() if timestamp is None else timestamp
+        positions = self.project(detections, frame_size, pose).tolist()
+        return [self.add_observation(detections.class_name_of(index), position, confidence, timestamp)
+                for index, (position, confidence)
+                in enumerate(zip(positions, detections.confidence.tolist()))]
+
+    def add_observation(self, class_name: str, position: Tuple[float, float], confidence: float,
+                        timestamp: Optional[float] = None) -> MapObject:
+        """
+        Merge one observation into the nearest object of its class, or add a new object
+
+        Args:
+            class_name: Object class
+            position: (x, y) world position in meters
+            confidence: Detection confidence
+            timestamp: Time of the observation (default: now)
+
+        Returns:
+            MapObject: The merged or new map object
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        object_id = self.index.nearest(position, lambda key: self.objects[key].class_name == class_name,
+                                       self.merge_radius)
+        if object_id is not None:
+            map_object = self.objects[object_id]
+            map_object.observe(position, confidence, timestamp)
+        else:
+            map_object = MapObject(self.next_object_id, class_name, tuple(position), confidence, timestamp)
+            self.objects[map_object.object_id] = map_object
+            self.next_object_id += 1
+            logger.debug(f"New map object: {map_object}")
+        self.index.insert(map_object.object_id, map_object.position)
+        return map_object
+
+    def query(self, class_names: Optional[List[str]] = None, min_confidence: float = 0.0,
+              max_age: Optional[float] = None, now: Optional[float] = None) -> List[MapObject]:
+        """
+        Get the known objects, optionally filtered
+
+        Args:
+            class_names: Only objects of these classes (None = all)
+            min_confidence: Minimum highest detection confidence
+            max_age: Only objects seen within this many seconds
+            now: Reference time for max_age (default: now)
+
+        Returns:
+            List[MapObject]: Matching objects, in order of discovery
+        """
+        oldest = None if max_age is None else (time.time() if now is None else now) - max_age
+        return [map_object for map_object in self.objects.values()
+                if (class_names is None or map_object.class_name in class_names)
+                and map_object.confidence >= min_confidence
+                and (oldest is None or map_object.last_seen >= oldest)]
+
+    def nearest(self, position: Tuple[float, float], class_names: Optional[List[str]] = None,
+                max_distance: Optional[float] = None) -> Optional[MapObject]:
+        """
+        Get the object closest to a world position
+
+        Args:
+            position: (x, y) world position in meters
+            class_names: Only objects of these classes (None = all)
+            max_distance: Only objects within this distance (meters)
+
+        Returns:
+            Optional[MapObject]: Closest object, or None
+        """
+        accept = None
+        if class_names is not None:
+            accept = lambda key: self.objects[key].class_name in class_names  # noqa: E731
+        object_id = self.index.nearest(position, accept, max_distance)
+        return None if object_id is None else self.objects[object_id]
+
+    def in_view(self, pose: Pose, max_distance: Optional[float] = None,
+                margin: float = 0.0) -> List[MapObject]:
+        """
+        Get the objects inside the camera's horizontal field of view from a pose
+
+        Args:
+            pose: Robot pose (x, y, heading)
+            max_distance: Only objects within this distance (meters)
+            margin: Degrees to shrink the field of view by on each side
+
+        Returns:
+            List[MapObject]: Objects the camera should see from the pose
+        """
+        half_fov = self.horizontal_fov / 2 - margin
+        if max_distance is None:
+            candidates = self.objects.values()
+        else:
+            candidates = [self.objects[key] for key in self.index.query_radius(pose[:2], max_distance)]
+        return [map_object for map_object in candidates if abs(map_object.bearing(pose)) <= half_fov]
+
+    def remove(self, object_id: int):
+        """
+        Remove an object (e.g. once it has been sorted)
+
+        Args:
+            object_id: ID of the map object
+        """
+        if self.objects.pop(object_id, None) is not None:
+            self.index.remove(object_id)
+
+    def prune(self, max_age: float, now: Optional[float] = None) -> int:
+        """
+        Remove objects not seen for a while
+
+        Args:
+            max_age: Seconds since the last observation
+            now: Reference time (default: now)
+
+        Returns:
+            int: Number of removed objects
+        """
+        oldest = (time.time() if now is None else now) - max_age
+        stale = [object_id for object_id, map_object in self.objects.items() if map_object.last_seen < oldest]
+        for object_id in stale:
+            self.remove(object_id)
+        return len(stale)
+
+    def clear(self):
+        """Remove all objects"""
+        self.objects.clear()
+        self.index.clear()
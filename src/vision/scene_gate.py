@@ -0,0 +1,167 @@
+"""
+Scene Change Gate Module
+Skips detection while the camera keeps seeing the same scene
+"""
+
+import time
+from typing import Callable, Optional, Tuple
+import cv2
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SceneChangeGate:
+    """
+    Cheap motion gate in front of the detector
+
+    Each frame is reduced to a tiny grayscale thumbnail and compared with the
+    thumbnail of the last frame that was actually detected on. Detection only
+    runs when enough of the thumbnail changed or the previous result is older
+    than max_age; otherwise the previous detections are reused.
+    """
+
+    def __init__(self, threshold: float = 0.02, pixel_threshold: int = 20,
+                 max_age: float = 2.0, size: Tuple[int, int] = (64, 36)):
+        """
+        Initialize the gate
+
+        Args:
+            threshold: Fraction of thumbnail pixels that must change to trigger detection
+            pixel_threshold: Gray level difference (0-255) for a pixel to count as changed
+            max_age: Seconds after which detection runs even for a static scene (0 = never)
+            size: Thumbnail size (width, height) used for differencing
+        """
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.max_age = max_age
+        self.size = size
+
+        self.detections = None
+        self._reference: Optional[np.ndarray] = None
+        self._reference_time = 0.0
+
+        self.checks = 0
+        self.passed = 0
+        self.forced_by_age = 0
+        self.last_change = 0.0
+        self._change_total = 0.0
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Reduce a frame to the small grayscale image used for differencing
+
+        Args:
+            frame: Input image (BGR or grayscale)
+
+        Returns:
+            np.ndarray: Thumbnail as int16 (ready for signed differences)
+        """
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small.astype(np.int16)
+
+    def measure_change(self, frame: np.ndarray) -> float:
+        """
+        Measure how much a frame differs from the last detected frame
+
+        Args:
+            frame: Input image as numpy array
+
+        Returns:
+            float: Fraction of changed thumbnail pixels (1.0 if there is no reference yet)
+        """
+        return self._changed_fraction(self.thumbnail(frame))
+
+    def _changed_fraction(self, thumb: np.ndarray) -> float:
+        """Fraction of thumbnail pixels that differ from the reference"""
+        if self._reference is None:
+            return 1.0
+        diff = np.abs(thumb - self._reference)
+        return float(np.count_nonzero(diff > self.pixel_threshold)) / diff.size
+
+    def should_detect(self, frame: np.ndarray) -> bool:
+        """
+        Decide whether detection has to run on this frame
+
+        When True is returned the frame becomes the new reference, so the caller
+        is expected to run detection on it (and pass the result to update()).
+
+        Args:
+            frame: Input image as numpy array
+
+        Returns:
+            bool: True to run detection, False to reuse the previous detections
+        """
+        thumb = self.thumbnail(frame)
+        now = time.monotonic()
+        self.checks += 1
+
+        change = self._changed_fraction(thumb)
+        self.last_change = change
+        self._change_total += change
+
+        expired = self.max_age > 0 and now - self._reference_time >= self.max_age
+        if change < self.threshold and not expired:
+            return False
+
+        if change < self.threshold:
+            self.forced_by_age += 1
+        self.passed += 1
+        self._reference = thumb
+        self._reference_time = now
+        return True
+
+    def update(self, detections):
+        """
+        Store the detections for the current reference frame
+
+        Args:
+            detections: Detection result to reuse while the scene stays static
+        """
+        self.detections = detections
+
+    def detect(self, frame: np.ndarray, detect_fn: Callable[[np.ndarray], object]):
+        """
+        Run detect_fn only if the scene changed, else return the previous result
+
+        Args:
+            frame: Input image as numpy array
+            detect_fn: Function running detection on a frame
+
+        Returns:
+            Detections for the frame (reused if the scene is static)
+        """
+        if self.should_detect(frame) or self.detections is None:
+            self.update(detect_fn(frame))
+        return self.detections
+
+    def reset(self):
+        """
+        Forget the reference frame so the next frame is always detected
+        (call after the robot moved or the scene was changed on purpose)
+        """
+        self._reference = None
+        self.detections = None
+
+    def get_stats(self) -> dict:
+        """
+        Get gate statistics for tuning
+
+        Returns:
+            dict: checks, detections run, skipped, skip_rate, forced_by_age,
+                  last_change and mean_change (changed pixel fractions)
+        """
+        skipped = self.checks - self.passed
+        return {
+            "checks": self.checks,
+            "detected": self.passed,
+            "skipped": skipped,
+            "skip_rate": skipped / self.checks if self.checks else 0.0,
+            "forced_by_age": self.forced_by_age,
+            "last_change": self.last_change,
+            "mean_change": self._change_total / self.checks if self.checks else 0.0,
+            "threshold": self.threshold,
+        }
@@ -0,0 +1,178 @@
+"""
+Spatial Index Module
+Uniform-grid spatial hash over 2D points for neighborhood queries
+"""
+
+import math
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+Point = Tuple[float, float]
+Cell = Tuple[int, int]
+
+
+class SpatialHash:
+    """
+    Points bucketed into square grid cells, indexed by key
+
+    A radius or region query only looks at the cells it overlaps, so it costs
+    O(k) in the number of nearby points instead of a scan over all of them.
+    Moving a point only touches the buckets when it crosses into another cell,
+    which makes per-frame updates of slowly moving boxes cheap. The cell size
+    should be about the typical query radius (e.g. an object's size in pixels).
+    Meant for bounded coordinates such as image pixels: nearest() widens its
+    search ring by ring, so very sparse points far apart make it slow.
+    """
+
+    def __init__(self, cell_size: float = 64.0):
+        """
+        Initialize an empty index
+
+        Args:
+            cell_size: Edge length of a grid cell, in the units of the points
+        """
+        self.cell_size = float(cell_size)
+        self._cells: Dict[Cell, Set[Hashable]] = {}
+        self._points: Dict[Hashable, Point] = {}
+        self._cell_of: Dict[Hashable, Cell] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._points
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+    def insert(self, key: Hashable, point: Point):
+        """
+        Add a point, or move it if the key is already indexed
+
+        Args:
+            key: Identifier of the point (e.g. a track id)
+            point: (x, y) position
+        """
+        x, y = float(point[0]), float(point[1])
+        cell = self._cell(x, y)
+        old_cell = self._cell_of.get(key)
+        if old_cell != cell:
+            if old_cell is not None:
+                self._discard(key, old_cell)
+            self._cells.setdefault(cell, set()).add(key)
+            self._cell_of[key] = cell
+        self._points[key] = (x, y)
+
+    def remove(self, key: Hashable):
+        """
+        Remove a point (unknown keys are ignored)
+
+        Args:
+            key: Identifier of the point
+        """
+        cell = self._cell_of.pop(key, None)
+        if cell is not None:
+            self._discard(key, cell)
+            del self._points[key]
+
+    def _discard(self, key: Hashable, cell: Cell):
+        bucket = self._cells[cell]
+        bucket.discard(key)
+        if not bucket:
+            del self._cells[cell]  # Keep only occupied cells
+
+    def clear(self):
+        """Remove all points"""
+        self._cells.clear()
+        self._points.clear()
+        self._cell_of.clear()
+
+    def position(self, key: Hashable) -> Optional[Point]:
+        """Indexed position of a key (None if unknown)"""
+        return self._points.get(key)
+
+    def query_region(self, x1: float, y1: float, x2: float, y2: float) -> List[Hashable]:
+        """
+        Keys of the points inside a rectangle (edges included)
+
+        Args:
+            x1, y1, x2, y2: Rectangle corners
+
+        Returns:
+            List[Hashable]: Matching keys, in no particular order
+        """
+        (cx1, cy1), (cx2, cy2) = self._cell(x1, y1), self._cell(x2, y2)
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(self._cells):
+            # Region covers more cells than are occupied: walk the occupied ones
+            cells = [cell for cell in self._cells if cx1 <= cell[0] <= cx2 and cy1 <= cell[1] <= cy2]
+        else:
+            cells = [(cx, cy) for cx in range(cx1, cx2 + 1) for cy in range(cy1, cy2 + 1)]
+
+        keys = []
+        for cell in cells:
+            for key in self._cells.get(cell, ()):
+                x, y = self._points[key]
+                if x1 <= x <= x2 and y1 <= y <= y2:
+                    keys.append(key)
+        return keys
+
+    def query_radius(self, point: Point, radius: float) -> List[Hashable]:
+        """
+        Keys of the points within a distance of a point
+
+        Args:
+            point: (x, y) query position
+            radius: Maximum distance (inclusive)
+
+        Returns:
+            List[Hashable]: Matching keys, in no particular order
+        """
+        px, py = point
+        limit = radius * radius
+        return [key for key in self.query_region(px - radius, py - radius, px + radius, py + radius)
+                if (self._points[key][0] - px) ** 2 + (self._points[key][1] - py) ** 2 <= limit]
+
+    def nearest(self, point: Point, accept: Optional[Callable[[Hashable], bool]] = None,
+                max_distance: Optional[float] = None) -> Optional[Hashable]:
+        """
+        Key of the point closest to a position
+
+        Searches rings of cells around the position's cell, stopping once no
+        closer point can be in the next ring.
+
+        Args:
+            point: (x, y) query position
+            accept: Optional filter, only keys for which it returns True are considered
+            max_distance: Optional maximum distance
+
+        Returns:
+            Optional[Hashable]: Closest accepted key, or None
+        """
+        px, py = float(point[0]), float(point[1])
+        cx, cy = self._cell(px, py)
+        best_key, best_distance = None, math.inf if max_distance is None else max_distance ** 2
+        seen = 0
+        ring = 0
+        while seen < len(self._points):
+            # Every point of this ring or beyond is at least this far away
+            inner = max(0.0, ring - 1) * self.cell_size
+            if inner * inner > best_distance:
+                break
+            if ring == 0:
+                cells = [(cx, cy)]
+            else:
+                cells = [(cx + dx, cy + dy) for dx in range(-ring, ring + 1)
+                         for dy in (-ring, ring)]
+                cells += [(cx + dx, cy + dy) for dx in (-ring, ring)
+                          for dy in range(-ring + 1, ring)]
+            for cell in cells:
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                seen += len(bucket)
+                for key in bucket:
+                    x, y = self._points[key]
+                    distance = (x - px) ** 2 + (y - py) ** 2
+                    if distance <= best_distance and (accept is None or accept(key)):
+                        best_key, best_distance = key, distance
+            ring += 1
+        return best_key
@@ -0,0 +1,116 @@
+"""
+Detection Timing Module
+Low-overhead per-stage timing of the detection pipeline
+"""
+
+import threading
+from typing import Callable, Dict, Optional
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages recorded per detection call (milliseconds)
+STAGES = ("preprocess", "inference", "postprocess", "results", "total")
+
+
+class StageTimer:
+    """
+    Fixed-size ring buffer of per-stage durations
+
+    Each detection call records one row of stage durations into a preallocated
+    NumPy array, overwriting the oldest samples. Calls fill a durations dict from
+    durations(), reused per thread, so the buffers stay the same from call to
+    call; only a callback gets a fresh dict of its own.
+    """
+
+    def __init__(self, capacity: int = 256,
+                 callback: Optional[Callable[[Dict[str, float], int], None]] = None):
+        """
+        Initialize the timer
+
+        Args:
+            capacity: Number of detection calls kept
+            callback: Optional function called with (stage durations in ms, frame count)
+                      after every detection call
+        """
+        self.capacity = max(1, capacity)
+        self.callback = callback
+        self._samples = np.zeros((self.capacity, len(STAGES)), dtype=np.float64)
+        self._frames = np.zeros(self.capacity, dtype=np.int32)
+        self._index = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def durations(self) -> Dict[str, float]:
+        """
+        Get this thread's durations dict for the next call, with every stage reset to 0
+
+        Returns:
+            Dict[str, float]: Stage name -> duration in seconds, to fill and pass to record()
+        """
+        durations = getattr(self._local, "durations", None)
+        if durations is None:
+            durations = self._local.durations = {}
+        for stage in STAGES:
+            durations[stage] = 0.0
+        return durations
+
+    def record(self, durations: Dict[str, float], frames: int = 1):
+        """
+        Record the stage durations of one detection call
+
+        Args:
+            durations: Stage name -> duration in seconds (missing stages count as 0)
+            frames: Number of frames processed by the call
+        """
+        with self._lock:
+            row = self._samples[self._index]
+            for column, stage in enumerate(STAGES):
+                row[column] = durations.get(stage, 0.0) * 1000
+            self._frames[self._index] = frames
+            self._index = (self._index + 1) % self.capacity
+            self._count += 1
+
+        if self.callback is not None:
+            try:
+                self.callback({stage: durations.get(stage, 0.0) * 1000 for stage in STAGES}, frames)
+            except Exception as e:
+                logger.error(f"Timing callback failed: {e}")
+
+    def clear(self):
+        """Drop all recorded samples"""
+        with self._lock:
+            self._index = 0
+            self._count = 0
+
+    def get_stats(self) -> dict:
+        """
+        Summarize the recorded samples per stage
+
+        Returns:
+            dict: calls, frames and per-stage mean/p50/p95/p99/max in milliseconds
+                  (per detection call, over the samples still in the buffer)
+        """
+        with self._lock:
+            filled = min(self._count, self.capacity)
+            samples = self._samples[:filled].copy()
+            frames = int(self._frames[:filled].sum())
+            calls = self._count
+
+        stats = {"calls": calls, "samples": filled, "frames": frames, "stages": {}}
+        if not filled:
+            return stats
+
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99], axis=0)
+        mean, peak = samples.mean(axis=0), samples.max(axis=0)
+        for i, stage in enumerate(STAGES):
+            stats["stages"][stage] = {
+                "mean": float(mean[i]),
+                "p50": float(p50[i]),
+                "p95": float(p95[i]),
+                "p99": float(p99[i]),
+                "max": float(peak[i]),
+            }
+        return stats
@@ -3,45 +3,598 @@ Object Tracking Module
 Handles tracking of detected objects across multiple frames
 """
 
+import math
+import time
 import numpy as np
-from typing import List, Optional, Dict
-from .detection import DetectedObject
+from typing import List, Optional, Dict, Set, Tuple
+from .detection import DetectedObject, DetectionSet, box_iou
+from .buffers import BufferPool
+from .spatial_index import SpatialHash
 import logging
 
 logger = logging.getLogger(__name__)
 
+# scipy.optimize.linear_sum_assignment once resolved (False = SciPy not installed)
+_linear_sum_assignment = None
+
+# Squared Mahalanobis distance gate for matching by predicted center
+# (chi-square 95% quantile with 2 degrees of freedom)
+CENTER_GATE = 5.991
+# Measurement noise of an optical flow shift relative to a detected box: the
+# flow is measured on the object's own texture, so it is trusted far more
+FLOW_NOISE_SCALE = 0.1
+
+
+def match_boxes(iou: np.ndarray, iou_threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Match rows (tracks) to columns (detections) maximizing the total IoU
+
+    Uses the optimal (Hungarian) assignment from SciPy when it is installed and
+    a greedy highest-IoU-first assignment otherwise. Pairs below iou_threshold
+    are never matched.
+
+    Args:
+        iou: (T, D) IoU matrix (or any similarity where higher is better)
+        iou_threshold: Minimum IoU of a match
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Matched row indices and column indices
+    """
+    global _linear_sum_assignment
+    if iou.size == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    if _linear_sum_assignment is None:
+        try:
+            from scipy.optimize import linear_sum_assignment
+            _linear_sum_assignment = linear_sum_assignment
+        except ImportError:
+            logger.info("SciPy not installed, tracker uses greedy assignment")
+            _linear_sum_assignment = False
+
+    if _linear_sum_assignment:
+        rows, cols = _linear_sum_assignment(iou, maximize=True)
+    else:
+        # Greedy: walk candidate pairs by decreasing IoU, skip used rows/columns
+        candidates = np.flatnonzero(iou.ravel() >= iou_threshold)
+        candidates = candidates[np.argsort(-iou.ravel()[candidates], kind="stable")]
+        used_rows, used_cols, rows, cols = set(), set(), [], []
+        for row, col in zip(*np.unravel_index(candidates, iou.shape)):
+            if row not in used_rows and col not in used_cols:
+                used_rows.add(row)
+                used_cols.add(col)
+                rows.append(row)
+                cols.append(col)
+        rows, cols = np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)
+
+    keep = iou[rows, cols] >= iou_threshold
+    return rows[keep], cols[keep]
+
+
+def xyxy_to_cxcywh(boxes: np.ndarray) -> np.ndarray:
+    """Convert (N, 4) boxes from (x1, y1, x2, y2) to (center x, center y, width, height)"""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    return np.hstack([(boxes[:, :2] + boxes[:, 2:]) / 2, boxes[:, 2:] - boxes[:, :2]])
+
+
+def cxcywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    """Convert (N, 4) boxes from (center x, center y, width, height) to (x1, y1, x2, y2)"""
+    half = np.maximum(boxes[:, 2:4], 1.0) / 2
+    return np.hstack([boxes[:, :2] - half, boxes[:, :2] + half])
+
+
+def box_positions(boxes: np.ndarray, frame_size: Tuple[int, int], horizontal_fov: float,
+                  object_height: float = 0.15) -> np.ndarray:
+    """
+    Estimate the 3D positions of box centers relative to the camera (pinhole model)
+
+    The depth of a box is estimated from its pixel height, assuming the
+    object is object_height meters tall.
+
+    Args:
+        boxes: (N, 4) boxes as (x1, y1, x2, y2)
+        frame_size: Frame (width, height) in pixels
+        horizontal_fov: Camera horizontal field of view in degrees
+        object_height: Typical real height of the objects in meters
+
+    Returns:
+        np.ndarray: (N, 3) positions in meters as (x right, y down, z forward)
+    """
+    width, height = frame_size
+    focal = (width / 2) / math.tan(math.radians(horizontal_fov) / 2)
+    cxcywh = xyxy_to_cxcywh(boxes)
+    z = focal * object_height / np.maximum(cxcywh[:, 3], 1.0)
+    return np.stack([(cxcywh[:, 0] - width / 2) * z / focal,
+                     (cxcywh[:, 1] - height / 2) * z / focal, z], axis=1)
+
+
+def ego_motion_boxes(boxes: np.ndarray, frame_size: Tuple[int, int], horizontal_fov: float,
+                     yaw: float = 0.0, forward: float = 0.0, lateral: float = 0.0,
+                     object_height: float = 0.15) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Predict where boxes appear after the robot moves, with a pinhole camera model
+
+    Each box center is lifted to 3D at a depth estimated from the box height
+    (object_height / pixel height, scaled by the focal length), the robot's
+    motion is applied, and the point is projected back. A pure rotation does
+    not depend on the depth estimate, so turns are predicted exactly (up to
+    lens distortion); translations are only as good as object_height.
+
+    Args:
+        boxes: (N, 4) boxes as (x1, y1, x2, y2)
+        frame_size: Frame (width, height) in pixels
+        horizontal_fov: Camera horizontal field of view in degrees
+        yaw: Rotation in degrees, positive = counter-clockwise (turning left)
+        forward: Forward translation in meters
+        lateral: Sideways translation in meters, positive = to the right
+        object_height: Typical real height of the objects in meters
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (N, 4) moved boxes, and (N,) mask of the
+                                       boxes still in front of the camera
+    """
+    width, height = frame_size
+    focal = (width / 2) / math.tan(math.radians(horizontal_fov) / 2)
+    cxcywh = xyxy_to_cxcywh(boxes)
+    x, y, z = box_positions(boxes, frame_size, horizontal_fov, object_height).T
+
+    x, z_moved = x - lateral, z - forward
+    angle = math.radians(yaw)
+    x, z_moved = (x * math.cos(angle) + z_moved * math.sin(angle),
+                  -x * math.sin(angle) + z_moved * math.cos(angle))
+
+    in_front = z_moved > 1e-3
+    z_moved = np.where(in_front, z_moved, 1e-3)
+    moved = np.stack([width / 2 + focal * x / z_moved, height / 2 + focal * y / z_moved,
+                      cxcywh[:, 2] * z / z_moved, cxcywh[:, 3] * z / z_moved], axis=1)
+    return cxcywh_to_xyxy(moved), in_front
+
+
+class BoxKalmanFilter:
+    """
+    Constant-velocity Kalman filters for many boxes, stored as batched arrays
+
+    The state of each box is (center x, center y, width, height) plus their
+    velocities in pixels per frame. Motion model and noise treat the four
+    coordinates independently, so the 8x8 covariance of a box is four 2x2
+    position/velocity blocks; only those are stored, as (N, 3, 4) arrays of
+    (position variance, covariance, velocity variance) per coordinate. Every
+    predict and correct step is then a few element-wise operations over all
+    boxes, with results identical to the full matrix form. Noise is
+    proportional to the box size, as in DeepSORT, so small distant objects and
+    large close ones behave alike.
+    """
+
+    def __init__(self, position_noise: float = 1.0 / 20, velocity_noise: float = 1.0 / 160):
+        """
+        Initialize an empty filter bank
+
+        Args:
+            position_noise: Position/size standard deviation as a fraction of the box size
+            velocity_noise: Velocity standard deviation as a fraction of the box size
+        """
+        self.position_noise = position_noise
+        self.velocity_noise = velocity_noise
+        self.mean = np.empty((0, 8))  # (cx, cy, w, h, vx, vy, vw, vh) per box
+        self.covariance = np.empty((0, 3, 4))  # (pp, pv, vv) per box and coordinate
+
+    def __len__(self) -> int:
+        return len(self.mean)
+
+    @staticmethod
+    def _scale(mean: np.ndarray) -> np.ndarray:
+        """(N, 4) noise scale per coordinate: box width for x/w, height for y/h"""
+        size = np.maximum(mean[:, 2:4], 1.0)
+        return np.hstack([size, size])
+
+    def add(self, boxes: np.ndarray):
+        """
+        Start filters for new boxes (appended as the last rows)
+
+        Args:
+            boxes: (K, 4) boxes as (x1, y1, x2, y2)
+        """
+        measured = xyxy_to_cxcywh(boxes)
+        if not len(measured):
+            return
+        mean = np.hstack([measured, np.zeros_like(measured)])
+        scale = self._scale(mean)
+        covariance = np.zeros((len(mean), 3, 4))
+        covariance[:, 0] = (2 * self.position_noise * scale) ** 2
+        covariance[:, 2] = (10 * self.velocity_noise * scale) ** 2
+
+        self.mean = np.concatenate([self.mean, mean])
+        self.covariance = np.concatenate([self.covariance, covariance])
+
+    def keep(self, mask: np.ndarray):
+        """
+        Drop filters
+
+        Args:
+            mask: (N,) boolean mask of rows to keep
+        """
+        self.mean = self.mean[mask]
+        self.covariance = self.covariance[mask]
+
+    def clear(self):
+        """Drop all filters"""
+        self.keep(np.zeros(len(self), dtype=bool))
+
+    def predict(self):
+        """Advance every box by one frame"""
+        if not len(self):
+            return
+        scale = self._scale(self.mean)
+        pp, pv, vv = self.covariance[:, 0], self.covariance[:, 1], self.covariance[:, 2]
+
+        self.mean[:, :4] += self.mean[:, 4:]
+        # P' = F P F^T + Q with F = [[1, 1], [0, 1]] per coordinate
+        pp += 2 * pv + vv + (self.position_noise * scale) ** 2
+        pv += vv
+        vv += (self.velocity_noise * scale) ** 2
+
+    def update(self, rows: np.ndarray, boxes: np.ndarray, noise_scale: float = 1.0):
+        """
+        Correct the filters of some rows with measured boxes
+
+        Args:
+            rows: (K,) row indices
+            boxes: (K, 4) measured boxes as (x1, y1, x2, y2)
+            noise_scale: Measurement noise relative to a detection (< 1 = trusted more)
+        """
+        if not len(rows):
+            return
+        mean, covariance = self.mean[rows], self.covariance[rows]
+        pp, pv, vv = covariance[:, 0], covariance[:, 1], covariance[:, 2]
+
+        # Position is measured directly: gain K = P H^T / (H P H^T + R) per coordinate
+        innovation_variance = pp + (noise_scale * self.position_noise * self._scale(mean)) ** 2
+        gain_position = pp / innovation_variance
+        gain_velocity = pv / innovation_variance
+
+        innovation = xyxy_to_cxcywh(boxes) - mean[:, :4]
+        mean[:, :4] += gain_position * innovation
+        mean[:, 4:] += gain_velocity * innovation
+
+        # P' = (I - K H) P
+        vv -= gain_velocity * pv
+        pv *= 1 - gain_position
+        pp *= 1 - gain_position
+
+        self.mean[rows] = mean
+        self.covariance[rows] = covariance
+
+    def relocate(self, boxes: np.ndarray):
+        """
+        Move every box to a new position without a measurement (e.g. after the camera moved)
+
+        The position uncertainty grows as for a new box, so that the next
+        detections are matched within the error of the relocation.
+
+        Args:
+            boxes: (N, 4) boxes as (x1, y1, x2, y2), one per row
+        """
+        if not len(self):
+            return
+        self.mean[:, :4] = xyxy_to_cxcywh(boxes)
+        self.covariance[:, 0] += (2 * self.position_noise * self._scale(self.mean)) ** 2
+
+    def center_distance(self, rows: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """
+        Squared Mahalanobis distance between predicted and measured box centers
+
+        Args:
+            rows: (R,) row indices
+            boxes: (D, 4) measured boxes as (x1, y1, x2, y2)
+
+        Returns:
+            np.ndarray: (R, D) distances in units of the prediction's variance
+        """
+        mean = self.mean[rows]
+        variance = self.covariance[rows, 0, :2] + (self.position_noise * self._scale(mean)[:, :2]) ** 2
+        offset = xyxy_to_cxcywh(boxes)[None, :, :2] - mean[:, None, :2]
+        return (offset ** 2 / variance[:, None, :]).sum(axis=2)
+
+    def boxes(self) -> np.ndarray:
+        """Current (N, 4) boxes as (x1, y1, x2, y2)"""
+        return cxcywh_to_xyxy(self.mean)
+
+    def velocities(self) -> np.ndarray:
+        """Current (N, 2) center velocities in pixels per frame"""
+        return self.mean[:, 4:6]
+
+
+class OpticalFlow:
+    """
+    Sparse Lucas-Kanade propagation of boxes between frames
+
+    Corners are picked inside each box when it is seeded (after a detection)
+    and followed frame to frame on a downscaled grayscale image; a box moves by
+    the median displacement of its surviving points, which ignores the few
+    points that slip onto the background. Every frame is downscaled and
+    converted once into one of two reused buffers (the previous frame's image
+    is the other), so steady-state tracking allocates no frame-sized images.
+    The image pyramids are built inside calcOpticalFlowPyrLK, since OpenCV's
+    Python bindings cannot pass prebuilt pyramids back in.
+    """
+
+    def __init__(self, scale: float = 0.5, max_points: int = 20, min_points: int = 3,
+                 win_size: int = 15, max_level: int = 2, max_error: float = 30.0):
+        """
+        Initialize the propagator
+
+        Args:
+            scale: Downscale factor of the flow image (0.5 = half resolution)
+            max_points: Corners tracked per box
+            min_points: Surviving points needed to move a box
+            win_size: Lucas-Kanade search window in flow-image pixels
+            max_level: Pyramid levels above the flow image
+            max_error: Largest Lucas-Kanade error of a point still trusted
+        """
+        self.scale = scale
+        self.max_points = max_points
+        self.min_points = min_points
+        self.win_size = (win_size, win_size)
+        self.max_level = max_level
+        self.max_error = max_error
+
+        self.pool = BufferPool()
+        self._current = 0
+        self._previous: Optional[np.ndarray] = None
+        self.points = np.empty((0, 1, 2), dtype=np.float32)  # Flow-image coordinates
+        self.owners = np.empty(0, dtype=np.int64)  # Object id of each point
+        self.last_shifts: Dict[int, Tuple[float, float]] = {}
+
+    def prepare(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Downscale a frame to grayscale in the next of two reused buffers
+
+        Args:
+            frame: BGR or grayscale camera frame
+
+        Returns:
+            np.ndarray: Flow image (overwritten by the next-but-one prepare())
+        """
+        import cv2
+
+        height, width = frame.shape[:2]
+        size = (max(1, int(width * self.scale)), max(1, int(height * self.scale)))
+        self._current ^= 1
+        gray = self.pool.get(f"gray{self._current}", (size[1], size[0]))
+        if frame.ndim == 2:
+            return cv2.resize(frame, size, dst=gray, interpolation=cv2.INTER_AREA)
+        # Shrink first so the color conversion touches fewer pixels
+        small = cv2.resize(frame, size, dst=self.pool.get("small", (size[1], size[0], 3)),
+                           interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=gray)
+
+    def seed(self, gray: np.ndarray, boxes: np.ndarray, owners: List[int]):
+        """
+        Pick fresh corners inside boxes (replaces all points)
+
+        Args:
+            gray: Flow image of the frame the boxes belong to (from prepare())
+            boxes: (N, 4) boxes in frame coordinates as (x1, y1, x2, y2)
+            owners: Object id of each box
+        """
+        import cv2
+
+        height, width = gray.shape
+        scaled = np.rint(np.asarray(boxes, dtype=np.float64).reshape(-1, 4) * self.scale).astype(int)
+        points, point_owners = [], []
+        for (x1, y1, x2, y2), owner in zip(scaled.tolist(), owners):
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(width, x2), min(height, y2)
+            if x2 - x1 < 4 or y2 - y1 < 4:
+                continue
+            corners = cv2.goodFeaturesToTrack(gray[y1:y2, x1:x2], self.max_points, 0.01, 3)
+            if corners is None or len(corners) < self.min_points:
+                continue
+            corners[:, 0, 0] += x1
+            corners[:, 0, 1] += y1
+            points.append(corners)
+            point_owners.append(np.full(len(corners), owner, dtype=np.int64))
+
+        if points:
+            self.points = np.concatenate(points).astype(np.float32)
+            self.owners = np.concatenate(point_owners)
+        else:
+            self.points = np.empty((0, 1, 2), dtype=np.float32)
+            self.owners = np.empty(0, dtype=np.int64)
+        self._previous = gray
+
+    def propagate(self, gray: np.ndarray) -> Dict[int, Tuple[float, float]]:
+        """
+        Follow the points into a new frame
+
+        Args:
+            gray: Flow image of the new frame (from prepare())
+
+        Returns:
+            Dict[int, Tuple[float, float]]: Object id -> (dx, dy) box shift in
+                                            frame pixels, for boxes with enough points
+        """
+        import cv2
+
+        previous, self._previous = self._previous, gray
+        self.last_shifts = {}
+        if previous is None or previous.shape != gray.shape or not len(self.points):
+            return self.last_shifts
+
+        moved, status, error = cv2.calcOpticalFlowPyrLK(
+            previous, gray, self.points, None, winSize=self.win_size, maxLevel=self.max_level)
+        good = (status[:, 0] == 1) & (error[:, 0] < self.max_error)
+        displacement = (moved - self.points)[good, 0] / self.scale
+        owners = self.owners[good]
+        self.points, self.owners = moved[good], owners
+
+        # Points of one owner are contiguous (seeded box by box, filtering keeps order)
+        boundaries = np.flatnonzero(np.diff(owners)) + 1
+        for start, end in zip(np.r_[0, boundaries].tolist(), np.r_[boundaries, len(owners)].tolist()):
+            if end - start >= self.min_points:
+                dx, dy = np.median(displacement[start:end], axis=0)
+                self.last_shifts[int(owners[start])] = (float(dx), float(dy))
+        return self.last_shifts
+
+    def reset(self):
+        """Forget the points and the previous frame"""
+        self._previous = None
+        self.points = np.empty((0, 1, 2), dtype=np.float32)
+        self.owners = np.empty(0, dtype=np.int64)
+        self.last_shifts = {}
+
+
+class TrackHistory:
+    """
+    Fixed-capacity ring buffer of timestamped boxes
+
+    Boxes and timestamps live in preallocated arrays, so a track's memory stays
+    constant however long it lives; once full, the oldest entry is overwritten.
+    Queries return chronological arrays.
+    """
+
+    __slots__ = ("boxes", "timestamps", "_next", "_count")
+
+    def __init__(self, capacity: int = 128):
+        """
+        Initialize an empty history
+
+        Args:
+            capacity: Maximum number of entries kept (at least 1)
+        """
+        if capacity < 1:
+            raise ValueError(f"Track history capacity must be at least 1 (got {capacity})")
+        self.boxes = np.empty((capacity, 4), dtype=np.int32)
+        self.timestamps = np.empty(capacity, dtype=np.float64)
+        self._next = 0
+        self._count = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of entries kept"""
+        return len(self.timestamps)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, bbox: Tuple[int, int, int, int], timestamp: float):
+        """
+        Record a box, overwriting the oldest entry when full
+
+        Args:
+            bbox: Bounding box as (x1, y1, x2, y2)
+            timestamp: Time of the observation (seconds)
+        """
+        index = self._next
+        self.boxes[index] = bbox
+        self.timestamps[index] = timestamp
+        self._next = (index + 1) % len(self.timestamps)
+        self._count = min(self._count + 1, len(self.timestamps))
+
+    def _order(self) -> np.ndarray:
+        """Buffer indices of the entries, oldest first"""
+        start = (self._next - self._count) % len(self.timestamps)
+        return (start + np.arange(self._count)) % len(self.timestamps)
+
+    def get(self, since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the recorded boxes and timestamps, oldest first
+
+        Args:
+            since: Only entries with timestamp >= since (None = all)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (K, 4) boxes and (K,) timestamps (copies)
+        """
+        order = self._order()
+        timestamps = self.timestamps[order]
+        if since is not None:
+            order = order[np.searchsorted(timestamps, since):]
+            timestamps = self.timestamps[order]
+        return self.boxes[order], timestamps
+
+    def centers(self, since: Optional[float] = None) -> np.ndarray:
+        """(K, 2) box centers, oldest first"""
+        boxes, _ = self.get(since)
+        return (boxes[:, :2] + boxes[:, 2:]) / 2
+
+    def mean_velocity(self, since: Optional[float] = None) -> Tuple[float, float]:
+        """
+        Average center velocity over the recorded period (pixels per second)
+
+        Args:
+            since: Only use entries with timestamp >= since
+
+        Returns:
+            Tuple[float, float]: (vx, vy), zero with fewer than two entries
+        """
+        boxes, timestamps = self.get(since)
+        if len(timestamps) < 2 or timestamps[-1] <= timestamps[0]:
+            return (0.0, 0.0)
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        vx, vy = (centers[-1] - centers[0]) / (timestamps[-1] - timestamps[0])
+        return (float(vx), float(vy))
+
+    def clear(self):
+        """Forget all entries"""
+        self._next = 0
+        self._count = 0
+
 
 class TrackedObject:
     """
     Represents an object being tracked across frames
     """
 
-    def __init__(self, object_id: int, detected_object: DetectedObject):
+    __slots__ = ("object_id", "class_name", "current_bbox", "confidence", "history",
+                 "frames_since_seen", "hits", "velocity")
+
+    def __init__(self, object_id: int, detected_object: DetectedObject,
+                 history_size: int = 128, timestamp: Optional[float] = None):
         """
         Initialize tracked object
 
         Args:
             object_id: Unique identifier for this tracked object
             detected_object: Initial detection of the object
+            history_size: Number of past boxes kept in the history
+            timestamp: Time of the detection (default: now)
         """
         self.object_id = object_id
         self.class_name = detected_object.class_name
         self.current_bbox = detected_object.bbox
         self.confidence = detected_object.confidence
-        self.history = [detected_object.bbox]
+        self.history = TrackHistory(history_size)
+        self.history.append(detected_object.bbox, time.time() if timestamp is None else timestamp)
         self.frames_since_seen = 0
+        self.hits = 1
+        self.velocity = (0.0, 0.0)  # Center motion in pixels per frame (Kalman estimate)
 
-    def update(self, detected_object: DetectedObject):
+    def update(self, detected_object: DetectedObject, timestamp: Optional[float] = None):
         """
         Update tracked object with new detection
 
         Args:
             detected_object: New detection of the object
+            timestamp: Time of the detection (default: now)
         """
-        self.current_bbox = detected_object.bbox
-        self.confidence = detected_object.confidence
-        self.history.append(detected_object.bbox)
+        self.observe(detected_object.bbox, detected_object.confidence, timestamp)
+
+    def observe(self, bbox: Tuple[int, int, int, int], confidence: float,
+                timestamp: Optional[float] = None):
+        """
+        Update tracked object with a matched box (without a DetectedObject)
+
+        Args:
+            bbox: Bounding box as (x1, y1, x2, y2)
+            confidence: Detection confidence score
+            timestamp: Time of the detection (default: now)
+        """
+        self.current_bbox = bbox
+        self.confidence = confidence
+        self.history.append(bbox, time.time() if timestamp is None else timestamp)
         self.frames_since_seen = 0
+        self.hits += 1
 
     def __repr__(self):
         return f"TrackedObject(id={self.object_id}, class={self.class_name}, bbox={self.current_bbox})"
@@ -50,33 +603,301 @@ class TrackedObject:
 class ObjectTracker:
     """
     Tracks objects across multiple frames
+
+    SORT-style association: one vectorized IoU matrix between the tracks'
+    predicted boxes and the frame's detections, pairs of different classes
+    masked out, then an optimal assignment. Unmatched detections start new
+    tracks and tracks unmatched for more than max_disappeared updates are
+    dropped, so object ids stay stable while an object remains in view.
+
+    Every track has a constant-velocity Kalman filter (all kept in one
+    BoxKalmanFilter, row i belonging to the i-th entry of tracked_objects).
+    Calling predict() on frames that are not detected moves the boxes along
+    their estimated motion, so detection can run only every few frames.
+
+    With motion="optical_flow" the camera frame is passed to predict() and
+    update() as well: the boxes are then followed with sparse Lucas-Kanade
+    flow and the measured shifts correct the Kalman filters, which keeps them
+    on their objects when the camera itself moves (e.g. the robot turning).
+    Without frames, apply_ego_motion() moves the boxes by a known chassis
+    rotation or translation instead, so tracks keep their ids across turns.
+
+    Two secondary indexes are kept up to date with the tracks: the ids of each
+    class, and a spatial hash of the box centers. Lookups by class, region or
+    distance (track_object, nearest_object, objects_in_region, objects_near)
+    only visit the matching tracks instead of scanning all of them.
     """
 
-    def __init__(self, max_disappeared: int = 10):
+    MOTION_MODELS = ("kalman", "optical_flow")
+
+    def __init__(self, max_disappeared: int = 10, iou_threshold: float = 0.3, history_size: int = 128,
+                 motion: str = "kalman", flow_scale: float = 0.5, index_cell_size: float = 64.0,
+                 horizontal_fov: float = 60.0, object_height: float = 0.15):
         """
         Initialize the object tracker
 
         Args:
             max_disappeared: Maximum frames an object can disappear before being removed
+            iou_threshold: Minimum IoU between a track and a detection to match them
+            history_size: Past boxes kept per track (older ones are overwritten)
+            motion: "kalman" (predicted motion only) or "optical_flow" (measured on the frames)
+            flow_scale: Downscale factor of the optical flow image
+            index_cell_size: Grid cell size of the spatial index in pixels
+            horizontal_fov: Camera horizontal field of view in degrees (for apply_ego_motion)
+            object_height: Typical real object height in meters (depth estimate for translations)
         """
         self.max_disappeared = max_disappeared
+        self.iou_threshold = iou_threshold
+        self.history_size = history_size
         self.next_object_id = 0
         self.tracked_objects: Dict[int, TrackedObject] = {}
+        self.filter = BoxKalmanFilter()
+        self.class_index: Dict[str, Set[int]] = {}  # Class name -> ids of its tracks
+        self.spatial_index = SpatialHash(index_cell_size)  # Track id -> box center
+        self.horizontal_fov = horizontal_fov
+        self.object_height = object_height
+        self.last_matches: Dict[int, int] = {}  # Track id -> detection index of the last update()
 
-    def update(self, detections: List[DetectedObject]) -> List[TrackedObject]:
+        if motion not in self.MOTION_MODELS:
+            logger.warning(f"Unknown motion model '{motion}', using 'kalman'")
+            motion = "kalman"
+        self.motion = motion
+        self.flow = OpticalFlow(scale=flow_scale) if motion == "optical_flow" else None
+
+    def predict(self, frame: Optional[np.ndarray] = None) -> List[TrackedObject]:
+        """
+        Advance all tracks by one frame without a detection
+
+        Missing detections are not counted against the tracks (nothing was
+        detected on this frame), their boxes just follow the predicted motion,
+        or the optical flow measured on frame in optical_flow mode.
+
+        Args:
+            frame: Current camera frame (used in optical_flow mode only)
+
+        Returns:
+            List[TrackedObject]: List of currently tracked objects
+        """
+        self._advance(frame)
+        self._sync_boxes()
+        return list(self.tracked_objects.values())
+
+    def _advance(self, frame: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """
+        Predict the filters one frame ahead and correct them with the optical flow
+
+        Returns:
+            Optional[np.ndarray]: The frame's flow image (None without optical flow)
+        """
+        if self.flow is None or frame is None:
+            self.filter.predict()
+            return None
+
+        previous = self.filter.boxes()
+        self.filter.predict()
+        gray = self.flow.prepare(frame)
+        shifts = self.flow.propagate(gray)
+        if not shifts:
+            return gray
+        rows = [row for row, object_id in enumerate(self.tracked_objects) if object_id in shifts]
+        offsets = np.array([shifts[object_id] for object_id in self.tracked_objects
+                            if object_id in shifts])
+        self.filter.update(np.array(rows, dtype=np.intp), previous[rows] + np.tile(offsets, 2),
+                           noise_scale=FLOW_NOISE_SCALE)
+        return gray
+
+    def _sync_boxes(self):
+        """Copy the filtered boxes and velocities to the TrackedObjects and the spatial index"""
+        boxes = np.rint(self.filter.boxes()).astype(np.int32).tolist()
+        velocities = self.filter.velocities().tolist()
+        centers = self.filter.mean[:, :2].tolist()
+        for track, box, velocity, center in zip(self.tracked_objects.values(), boxes, velocities, centers):
+            track.current_bbox = tuple(box)
+            track.velocity = tuple(velocity)
+            self.spatial_index.insert(track.object_id, center)
+
+    def update(self, detections: List[DetectedObject], timestamp: Optional[float] = None,
+               frame: Optional[np.ndarray] = None,
+               detection_frame: Optional[np.ndarray] = None) -> List[TrackedObject]:
         """
         Update tracker with new detections
 
         Args:
-            detections: List of detected objects in current frame
+            detections: Detected objects in current frame (DetectionSet or list)
+            timestamp: Time of the frame, recorded in the track histories (default: now)
+            frame: Current camera frame; in optical_flow mode the tracks are moved
+                   by the flow before matching and flow points are picked afresh
+            detection_frame: Older frame the detections were computed on (e.g. by an
+                             asynchronous detector); in optical_flow mode the
+                             detections are first carried forward to frame by the flow
+
+        Returns:
+            List[TrackedObject]: List of currently tracked objects (including
+                                 ones missed for up to max_disappeared frames)
+        """
+        detections = DetectionSet.from_objects(detections)
+        tracks = list(self.tracked_objects.values())
+        timestamp = time.time() if timestamp is None else timestamp
+        gray = self._advance(frame)
+        if gray is not None and detection_frame is not None and detection_frame is not frame \
+                and len(detections):
+            detections = self._carry_forward(detections, detection_frame, gray)
+
+        rows = cols = np.empty(0, dtype=np.intp)
+        if tracks and len(detections):
+            iou = box_iou(self.filter.boxes(), detections.xyxy)
+
+            # Objects never change class: mask out pairs of different classes
+            class_ids, inverse = np.unique(detections.class_ids, return_inverse=True)
+            detection_classes = np.array([detections.class_names[int(class_id)]
+                                          for class_id in class_ids])[inverse]
+            track_classes = np.array([track.class_name for track in tracks])
+            same_class = track_classes[:, None] == detection_classes[None, :]
+            iou[~same_class] = 0.0
+            rows, cols = match_boxes(iou, self.iou_threshold)
+
+            # Second pass for what overlap missed: tracks whose motion is not known
+            # yet, or objects that moved far between two detections, are matched
+            # by their distance to the predicted center within the filter's uncertainty
+            free_rows = np.setdiff1d(np.arange(len(tracks)), rows)
+            free_cols = np.setdiff1d(np.arange(len(detections)), cols)
+            if len(free_rows) and len(free_cols):
+                distance = self.filter.center_distance(free_rows, detections.xyxy[free_cols])
+                similarity = np.clip(CENTER_GATE - distance, 0.0, None)
+                similarity[~same_class[np.ix_(free_rows, free_cols)]] = 0.0
+                extra_rows, extra_cols = match_boxes(similarity, 1e-6)
+                rows = np.concatenate([rows, free_rows[extra_rows]])
+                cols = np.concatenate([cols, free_cols[extra_cols]])
+
+        self.filter.update(rows, detections.xyxy[cols])
+        self._sync_boxes()
+        for row, score in zip(rows.tolist(), detections.confidence[cols].tolist()):
+            tracks[row].observe(tracks[row].current_bbox, score, timestamp)
+
+        matched = np.zeros(len(tracks), dtype=bool)
+        matched[rows] = True
+        keep = np.ones(len(tracks), dtype=bool)
+        for index in np.flatnonzero(~matched).tolist():
+            track = tracks[index]
+            track.frames_since_seen += 1
+            if track.frames_since_seen > self.max_disappeared:
+                keep[index] = False
+                self._forget(track.object_id)
+                logger.debug(f"Track {track.object_id} ({track.class_name}) lost")
+        if not keep.all():
+            self.filter.keep(keep)
+
+        unmatched = np.ones(len(detections), dtype=bool)
+        unmatched[cols] = False
+        self.last_matches = {tracks[row].object_id: col for row, col in zip(rows.tolist(), cols.tolist())}
+        for col in np.flatnonzero(unmatched).tolist():
+            self.last_matches[self._register(detections[col], timestamp).object_id] = col
+        if gray is not None:
+            # Fresh points inside the corrected boxes, on the same flow image
+            tracks = list(self.tracked_objects.values())
+            self.flow.seed(gray, np.array([track.current_bbox for track in tracks]),
+                           [track.object_id for track in tracks])
+
+        logger.debug(f"Tracker: {len(detections)} detections, {len(rows)} matched, "
+                     f"{len(self.tracked_objects)} tracks")
+        return list(self.tracked_objects.values())
+
+    def _carry_forward(self, detections: DetectionSet, detection_frame: np.ndarray,
+                       gray: np.ndarray) -> DetectionSet:
+        """
+        Move detections from the frame they were computed on to the current frame
+
+        Points are picked inside the detected boxes on the old frame and
+        followed to the current flow image, so the boxes that correct the
+        tracks (and the flow points picked in them afterwards) show the
+        objects where they are now. Boxes the flow cannot follow stay as detected.
+        """
+        self.flow.seed(self.flow.prepare(detection_frame), detections.xyxy, list(range(len(detections))))
+        shifts = self.flow.propagate(gray)
+        if not shifts:
+            return detections
+
+        offsets = np.zeros((len(detections), 2))
+        for index, shift in shifts.items():
+            offsets[index] = shift
+        xyxy = detections.xyxy + np.rint(np.tile(offsets, 2)).astype(detections.xyxy.dtype)
+        return DetectionSet(xyxy, detections.confidence, detections.class_ids, detections.class_names)
+
+    def _register(self, detected_object: DetectedObject, timestamp: float) -> TrackedObject:
+        """Start a new track for an unmatched detection"""
+        track = TrackedObject(self.next_object_id, detected_object, self.history_size, timestamp)
+        self.tracked_objects[track.object_id] = track
+        self.filter.add(np.array([detected_object.bbox]))
+        self.class_index.setdefault(track.class_name, set()).add(track.object_id)
+        x1, y1, x2, y2 = track.current_bbox
+        self.spatial_index.insert(track.object_id, ((x1 + x2) / 2, (y1 + y2) / 2))
+        self.next_object_id += 1
+        return track
+
+    def _forget(self, object_id: int):
+        """Drop a track from the track dict and the indexes (the filter row is dropped by the caller)"""
+        track = self.tracked_objects.pop(object_id)
+        class_ids = self.class_index[track.class_name]
+        class_ids.discard(object_id)
+        if not class_ids:
+            del self.class_index[track.class_name]
+        self.spatial_index.remove(object_id)
+
+    def apply_ego_motion(self, frame_size: Tuple[int, int], yaw: float = 0.0, forward: float = 0.0,
+                         lateral: float = 0.0) -> List[TrackedObject]:
+        """
+        Move all tracks by a known motion of the robot (commanded or measured)
+
+        Call it after a chassis move and before the next update(), so the
+        detections after the move are matched to the existing tracks instead
+        of starting new ones. Tracks that end up behind the camera are dropped;
+        tracks moved out of the frame age out as usual if not seen again.
+
+        Args:
+            frame_size: Camera frame (width, height) in pixels
+            yaw: Rotation in degrees, positive = counter-clockwise (turning left)
+            forward: Forward translation in meters
+            lateral: Sideways translation in meters, positive = to the right
 
         Returns:
             List[TrackedObject]: List of currently tracked objects
         """
-        # TODO: Implement tracking update logic
-        logger.info(f"Updating tracker with {len(detections)} detections")
+        if not self.tracked_objects:
+            return []
+
+        boxes, in_front = ego_motion_boxes(self.filter.boxes(), frame_size, self.horizontal_fov,
+                                           yaw, forward, lateral, self.object_height)
+        self.filter.relocate(boxes)
+        if not in_front.all():
+            for object_id, visible in zip(list(self.tracked_objects), in_front.tolist()):
+                if not visible:
+                    self._forget(object_id)
+            self.filter.keep(in_front)
+        self._sync_boxes()
+        if self.flow is not None:
+            self.flow.reset()  # Points refer to the view before the move
+
+        logger.debug(f"Ego motion (yaw {yaw:.1f}°, forward {forward:.2f}m, lateral {lateral:.2f}m): "
+                     f"{len(self.tracked_objects)} tracks kept")
         return list(self.tracked_objects.values())
 
+    def get_detections(self) -> DetectionSet:
+        """
+        Get the current (possibly predicted) boxes of all tracks as a DetectionSet
+
+        Returns:
+            DetectionSet: One entry per track, with the track's last confidence
+        """
+        tracks = list(self.tracked_objects.values())
+        if not tracks:
+            return DetectionSet.empty()
+
+        class_ids: Dict[str, int] = {}
+        ids = [class_ids.setdefault(track.class_name, len(class_ids)) for track in tracks]
+        return DetectionSet(np.array([track.current_bbox for track in tracks]),
+                            np.array([track.confidence for track in tracks]),
+                            np.array(ids), {class_id: name for name, class_id in class_ids.items()})
+
     def track_object(self, class_name: str) -> Optional[TrackedObject]:
         """
         Get the tracked object of a specific class
@@ -87,11 +908,81 @@ class ObjectTracker:
         Returns:
             Optional[TrackedObject]: Tracked object if found, None otherwise
         """
-        # TODO: Implement class-specific tracking
-        for tracked_obj in self.tracked_objects.values():
-            if tracked_obj.class_name == class_name:
-                return tracked_obj
-        return None
+        # Prefer objects visible in the latest frame, then the most confident one
+        candidates = self.get_objects_by_class(class_name)
+        if not candidates:
+            return None
+        return min(candidates, key=lambda obj: (obj.frames_since_seen, -obj.confidence))
+
+    def get_objects_by_class(self, class_name: str) -> List[TrackedObject]:
+        """
+        Get all tracked objects of a class
+
+        Args:
+            class_name: Name of the class
+
+        Returns:
+            List[TrackedObject]: Tracked objects of that class (empty if none)
+        """
+        return [self.tracked_objects[object_id] for object_id in self.class_index.get(class_name, ())]
+
+    def nearest_object(self, point: Tuple[float, float], class_name: Optional[str] = None,
+                       max_distance: Optional[float] = None) -> Optional[TrackedObject]:
+        """
+        Get the tracked object whose box center is closest to a point
+
+        Args:
+            point: (x, y) image position, e.g. the frame center
+            class_name: Only consider objects of this class (None = any class)
+            max_distance: Only consider objects within this many pixels
+
+        Returns:
+            Optional[TrackedObject]: Closest tracked object, or None
+        """
+        accept = None
+        if class_name is not None:
+            class_ids = self.class_index.get(class_name)
+            if not class_ids:
+                return None
+            accept = class_ids.__contains__
+        object_id = self.spatial_index.nearest(point, accept, max_distance)
+        return None if object_id is None else self.tracked_objects[object_id]
+
+    def objects_in_region(self, region: Tuple[int, int, int, int],
+                          class_name: Optional[str] = None) -> List[TrackedObject]:
+        """
+        Get the tracked objects whose box centers lie inside a region
+
+        Args:
+            region: Region as (x1, y1, x2, y2)
+            class_name: Only objects of this class (None = any class)
+
+        Returns:
+            List[TrackedObject]: Tracked objects in the region, in no particular order
+        """
+        return self._select(self.spatial_index.query_region(*region), class_name)
+
+    def objects_near(self, point: Tuple[float, float], radius: float,
+                     class_name: Optional[str] = None) -> List[TrackedObject]:
+        """
+        Get the tracked objects whose box centers are within a distance of a point
+
+        Args:
+            point: (x, y) image position
+            radius: Maximum center distance in pixels
+            class_name: Only objects of this class (None = any class)
+
+        Returns:
+            List[TrackedObject]: Nearby tracked objects, in no particular order
+        """
+        return self._select(self.spatial_index.query_radius(point, radius), class_name)
+
+    def _select(self, object_ids: List[int], class_name: Optional[str]) -> List[TrackedObject]:
+        """Tracked objects of some ids, optionally only those of one class"""
+        if class_name is not None:
+            class_ids = self.class_index.get(class_name, set())
+            object_ids = [object_id for object_id in object_ids if object_id in class_ids]
+        return [self.tracked_objects[object_id] for object_id in object_ids]
 
     def get_object_by_id(self, object_id: int) -> Optional[TrackedObject]:
         """
@@ -122,7 +1013,9 @@ class ObjectTracker:
             object_id: ID of the object to remove
         """
         if object_id in self.tracked_objects:
-            del self.tracked_objects[object_id]
+            keep = np.array([track_id != object_id for track_id in self.tracked_objects])
+            self.filter.keep(keep)
+            self._forget(object_id)
             logger.info(f"Removed tracked object {object_id}")
 
     def reset(self):
@@ -130,20 +1023,28 @@ class ObjectTracker:
         Reset the tracker, removing all tracked objects
         """
         self.tracked_objects.clear()
+        self.last_matches = {}
+        self.class_index.clear()
+        self.spatial_index.clear()
+        self.filter.clear()
+        if self.flow is not None:
+            self.flow.reset()
         self.next_object_id = 0
         logger.info("Tracker reset")
 
-    def get_object_trajectory(self, object_id: int) -> List:
+    def get_object_trajectory(self, object_id: int, since: Optional[float] = None) -> np.ndarray:
         """
         Get the movement history of a tracked object
 
         Args:
             object_id: ID of the object
+            since: Only boxes observed at or after this time (None = whole history)
 
         Returns:
-            List: History of bounding boxes
+            np.ndarray: (K, 4) boxes as (x1, y1, x2, y2), oldest first (empty if unknown);
+                        timestamps are available through TrackedObject.history.get()
         """
         tracked_obj = self.tracked_objects.get(object_id)
         if tracked_obj:
-            return tracked_obj.history
-        return []
+            return tracked_obj.history.get(since)[0]
+        return np.empty((0, 4), dtype=np.int32)
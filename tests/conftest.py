@@ -0,0 +1,6 @@
+"""
+Pytest configuration
+tests/examples holds vendored RoboMaster SDK samples (with their own pybind11 test suite), not project tests
+"""
+
+collect_ignore = ["examples"]
@@ -0,0 +1,28 @@
+"""
+Steady-state allocation test
+Runs tools/check_allocations.py's per-frame image paths under pytest
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cv2")
+if sys.version_info < (3, 9):
+    pytest.skip("tracemalloc.reset_peak() needs Python 3.9+", allow_module_level=True)
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "tools"))
+import check_allocations  # noqa: E402
+
+FRAMES = check_allocations.make_frames(640, 360)
+PATHS = check_allocations.build_paths(FRAMES[0])
+LIMIT = int(FRAMES[0].nbytes * check_allocations.FRAME_FRACTION)
+
+
+@pytest.mark.parametrize("name", list(PATHS))
+def test_no_per_frame_image_allocations(name):
+    function, pool = PATHS[name]
+    worst, pool_growth = check_allocations.measure_path(function, pool, FRAMES)
+    assert worst <= LIMIT, f"{name} allocates {worst:,} bytes per frame (limit {LIMIT:,})"
+    assert pool_growth == 0, f"{name} grew its buffer pool by {pool_growth} buffers"
@@ -0,0 +1,276 @@
+"""
+Detection Benchmark Tool
+Runs ObjectDetector over a directory of recorded frames (no robot needed)
+and reports latency percentiles, throughput, peak memory and per-stage time
+
+Usage:
+    python tools/benchmark_detection.py --frames data/frames
+    python tools/benchmark_detection.py --frames data/frames --backends ultralytics onnxruntime \\
+        --preprocess none brighten --save-baseline data/benchmarks/baseline.json
+    python tools/benchmark_detection.py --frames data/frames --baseline data/benchmarks/baseline.json
+
+With --baseline the exit code is 1 if any configuration got slower than the
+baseline by more than --tolerance, so the tool can be used as a CI check.
+Each configuration runs in its own process so peak RSS is measured per
+configuration and one backend's memory does not leak into the next.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import time
+
+from common import load_frames, percentile_summary
+
+import numpy as np
+from config import settings
+
+# Demo brightness factor for low-light floor frames (see demo_sorting_floor.py)
+BRIGHTNESS_FACTOR = 1.8
+
+# Metrics compared against the baseline (lower is better)
+REGRESSION_METRICS = ("p50", "p95")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the object detector on recorded frames")
+    parser.add_argument("--frames", required=True, help="Directory of recorded robot frames")
+    parser.add_argument("--model", default=None, help="Model path (default: DETECTION_MODEL_PATH or yolov8n)")
+    parser.add_argument("--backends", nargs="+", default=[settings.DETECTION_BACKEND],
+                        help="Inference backends to benchmark")
+    parser.add_argument("--preprocess", nargs="+", default=["none"], choices=sorted(PREPROCESSORS),
+                        help="Preprocessing options to benchmark")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of frames to load")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the frames")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed warm-up frames")
+    parser.add_argument("--confidence", type=float, default=settings.DETECTION_CONFIDENCE_THRESHOLD,
+                        help="Detection confidence threshold")
+    parser.add_argument("--output", default=None, help="Write the full JSON report here")
+    parser.add_argument("--save-baseline", default=None, help="Save the results as a baseline file")
+    parser.add_argument("--baseline", default=None, help="Compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed slowdown against the baseline (0.15 = 15%%)")
+    return parser.parse_args()
+
+
+def hsv_brighten(image, factor=BRIGHTNESS_FACTOR):
+    """Brighten via the V channel in HSV (the demo's former brighten_image, kept as reference)"""
+    import cv2
+
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    h, s, v = cv2.split(hsv)
+    v = np.clip(v * factor, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(cv2.merge([h, s, v]), cv2.COLOR_HSV2BGR)
+
+
+def make_pipeline():
+    """ImagePreprocessor.preprocess_for_detection as used by main.py"""
+    from src.vision.preprocessing import ImagePreprocessor
+
+    return ImagePreprocessor().preprocess_for_detection
+
+
+def make_lut_brighten():
+    """Demo brightening through the fused LUT preprocessor"""
+    from src.vision.preprocessing import ImagePreprocessor
+
+    return ImagePreprocessor(brightness=BRIGHTNESS_FACTOR).preprocess_for_detection
+
+
+# Preprocessing options: name -> factory returning a frame -> frame function (None = skip)
+PREPROCESSORS = {
+    "none": lambda: None,
+    "brighten": lambda: hsv_brighten,
+    "lut_brighten": make_lut_brighten,
+    "pipeline": make_pipeline,
+}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_config(config: dict) -> dict:
+    """
+    Benchmark one backend/preprocessing configuration
+
+    Runs in a fresh process, so the peak RSS reported is this configuration's own.
+
+    Args:
+        config: backend, preprocess, model, frames, limit, repeat, warmup, confidence
+
+    Returns:
+        dict: Results for the configuration (or an "error" entry)
+    """
+    import logging
+    logging.basicConfig(level=logging.WARNING)
+
+    from src.vision.detection import ObjectDetector
+
+    frames = [image for _, image in load_frames(config["frames"], config["limit"])]
+    preprocess = PREPROCESSORS[config["preprocess"]]()
+
+    start = time.perf_counter()
+    detector = ObjectDetector(model_path=config["model"], confidence_threshold=config["confidence"],
+                              backend=config["backend"], classes=settings.OBJECT_CLASSES)
+    if not detector.load_model():
+        return {"error": f"failed to load model with backend '{config['backend']}'"}
+    load_ms = (time.perf_counter() - start) * 1000
+    rss_after_load = peak_rss_mb()
+
+    for frame in frames[:config["warmup"]]:
+        detector.detect_objects(preprocess(frame) if preprocess else frame)
+
+    # Per-stage breakdown of every measured call (letterbox, forward pass, NMS, results)
+    detector.enable_timing(capacity=len(frames) * config["repeat"])
+
+    total, preprocess_ms, detect_ms = [], [], []
+    detections = 0
+    run_start = time.perf_counter()
+    for _ in range(config["repeat"]):
+        for frame in frames:
+            t0 = time.perf_counter()
+            image = preprocess(frame) if preprocess else frame
+            t1 = time.perf_counter()
+            result = detector.detect_objects(image)
+            t2 = time.perf_counter()
+
+            preprocess_ms.append((t1 - t0) * 1000)
+            detect_ms.append((t2 - t1) * 1000)
+            total.append((t2 - t0) * 1000)
+            detections += len(result)
+    run_seconds = time.perf_counter() - run_start
+
+    return {
+        "frames": len(total),
+        "latency_ms": percentile_summary(total),
+        "throughput_fps": len(total) / run_seconds if run_seconds else 0.0,
+        "stages_ms": {
+            "frame_preprocess": percentile_summary(preprocess_ms),
+            "detect": percentile_summary(detect_ms),
+            **detector.get_timing_stats()["stages"],
+        },
+        "load_ms": load_ms,
+        "peak_rss_mb": peak_rss_mb(),
+        "model_rss_mb": rss_after_load,
+        "detections_per_frame": detections / len(total) if total else 0.0,
+    }
+
+
+def run_isolated(config: dict) -> dict:
+    """Run one configuration in a fresh child process"""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(run_config, (config,))
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Find configurations that got slower than the baseline
+
+    Args:
+        results: Current results by configuration name
+        baseline: Baseline results by configuration name
+        tolerance: Allowed relative slowdown
+
+    Returns:
+        list: Human-readable regression descriptions (empty if none)
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None or "error" in result or "error" in reference:
+            continue
+        for metric in REGRESSION_METRICS:
+            old, new = reference["latency_ms"][metric], result["latency_ms"][metric]
+            if old > 0 and new > old * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {old:.2f}ms -> {new:.2f}ms "
+                                   f"(+{(new - old) / old * 100:.1f}%)")
+        old, new = reference["throughput_fps"], result["throughput_fps"]
+        if new < old * (1 - tolerance):
+            regressions.append(f"{name}: throughput {old:.1f} -> {new:.1f} FPS")
+    return regressions
+
+
+def print_results(results: dict):
+    """Print one row per configuration"""
+    print("\n" + "=" * 112)
+    print(f"{'configuration':<28}{'p50':>8}{'p95':>8}{'p99':>8}{'FPS':>8}"
+          f"{'frame':>8}{'letterbox':>10}{'forward':>8}{'nms':>8}{'results':>8}{'load':>8}{'RSS MB':>8}")
+    print("-" * 112)
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:<28}  ✗ {result['error']}")
+            continue
+        latency, stages = result["latency_ms"], result["stages_ms"]
+        print(f"{name:<28}{latency['p50']:>8.2f}{latency['p95']:>8.2f}{latency['p99']:>8.2f}"
+              f"{result['throughput_fps']:>8.1f}{stages['frame_preprocess']['p50']:>8.2f}"
+              f"{stages['preprocess']['p50']:>10.2f}{stages['inference']['p50']:>8.2f}"
+              f"{stages['postprocess']['p50']:>8.2f}{stages['results']['p50']:>8.2f}"
+              f"{result['load_ms'] / 1000:>7.1f}s{result['peak_rss_mb']:>8.0f}")
+    print("=" * 112)
+    print("Latencies in ms per frame (frame preprocessing + detection); stage columns are p50")
+
+
+def save_json(path: str, data: dict):
+    """Write JSON, creating the parent directory"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    args = parse_args()
+
+    results = {}
+    for backend in args.backends:
+        for preprocess in args.preprocess:
+            name = f"{backend}/{preprocess}"
+            print(f"Benchmarking {name}...")
+            results[name] = run_isolated({
+                "backend": backend,
+                "preprocess": preprocess,
+                "model": args.model,
+                "frames": args.frames,
+                "limit": args.limit,
+                "repeat": args.repeat,
+                "warmup": args.warmup,
+                "confidence": args.confidence,
+            })
+
+    print_results(results)
+
+    report = {
+        "machine": {"platform": platform.platform(), "processor": platform.processor(),
+                    "cpus": os.cpu_count()},
+        "results": results,
+    }
+    if args.output:
+        save_json(args.output, report)
+        print(f"Report saved to {args.output}")
+    if args.save_baseline:
+        save_json(args.save_baseline, report)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n✗ Performance regressions (tolerance {args.tolerance * 100:.0f}%):")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print(f"\n✓ No regressions against {args.baseline}")
+
+    if any("error" in result for result in results.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
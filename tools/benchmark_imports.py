@@ -0,0 +1,147 @@
+"""
+Import-Time Benchmark Tool
+Measures how long the project packages take to import in a fresh interpreter
+and checks that heavy dependencies stay lazy
+
+Usage:
+    python tools/benchmark_imports.py
+    python tools/benchmark_imports.py --save-baseline data/benchmarks/imports.json
+    python tools/benchmark_imports.py --baseline data/benchmarks/imports.json
+
+Exit code is 1 if importing a package (or one of the listed cv2-free
+submodules) loads a heavy dependency (OpenCV, torch,
+Ultralytics, ONNX Runtime, the RoboMaster SDK) or, with --baseline, if an
+import got slower than the baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from common import PROJECT_ROOT
+
+# Imports measured, each in a fresh interpreter
+IMPORTS = (
+    "config.settings",
+    "src",
+    "src.vision",
+    "src.robot_control",
+    "src.sorting",
+    # Submodules used by offline tools (map, scan replay) without a camera
+    "src.vision.detection",
+    "src.vision.tracking",
+    "src.vision.object_map",
+    "src.robot_control.scanner",
+    "src.sorting.strategy",
+)
+
+# Modules that must not be loaded just by importing the packages and submodules above
+HEAVY_MODULES = ("cv2", "torch", "ultralytics", "onnxruntime", "robomaster")
+
+# Child script: time one import, report the time and which heavy modules got loaded
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000,
+                   "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+# Extra milliseconds allowed on top of --tolerance (import times are small and noisy)
+NOISE_FLOOR_MS = 5.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark package import time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per import")
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    parser.add_argument("--save-baseline", default=None, help="Save the results as a baseline file")
+    parser.add_argument("--baseline", default=None, help="Compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed slowdown against the baseline (0.5 = 50%%)")
+    return parser.parse_args()
+
+
+def measure(module: str, runs: int) -> dict:
+    """
+    Import a module in fresh interpreters and time it
+
+    Args:
+        module: Dotted module name
+        runs: Number of interpreters to start
+
+    Returns:
+        dict: median and min import time in ms and heavy modules that were loaded
+    """
+    probe = PROBE.format(root=str(PROJECT_ROOT), module=module, heavy=HEAVY_MODULES)
+    times, heavy = [], set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True,
+                                cwd=str(PROJECT_ROOT), check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["ms"])
+        heavy.update(result["heavy"])
+
+    return {"median_ms": statistics.median(times), "min_ms": min(times), "heavy": sorted(heavy)}
+
+
+def save_json(path: str, data: dict):
+    """Write JSON, creating the parent directory"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    args = parse_args()
+
+    results = {}
+    print(f"{'import':<28}{'median':>10}{'min':>10}  heavy modules loaded")
+    print("-" * 68)
+    for module in IMPORTS:
+        try:
+            result = measure(module, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<28}  ✗ import failed:\n{e.stderr}")
+            return 1
+        results[module] = result
+        print(f"{module:<28}{result['median_ms']:>8.1f}ms{result['min_ms']:>8.1f}ms  "
+              f"{', '.join(result['heavy']) or '-'}")
+
+    failures = [f"{module} loads {', '.join(result['heavy'])}"
+                for module, result in results.items() if result["heavy"]]
+
+    if args.output:
+        save_json(args.output, {"python": sys.version.split()[0], "results": results})
+    if args.save_baseline:
+        save_json(args.save_baseline, {"python": sys.version.split()[0], "results": results})
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        for module, result in results.items():
+            if module not in baseline:
+                continue
+            old, new = baseline[module]["median_ms"], result["median_ms"]
+            if new > old * (1 + args.tolerance) + NOISE_FLOOR_MS:
+                failures.append(f"{module}: {old:.1f}ms -> {new:.1f}ms")
+
+    if failures:
+        print("\n✗ Import regressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+
+    print("\n✓ Imports are lazy" + (f" and within {args.tolerance * 100:.0f}% of the baseline"
+                                     if args.baseline else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+"""
+Optical Flow Tracking Benchmark
+Pans a recorded frame (or a synthetic textured frame) like a turning camera and
+checks how well ObjectTracker's optical_flow mode keeps boxes on their content
+between detections, compared to Kalman prediction alone
+
+Usage:
+    python tools/benchmark_optical_flow.py --frames data/frames
+    python tools/benchmark_optical_flow.py --speed 12 --interval 15   # faster pan, rarer detections
+
+The first frame is "detected" (boxes on a grid), then every following frame
+only calls predict() with the panned frame. The camera pans at constant speed
+and changes direction halfway, which prediction alone cannot follow. The exit
+code is 1 if the flow error exceeds --max-error-px or predict() is slower than
+--budget-ms at p95.
+"""
+
+import argparse
+import time
+
+from common import load_frames, percentile_summary
+
+import numpy as np
+from src.vision.detection import DetectionSet
+from src.vision.tracking import ObjectTracker
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark optical flow box propagation")
+    parser.add_argument("--frames", default=None, help="Directory of recorded frames (first one is used)")
+    parser.add_argument("--width", type=int, default=640, help="Frame width")
+    parser.add_argument("--height", type=int, default=360, help="Frame height")
+    parser.add_argument("--interval", type=int, default=10, help="Frames between two detections")
+    parser.add_argument("--speed", type=float, default=6.0, help="Pan speed in pixels per frame")
+    parser.add_argument("--scale", type=float, default=0.5, help="Optical flow downscale factor")
+    parser.add_argument("--max-error-px", type=float, default=8.0,
+                        help="Mean flow error above which the exit code is 1")
+    parser.add_argument("--budget-ms", type=float, default=5.0,
+                        help="p95 predict() time above which the exit code is 1")
+    return parser.parse_args()
+
+
+def make_scene(args) -> np.ndarray:
+    """Large canvas to pan over: a recorded frame upscaled, or blurred noise"""
+    import cv2
+
+    size = (args.width * 2, args.height * 2)
+    if args.frames:
+        return cv2.resize(load_frames(args.frames, 1)[0][1], size)
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 255, (size[1] // 8, size[0] // 8, 3), dtype=np.uint8)
+    return cv2.resize(noise, size, interpolation=cv2.INTER_CUBIC)
+
+
+def main():
+    args = parse_args()
+    canvas = make_scene(args)
+    origin = np.array([args.width / 2, args.height / 2])
+
+    # Four boxes spread over the view, as if detected on the first frame
+    xs, ys = np.meshgrid([0.2, 0.6], [0.25, 0.6])
+    corners = np.stack([xs.ravel() * args.width, ys.ravel() * args.height], axis=1)
+    boxes = np.hstack([corners, corners + [args.width * 0.15, args.height * 0.2]])
+    detections = DetectionSet(boxes, np.full(len(boxes), 0.9), np.zeros(len(boxes), dtype=int), {0: "object"})
+
+    def view(offset):
+        x, y = np.rint(origin + offset).astype(int)
+        return canvas[y:y + args.height, x:x + args.width]
+
+    results = {}
+    for motion in ("kalman", "optical_flow"):
+        tracker = ObjectTracker(motion=motion, flow_scale=args.scale)
+        offset = np.zeros(2)
+        velocity = np.array([args.speed, args.speed / 3])
+        tracker.update(detections, frame=view(offset))
+        samples, errors = [], []
+        for step in range(1, args.interval + 1):
+            if step == args.interval // 2:
+                velocity = -velocity  # The robot turns the other way
+            offset += velocity
+            frame = np.ascontiguousarray(view(offset))
+            start = time.perf_counter()
+            tracks = tracker.predict(frame)
+            samples.append((time.perf_counter() - start) * 1000)
+            # Content moves opposite to the camera
+            expected = boxes - np.tile(offset, 2)
+            predicted = np.array([track.current_bbox for track in tracks], dtype=np.float64)
+            errors.append(np.abs(predicted - expected)[:, :2].max(axis=1).mean())
+        results[motion] = (percentile_summary(samples), errors)
+
+    print(f"{args.width}x{args.height}, pan {args.speed:.0f}px/frame reversing halfway, "
+          f"{args.interval} frames without detection\n")
+    print(f"{'motion':<15}{'mean error':>12}{'final error':>13}{'predict p50':>13}{'p95':>9}")
+    print("-" * 62)
+    for motion, (latency, errors) in results.items():
+        print(f"{motion:<15}{np.mean(errors):>10.1f}px{errors[-1]:>11.1f}px"
+              f"{latency['p50']:>11.2f}ms{latency['p95']:>7.2f}ms")
+
+    latency, errors = results["optical_flow"]
+    if np.mean(errors) > args.max_error_px or latency["p95"] > args.budget_ms:
+        print(f"\n✗ Optical flow outside {args.max_error_px}px / {args.budget_ms}ms")
+        return 1
+    print(f"\n✓ Optical flow within {args.max_error_px}px / {args.budget_ms}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
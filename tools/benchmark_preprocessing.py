@@ -0,0 +1,146 @@
+"""
+Preprocessing Profile Benchmark
+Compares the per-frame cost of the lighting profiles in
+settings.PREPROCESSING_PROFILES on recorded frames (no robot or model needed)
+
+Usage:
+    python tools/benchmark_preprocessing.py --frames data/frames
+    python tools/benchmark_preprocessing.py --frames data/frames --profiles bright_lab dim_warehouse
+    python tools/benchmark_preprocessing.py --width 1280 --height 720   # synthetic frames
+
+Each profile is compiled once and warmed up before timing, so the numbers are
+the steady-state cost per frame. With --baseline the exit code is 1 if a
+profile got slower than the baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+
+from common import load_frames, percentile_summary
+
+import numpy as np
+from config import settings
+from src.vision.preprocessing import ImagePreprocessor
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the preprocessing profiles")
+    parser.add_argument("--frames", default=None,
+                        help="Directory of recorded robot frames (default: synthetic dark frames)")
+    parser.add_argument("--width", type=int, default=640, help="Synthetic frame width")
+    parser.add_argument("--height", type=int, default=360, help="Synthetic frame height")
+    parser.add_argument("--profiles", nargs="+", default=sorted(settings.PREPROCESSING_PROFILES),
+                        choices=sorted(settings.PREPROCESSING_PROFILES), help="Profiles to benchmark")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of frames to load")
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the frames")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed warm-up frames")
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    parser.add_argument("--save-baseline", default=None, help="Save the results as a baseline file")
+    parser.add_argument("--baseline", default=None, help="Compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline (0.25 = 25%%)")
+    return parser.parse_args()
+
+
+def make_frames(args) -> list:
+    """Recorded frames, or a few synthetic low-light frames"""
+    if args.frames:
+        return [image for _, image in load_frames(args.frames, args.limit)]
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 80, (args.height, args.width, 3), dtype=np.uint8) for _ in range(4)]
+
+
+def benchmark_profile(name: str, frames: list, repeat: int, warmup: int) -> dict:
+    """
+    Time one profile's preprocess_for_detection() per frame
+
+    Args:
+        name: Profile name
+        frames: BGR frames
+        repeat: Passes over the frames
+        warmup: Untimed calls before measuring
+
+    Returns:
+        dict: Latency summary in ms, throughput and number of compiled stages
+    """
+    preprocessor = ImagePreprocessor(profiles=settings.PREPROCESSING_PROFILES, profile=name)
+    for i in range(warmup):
+        preprocessor.preprocess_for_detection(frames[i % len(frames)])
+
+    samples = []
+    for _ in range(repeat):
+        for frame in frames:
+            start = time.perf_counter()
+            preprocessor.preprocess_for_detection(frame)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    total_seconds = sum(samples) / 1000
+    return {
+        "frames": len(samples),
+        "latency_ms": percentile_summary(samples),
+        "throughput_fps": len(samples) / total_seconds if total_seconds else 0.0,
+        "stages": len(preprocessor.compile_profile(name).stages),
+    }
+
+
+def save_json(path: str, data: dict):
+    """Write JSON, creating the parent directory"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    args = parse_args()
+    frames = make_frames(args)
+    height, width = frames[0].shape[:2]
+
+    print(f"{len(frames)} frames of {width}x{height}, {args.repeat} passes\n")
+    print(f"{'profile':<20}{'stages':>8}{'mean':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'FPS':>10}")
+    print("-" * 70)
+
+    results = {}
+    for name in args.profiles:
+        result = results[name] = benchmark_profile(name, frames, args.repeat, args.warmup)
+        latency = result["latency_ms"]
+        print(f"{name:<20}{result['stages']:>8}{latency['mean']:>8.2f}{latency['p50']:>8.2f}"
+              f"{latency['p95']:>8.2f}{latency['p99']:>8.2f}{result['throughput_fps']:>10.0f}")
+    print("Latencies in ms per frame")
+
+    report = {
+        "machine": {"platform": platform.platform(), "processor": platform.processor(),
+                    "cpus": os.cpu_count()},
+        "frame_size": [width, height],
+        "results": results,
+    }
+    if args.output:
+        save_json(args.output, report)
+        print(f"Report saved to {args.output}")
+    if args.save_baseline:
+        save_json(args.save_baseline, report)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            old, new = baseline[name]["latency_ms"]["p50"], result["latency_ms"]["p50"]
+            if old > 0 and new > old * (1 + args.tolerance):
+                regressions.append(f"{name}: p50 {old:.2f}ms -> {new:.2f}ms")
+        if regressions:
+            print(f"\n✗ Performance regressions (tolerance {args.tolerance * 100:.0f}%):")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print(f"\n✓ No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,150 @@
+"""
+Tracker Benchmark
+Runs ObjectTracker on a synthetic scene of moving objects (no robot or model
+needed) and reports update latency and identity stability
+
+Usage:
+    python tools/benchmark_tracking.py
+    python tools/benchmark_tracking.py --objects 50 --frames 2000 --miss-rate 0.1
+    python tools/benchmark_tracking.py --interval 5   # detect every 5th frame, predict the rest
+
+Every simulated object has a ground-truth id. An id switch is counted when the
+track following an object changes: when an object stays unseen longer than
+max_disappeared, when two objects of the same class cross, or when an object
+bounces off the frame edge between two detections. With --interval
+the frames in between only call predict(), and the error of the predicted
+boxes against the true object positions is reported.
+"""
+
+import argparse
+import time
+
+from common import percentile_summary
+
+import numpy as np
+from src.vision.detection import DetectionSet
+from src.vision.tracking import ObjectTracker
+
+CLASS_NAMES = {0: "bottle", 1: "cup"}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the object tracker")
+    parser.add_argument("--objects", type=int, default=30, help="Objects in the scene")
+    parser.add_argument("--frames", type=int, default=1000, help="Simulated frames")
+    parser.add_argument("--miss-rate", type=float, default=0.05,
+                        help="Probability that an object is not detected in a frame")
+    parser.add_argument("--jitter", type=float, default=2.0, help="Box noise in pixels")
+    parser.add_argument("--max-disappeared", type=int, default=10, help="Tracker max_disappeared")
+    parser.add_argument("--interval", type=int, default=1,
+                        help="Detect every Nth frame and only predict the others")
+    parser.add_argument("--budget-ms", type=float, default=1.0,
+                        help="p95 update time above which the exit code is 1")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args()
+
+
+class Scene:
+    """Objects moving at constant velocity, bouncing off the frame edges"""
+
+    def __init__(self, count: int, rng: np.random.Generator, width: int = 1280, height: int = 720):
+        self.rng = rng
+        self.size = np.array([width, height], dtype=np.float64)
+        self.box_size = rng.uniform(30, 60, (count, 2))
+        self.position = rng.uniform(0, 1, (count, 2)) * (self.size - self.box_size)
+        self.velocity = rng.uniform(-4, 4, (count, 2))
+        self.class_ids = rng.integers(0, len(CLASS_NAMES), count)
+
+    def step(self, jitter: float, miss_rate: float):
+        """
+        Advance one frame and detect the objects
+
+        Returns:
+            tuple: (DetectionSet, ground-truth ids of the detections)
+        """
+        self.position += self.velocity
+        limit = self.size - self.box_size
+        bounced = (self.position < 0) | (self.position > limit)
+        self.velocity[bounced] *= -1
+        self.position = np.clip(self.position, 0, limit)
+
+        visible = np.flatnonzero(self.rng.random(len(self.position)) >= miss_rate)
+        noisy = self.position[visible] + self.rng.normal(0, jitter, (len(visible), 2))
+        xyxy = np.hstack([noisy, noisy + self.box_size[visible]])
+        detections = DetectionSet(xyxy, np.full(len(visible), 0.9), self.class_ids[visible], CLASS_NAMES)
+        return detections, visible
+
+    def centers(self) -> np.ndarray:
+        """True (N, 2) box centers"""
+        return self.position + self.box_size / 2
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    scene = Scene(args.objects, rng)
+    tracker = ObjectTracker(max_disappeared=args.max_disappeared)
+
+    # Warm up: the first frame creates the tracks, the second resolves the optional SciPy import
+    for _ in range(2):
+        tracker.update(scene.step(args.jitter, args.miss_rate)[0])
+
+    samples, predict_samples, errors = [], [], []
+    assigned = {}  # ground-truth id -> track id following it
+    switches = 0
+    for frame in range(args.frames):
+        detections, truth = scene.step(args.jitter, args.miss_rate)
+        if frame % args.interval:
+            start = time.perf_counter()
+            tracks = tracker.predict()
+            predict_samples.append((time.perf_counter() - start) * 1000)
+
+            # Distance between each followed object and its track's predicted center
+            by_id = {track.object_id: track for track in tracks}
+            centers = scene.centers()
+            for object_id, track_id in assigned.items():
+                track = by_id.get(track_id)
+                if track is not None:
+                    x1, y1, x2, y2 = track.current_bbox
+                    errors.append(np.hypot((x1 + x2) / 2 - centers[object_id, 0],
+                                           (y1 + y2) / 2 - centers[object_id, 1]))
+            continue
+
+        start = time.perf_counter()
+        tracks = tracker.update(detections)
+        samples.append((time.perf_counter() - start) * 1000)
+
+        # The track whose box equals a detection's box is the one that matched it
+        by_box = {tuple(track.current_bbox): track.object_id
+                  for track in tracks if track.frames_since_seen == 0}
+        for box, object_id in zip(map(tuple, detections.xyxy.tolist()), truth.tolist()):
+            track_id = by_box.get(box)
+            if track_id is None:
+                continue
+            if object_id in assigned and assigned[object_id] != track_id:
+                switches += 1
+            assigned[object_id] = track_id
+
+    latency = percentile_summary(samples)
+    print(f"{args.objects} objects, {args.frames} frames, miss rate {args.miss_rate:.0%}, "
+          f"detection every {args.interval} frame(s)\n")
+    print(f"update time   mean {latency['mean']:.3f}ms  p50 {latency['p50']:.3f}ms  "
+          f"p95 {latency['p95']:.3f}ms  max {latency['max']:.3f}ms")
+    if predict_samples:
+        prediction = percentile_summary(predict_samples)
+        print(f"predict time  mean {prediction['mean']:.3f}ms  p50 {prediction['p50']:.3f}ms  "
+              f"p95 {prediction['p95']:.3f}ms")
+        print(f"prediction    center error mean {np.mean(errors):.1f}px  "
+              f"p95 {np.percentile(errors, 95):.1f}px")
+    print(f"tracks        {len(tracker.tracked_objects)} live, {tracker.next_object_id} created")
+    print(f"id switches   {switches}")
+
+    if latency["p95"] > args.budget_ms:
+        print(f"\n✗ p95 update time above {args.budget_ms}ms")
+        return 1
+    print(f"\n✓ p95 update time within {args.budget_ms}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+"""
+Steady-State Allocation Check
+Verifies that the per-frame image paths reuse their buffers instead of
+allocating new full-resolution arrays every frame
+
+Usage:
+    python tools/check_allocations.py
+    python tools/check_allocations.py --width 1280 --height 720 --frames 50
+
+Each path is run a few times to fill its buffers, then traced with tracemalloc
+(NumPy and OpenCV arrays are traced; needs Python 3.9+). The exit code is 1 if a path still
+allocates image-sized memory per frame or grows its buffer pool. tests/test_allocations.py
+runs the same check under pytest.
+"""
+
+import argparse
+import tracemalloc
+
+import common  # noqa: F401  (adds the project root to sys.path)
+
+import numpy as np
+from config import settings
+from src.vision.backends import OnnxRuntimeBackend, letterbox
+from src.vision.detection import DetectionSet, ObjectDetector
+from src.vision.preprocessing import ImagePreprocessor
+from src.vision.tracking import ObjectTracker
+
+# Allocations below this fraction of one frame are bookkeeping (e.g. NumPy's
+# fixed-size casting buffers), not image copies
+FRAME_FRACTION = 0.1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Count per-frame allocations of the image paths")
+    parser.add_argument("--width", type=int, default=640, help="Frame width")
+    parser.add_argument("--height", type=int, default=360, help="Frame height")
+    parser.add_argument("--frames", type=int, default=20, help="Traced frames per path")
+    parser.add_argument("--warmup", type=int, default=3, help="Untraced frames per path")
+    return parser.parse_args()
+
+
+def build_paths(frame: np.ndarray) -> dict:
+    """
+    Build the per-frame operations to check, each writing into reused buffers
+
+    Args:
+        frame: Sample camera frame
+
+    Returns:
+        dict: name -> (callable taking a frame, BufferPool or None)
+    """
+    height, width = frame.shape[:2]
+    preprocessor = ImagePreprocessor(brightness=1.8)
+    auto = ImagePreprocessor()
+    auto.enable_auto_exposure()
+    profiled = ImagePreprocessor(profiles=settings.PREPROCESSING_PROFILES, profile="dim_warehouse")
+
+    # Only the preprocessing half of the ONNX backend is used (no model needed)
+    backend = OnnxRuntimeBackend()
+
+    resized = np.empty((height // 2, width // 2, 3), dtype=np.uint8)
+    rgb = np.empty_like(frame)
+    crop = np.empty((height // 2, width // 2, 3), dtype=np.uint8)
+    boxed = np.empty((640, 640, 3), dtype=np.uint8)
+    drawn = np.empty_like(frame)
+
+    detector = ObjectDetector()
+    detections = DetectionSet.from_array(
+        np.array([[10, 10, 100, 120, 0.9, 0], [200, 50, 300, 200, 0.7, 1]], dtype=np.float32),
+        {0: "bottle", 1: "cup"})
+    flow_tracker = ObjectTracker(motion="optical_flow")
+    flow_tracker.update(detections, frame=frame)
+
+    return {
+        "preprocess_for_detection": (lambda f: preprocessor.preprocess_for_detection(f),
+                                     preprocessor.pool),
+        "preprocess (auto exposure)": (lambda f: auto.preprocess_for_detection(f), auto.pool),
+        "profile dim_warehouse": (lambda f: profiled.preprocess_for_detection(f), profiled.pool),
+        "preprocess + resize": (lambda f: preprocessor.preprocess_for_detection(
+            f, target_size=(width // 2, height // 2)), preprocessor.pool),
+        "resize_image(out=)": (lambda f: preprocessor.resize_image(
+            f, (width // 2, height // 2), out=resized), None),
+        "convert_color_space(out=)": (lambda f: preprocessor.convert_color_space(
+            f, "RGB", out=rgb), None),
+        "crop_region(out=)": (lambda f: preprocessor.crop_region(
+            f, (0, 0, width // 2, height // 2), out=crop), None),
+        "letterbox(out=)": (lambda f: letterbox(f, (640, 640), out=boxed), None),
+        "onnx prepare_batch": (lambda f: backend.prepare_batch([f]), backend.pool),
+        "draw_detections(out=)": (lambda f: detector.draw_detections(f, detections, out=drawn), None),
+        "tracker predict (optical flow)": (lambda f: flow_tracker.predict(f), flow_tracker.flow.pool),
+    }
+
+
+def traced_peak(function, frame: np.ndarray) -> int:
+    """
+    Peak memory allocated (and possibly freed again) during one call
+
+    Args:
+        function: Operation to run
+        frame: Input frame
+
+    Returns:
+        int: Peak traced bytes above the level before the call
+    """
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    function(frame)
+    _, peak = tracemalloc.get_traced_memory()
+    return peak - before
+
+
+def make_frames(width: int, height: int, count: int = 4) -> list:
+    """Dark noise frames (low values keep auto exposure and the tone LUT busy)"""
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 80, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def measure_path(function, pool, frames: list, warmup: int = 3, traced: int = 20) -> tuple:
+    """
+    Run one path until its buffers are filled, then trace its per-frame allocations
+
+    Args:
+        function: Operation taking a frame
+        pool: BufferPool the operation draws from (None if it only writes into out=)
+        frames: Input frames, used round-robin
+        warmup: Untraced calls
+        traced: Traced calls
+
+    Returns:
+        tuple: (worst bytes allocated in one call, buffer pool allocations while traced)
+    """
+    for i in range(warmup):
+        function(frames[i % len(frames)])
+    pool_before = pool.allocations if pool else 0
+
+    tracemalloc.start()
+    try:
+        worst = max(traced_peak(function, frames[i % len(frames)]) for i in range(traced))
+    finally:
+        tracemalloc.stop()
+    return worst, (pool.allocations - pool_before) if pool else 0
+
+
+def main():
+    args = parse_args()
+    frames = make_frames(args.width, args.height)
+    frame_bytes = frames[0].nbytes
+    limit = int(frame_bytes * FRAME_FRACTION)
+
+    failures = []
+    print(f"Frame {args.width}x{args.height} ({frame_bytes / 1024:.0f} KB), "
+          f"limit {limit / 1024:.0f} KB per frame\n")
+    print(f"{'path':<32}{'max bytes/frame':>18}{'pool allocations':>18}")
+    print("-" * 68)
+
+    for name, (function, pool) in build_paths(frames[0]).items():
+        worst, pool_growth = measure_path(function, pool, frames, args.warmup, args.frames)
+        ok = worst <= limit and pool_growth == 0
+        print(f"{name:<32}{worst:>18,}{pool_growth:>18}  {'✓' if ok else '✗'}")
+        if not ok:
+            failures.append(name)
+
+    if failures:
+        print(f"\n✗ Per-frame allocations in: {', '.join(failures)}")
+        return 1
+    print("\n✓ No image-sized allocations in steady state")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+"""
+Shared helpers for the offline tools (quantization, benchmarks)
+Adds the project root to sys.path and loads recorded robot frames from disk
+"""
+
+import glob
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def list_frames(directory: str, limit: Optional[int] = None) -> List[str]:
+    """
+    List recorded frame files in a directory, sorted by name
+
+    Args:
+        directory: Directory containing saved frames
+        limit: Optional maximum number of files
+
+    Returns:
+        List[str]: Image file paths
+    """
+    paths = sorted(
+        path for path in glob.glob(os.path.join(directory, "*"))
+        if path.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    return paths[:limit] if limit else paths
+
+
+def load_frames(directory: str, limit: Optional[int] = None) -> List[Tuple[str, "np.ndarray"]]:
+    """
+    Load recorded frames (BGR) from a directory
+
+    Args:
+        directory: Directory containing saved frames
+        limit: Optional maximum number of frames
+
+    Returns:
+        List[Tuple[str, np.ndarray]]: (path, image) pairs, unreadable files skipped
+    """
+    import cv2
+
+    frames = []
+    for path in list_frames(directory, limit):
+        image = cv2.imread(path)
+        if image is not None:
+            frames.append((path, image))
+
+    if not frames:
+        raise FileNotFoundError(f"No readable frames ({', '.join(IMAGE_EXTENSIONS)}) in {directory}")
+    return frames
+
+
+def percentile_summary(samples_ms) -> dict:
+    """
+    Summarize latency samples in milliseconds
+
+    Args:
+        samples_ms: Sequence of latencies in milliseconds
+
+    Returns:
+        dict: mean, p50, p95, p99 and max
+    """
+    import numpy as np
+
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    if samples.size == 0:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "mean": float(samples.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(samples.max()),
+    }
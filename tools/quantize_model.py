@@ -0,0 +1,334 @@
+"""
+INT8 Post-Training Quantization Tool
+Calibrates an INT8 ONNX detection model from recorded robot frames and
+compares it side by side with the fp32 ObjectDetector
+
+Usage:
+    python tools/quantize_model.py --frames data/frames
+    python tools/quantize_model.py --frames data/frames --model models/yolo_model.pt \\
+        --output models/yolo_model_int8.onnx --calibration-frames 100
+
+The written .onnx file loads directly with
+ObjectDetector(model_path="models/..._int8.onnx").load_model()
+(or by setting DETECTION_MODEL_PATH to it in config/settings.py).
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+from common import load_frames, percentile_summary
+
+import numpy as np
+from config import settings
+from src.vision.backends import OnnxRuntimeBackend, DEFAULT_MODEL
+from src.vision.detection import ObjectDetector, box_iou
+
+# IoU needed for an INT8 detection to count as the same object as an fp32 one
+MATCH_IOU = 0.5
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="INT8 post-training quantization for the detector")
+    parser.add_argument("--frames", required=True, help="Directory of recorded robot frames")
+    parser.add_argument("--model", default=None,
+                        help=f"fp32 source model (.pt or .onnx, default {DEFAULT_MODEL})")
+    parser.add_argument("--output", default=None, help="Output INT8 .onnx path")
+    parser.add_argument("--calibration-frames", type=int, default=100,
+                        help="Number of frames used for calibration")
+    parser.add_argument("--method", choices=["minmax", "entropy", "percentile"], default="minmax",
+                        help="Calibration method")
+    parser.add_argument("--per-channel", action="store_true", help="Per-channel weight quantization")
+    parser.add_argument("--quantize-head", action="store_true",
+                        help="Also quantize the detection head (usually costs accuracy)")
+    parser.add_argument("--reference-backend", default=settings.DETECTION_BACKEND,
+                        help="Backend of the fp32 reference ObjectDetector")
+    parser.add_argument("--confidence", type=float, default=settings.DETECTION_CONFIDENCE_THRESHOLD,
+                        help="Confidence threshold used for the comparison")
+    return parser.parse_args()
+
+
+class FrameCalibrationReader:
+    """
+    Feeds letterboxed frames to the ONNX Runtime calibrator
+    """
+
+    def __init__(self, backend: OnnxRuntimeBackend, frames):
+        self.backend = backend
+        self.frames = iter(frames)
+
+    def get_next(self):
+        frame = next(self.frames, None)
+        if frame is None:
+            return None
+        batch, _ = self.backend.prepare_batch([frame])
+        return {self.backend.input_name: batch}
+
+    def rewind(self):
+        pass
+
+
+def detection_head_nodes(onnx_path: str) -> list:
+    """
+    Find the nodes of the final YOLO module (the detection head)
+
+    Args:
+        onnx_path: Path to the fp32 ONNX model
+
+    Returns:
+        list: Node names to exclude from quantization
+    """
+    import onnx
+
+    model = onnx.load(onnx_path)
+    module_of = {}
+    for node in model.graph.node:
+        match = re.match(r"/model\.(\d+)/", node.name)
+        if match:
+            module_of[node.name] = int(match.group(1))
+
+    if not module_of:
+        return []
+
+    head = max(module_of.values())
+    return [name for name, module in module_of.items() if module == head]
+
+
+def copy_metadata(source_path: str, target_path: str):
+    """
+    Copy model metadata (class names, input size) into the quantized model
+
+    Args:
+        source_path: fp32 ONNX model
+        target_path: INT8 ONNX model (rewritten in place)
+    """
+    import onnx
+
+    source = onnx.load(source_path)
+    target = onnx.load(target_path)
+    existing = {prop.key for prop in target.metadata_props}
+    for prop in source.metadata_props:
+        if prop.key not in existing:
+            target.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(target, target_path)
+
+
+def quantize(fp32_path: str, output_path: str, backend: OnnxRuntimeBackend, frames, args):
+    """
+    Run static INT8 quantization calibrated on frames
+
+    Args:
+        fp32_path: fp32 ONNX model
+        output_path: Where to write the INT8 model
+        backend: Loaded fp32 ONNX backend (used for input preprocessing)
+        frames: Calibration frames
+        args: Parsed command line arguments
+    """
+    from onnxruntime.quantization import (CalibrationMethod, QuantFormat, QuantType,
+                                          quantize_static)
+
+    model_input = fp32_path
+    try:
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+
+        model_input = os.path.splitext(output_path)[0] + "_preprocessed.onnx"
+        quant_pre_process(fp32_path, model_input, skip_symbolic_shape=True)
+    except Exception as e:
+        print(f"  ⚠ Quantization pre-processing skipped: {e}")
+        model_input = fp32_path
+
+    methods = {
+        "minmax": CalibrationMethod.MinMax,
+        "entropy": CalibrationMethod.Entropy,
+        "percentile": CalibrationMethod.Percentile,
+    }
+    excluded = [] if args.quantize_head else detection_head_nodes(fp32_path)
+    print(f"  Calibrating on {len(frames)} frames ({args.method}), "
+          f"{len(excluded)} head nodes kept in fp32")
+
+    try:
+        quantize_static(
+            model_input,
+            output_path,
+            FrameCalibrationReader(backend, frames),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=args.per_channel,
+            calibrate_method=methods[args.method],
+            nodes_to_exclude=excluded,
+        )
+    finally:
+        if model_input != fp32_path and os.path.exists(model_input):
+            os.remove(model_input)
+
+    copy_metadata(fp32_path, output_path)
+
+
+def time_detector(detector: ObjectDetector, frames):
+    """
+    Run the detector over frames, timing each call
+
+    Args:
+        detector: Loaded detector
+        frames: Frames to run on
+
+    Returns:
+        tuple: (list of DetectionSet, list of latencies in ms)
+    """
+    # Warm up so one-off initialization does not skew the numbers
+    for frame in frames[:2]:
+        detector.detect_objects(frame)
+
+    results, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        results.append(detector.detect_objects(frame))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def compare_detections(reference, candidate) -> dict:
+    """
+    Compare INT8 detections against the fp32 reference detections
+
+    Args:
+        reference: fp32 DetectionSets per frame
+        candidate: INT8 DetectionSets per frame
+
+    Returns:
+        dict: recall, precision, mean IoU and mean confidence delta of matches
+    """
+    matched, ref_total, cand_total = 0, 0, 0
+    ious, conf_deltas = [], []
+
+    for ref, cand in zip(reference, candidate):
+        ref_total += len(ref)
+        cand_total += len(cand)
+        if not len(ref) or not len(cand):
+            continue
+
+        iou = box_iou(ref.xyxy, cand.xyxy)
+        iou[ref.class_ids[:, None] != cand.class_ids[None, :]] = 0.0
+
+        # Greedy one-to-one matching, best overlaps first
+        used_ref, used_cand = set(), set()
+        for flat in np.argsort(-iou, axis=None):
+            i, j = np.unravel_index(flat, iou.shape)
+            if iou[i, j] < MATCH_IOU:
+                break
+            if i in used_ref or j in used_cand:
+                continue
+            used_ref.add(i)
+            used_cand.add(j)
+            matched += 1
+            ious.append(iou[i, j])
+            conf_deltas.append(float(cand.confidence[j]) - float(ref.confidence[i]))
+
+    return {
+        "reference_detections": ref_total,
+        "candidate_detections": cand_total,
+        "recall": matched / ref_total if ref_total else 1.0,
+        "precision": matched / cand_total if cand_total else 1.0,
+        "mean_iou": float(np.mean(ious)) if ious else 0.0,
+        "mean_confidence_delta": float(np.mean(conf_deltas)) if conf_deltas else 0.0,
+    }
+
+
+def print_report(report: dict):
+    """Print fp32 vs INT8 latency and accuracy side by side"""
+    fp32, int8 = report["fp32"], report["int8"]
+
+    print("\n" + "=" * 64)
+    print(f"{'':<26}{'fp32':>12}{'int8':>12}{'delta':>14}")
+    print("-" * 64)
+    for key in ("mean", "p50", "p95", "p99"):
+        a, b = fp32["latency_ms"][key], int8["latency_ms"][key]
+        change = (b - a) / a * 100 if a else 0.0
+        print(f"{'latency ' + key + ' (ms)':<26}{a:>12.2f}{b:>12.2f}{change:>13.1f}%")
+
+    a, b = fp32["model_size_mb"], int8["model_size_mb"]
+    print(f"{'model size (MB)':<26}{a:>12.2f}{b:>12.2f}{(b - a) / a * 100 if a else 0.0:>13.1f}%")
+
+    accuracy = report["accuracy"]
+    print(f"{'detections':<26}{accuracy['reference_detections']:>12}"
+          f"{accuracy['candidate_detections']:>12}"
+          f"{accuracy['candidate_detections'] - accuracy['reference_detections']:>14}")
+    print(f"{'recall vs fp32':<26}{'':>12}{accuracy['recall']:>12.3f}")
+    print(f"{'precision vs fp32':<26}{'':>12}{accuracy['precision']:>12.3f}")
+    print(f"{'mean IoU of matches':<26}{'':>12}{accuracy['mean_iou']:>12.3f}")
+    print(f"{'mean confidence delta':<26}{'':>12}{accuracy['mean_confidence_delta']:>+12.3f}")
+    print("=" * 64)
+
+
+def main():
+    args = parse_args()
+
+    print("Loading frames...")
+    frames = [image for _, image in load_frames(args.frames)]
+    calibration = frames[:args.calibration_frames]
+    evaluation = frames[args.calibration_frames:]
+    if not evaluation:
+        print("  ⚠ No frames left for evaluation - evaluating on the calibration frames")
+        evaluation = calibration
+    print(f"✓ {len(calibration)} calibration frames, {len(evaluation)} evaluation frames")
+
+    # fp32 ONNX model to quantize (exported once if the source is a .pt file)
+    fp32_backend = OnnxRuntimeBackend(args.model)
+    fp32_backend.load()
+    fp32_onnx = fp32_backend.resolve_onnx_path()
+
+    output = args.output or os.path.join(
+        settings.MODELS_DIR, os.path.splitext(os.path.basename(fp32_onnx))[0] + "_int8.onnx")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    print(f"\nQuantizing {fp32_onnx} -> {output}")
+    quantize(fp32_onnx, output, fp32_backend, calibration, args)
+    print("✓ INT8 model written")
+
+    print("\nComparing against the fp32 ObjectDetector...")
+    reference = ObjectDetector(model_path=args.model, confidence_threshold=args.confidence,
+                               backend=args.reference_backend)
+    candidate = ObjectDetector(model_path=output, confidence_threshold=args.confidence)
+    if not reference.load_model() or not candidate.load_model():
+        print("✗ Failed to load models for comparison")
+        return 1
+
+    reference_results, reference_latency = time_detector(reference, evaluation)
+    candidate_results, candidate_latency = time_detector(candidate, evaluation)
+
+    reference_model = reference.model_path if reference.model_path and \
+        os.path.exists(reference.model_path) else fp32_onnx
+    report = {
+        "source_model": args.model or DEFAULT_MODEL,
+        "int8_model": output,
+        "calibration_frames": len(calibration),
+        "evaluation_frames": len(evaluation),
+        "method": args.method,
+        "fp32": {
+            "backend": args.reference_backend,
+            "latency_ms": percentile_summary(reference_latency),
+            "model_size_mb": os.path.getsize(reference_model) / 1e6,
+        },
+        "int8": {
+            "backend": "onnxruntime",
+            "latency_ms": percentile_summary(candidate_latency),
+            "model_size_mb": os.path.getsize(output) / 1e6,
+        },
+        "accuracy": compare_detections(reference_results, candidate_results),
+    }
+
+    print_report(report)
+
+    report_path = os.path.splitext(output)[0] + "_report.json"
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to {report_path}")
+    print(f"To roll out, set DETECTION_MODEL_PATH = \"{output}\" in config/settings.py")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())